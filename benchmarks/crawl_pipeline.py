@@ -0,0 +1,61 @@
+"""Simulate chunked fetching against the CrawlPipeline under the same rate limit.
+
+Run from the repository root:
+
+    python -m benchmarks.crawl_pipeline --tickers 3000 --rate 30 --workers 32 --chunk 20
+
+Fetches are simulated: each acquires a token from a TokenBucket at --rate per second,
+then sleeps a lognormal latency with a slow tail. The chunked crawl gathers --chunk
+fetches at a time and sleeps --chunk-delay between chunks, as main.py used to. The
+pipeline keeps --workers fetches in flight. Reports the achieved request rate of each
+as a share of the limit.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from crawl_pipeline import CrawlPipeline
+from rate_limiter import TokenBucket
+
+def make_fetch(bucket: TokenBucket, rng: random.Random, median: float):
+    async def fetch(batch):
+        await bucket.acquire_async()
+        await asyncio.sleep(median * rng.lognormvariate(0, 0.8))
+        return {ticker: {"ticker": ticker} for ticker in batch}
+    return fetch
+
+async def chunked(tickers, fetch, chunk: int, delay: float) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(tickers), chunk):
+        await asyncio.gather(*(fetch([ticker]) for ticker in tickers[start:start + chunk]))
+        await asyncio.sleep(delay)
+    return time.perf_counter() - started
+
+async def pipelined(tickers, fetch, workers: int) -> float:
+    started = time.perf_counter()
+    await CrawlPipeline(fetch, lambda ticker, details: None, fetchers=workers).run(tickers)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=30.0, help="Requests per second allowed")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--chunk", type=int, default=20)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.15, help="Median request latency in seconds")
+    args = parser.parse_args()
+
+    tickers = [f"KXBENCH-{i}" for i in range(args.tickers)]
+    for name, run in (
+        ("chunks", lambda fetch: chunked(tickers, fetch, args.chunk, args.chunk_delay)),
+        ("pipeline", lambda fetch: pipelined(tickers, fetch, args.workers)),
+    ):
+        fetch = make_fetch(TokenBucket(args.rate), random.Random(1), args.latency)
+        elapsed = asyncio.run(run(fetch))
+        rate = len(tickers) / elapsed
+        print(f"{name:<10} {elapsed:>7.2f}s  {rate:>7.2f} requests/s  ({rate / args.rate:.0%} of the limit)")
+
+if __name__ == "__main__":
+    main()
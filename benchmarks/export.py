@@ -0,0 +1,95 @@
+"""Compare the JSON + CSV export with the columnar export in columnar_export.py.
+
+Run from the repository root:
+
+    python -m benchmarks.export --markets 100000 --categories 12 --format parquet
+
+Builds synthetic crawl records, then reports for each export its write time, size on
+disk, and the time to read back two columns (market_ticker, last_price).
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from columnar_export import ColumnarExporter, pa
+
+def make_records(markets: int, categories: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(markets):
+        ticker = f"KXBENCH-25DEC31-T{i}"
+        raw = {
+            "ticker": ticker, "event_ticker": f"KXBENCH-{i // 20}", "status": "active",
+            "title": f"Will benchmark market {i} resolve yes?", "rules_primary": "x" * 400,
+            "last_price": rng.randint(1, 99), "yes_bid": rng.randint(1, 49), "yes_ask": rng.randint(51, 99),
+            "volume_24h": rng.randint(0, 10 ** 6), "open_interest": rng.randint(0, 10 ** 5),
+            "close_time": "2025-12-31T21:00:00Z",
+        }
+        records.append({
+            'event_ticker': raw['event_ticker'], 'event_category': f"Category {i % categories}",
+            'market_title': raw['title'], 'market_ticker': ticker, 'status': raw['status'],
+            'market_type': 'binary', 'close_time': raw['close_time'],
+            'last_price': raw['last_price'] / 100, 'yes_bid': raw['yes_bid'] / 100,
+            'yes_ask': raw['yes_ask'] / 100, 'volume_24h': raw['volume_24h'],
+            'open_interest': raw['open_interest'], 'timestamp': '2025-05-10 21:37:37', 'raw_data': raw,
+        })
+    return records
+
+def disk_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", type=int, default=100000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    args = parser.parse_args()
+    if pa is None:
+        parser.error("the columnar export requires pyarrow (pip install pyarrow)")
+    import pyarrow.dataset as ds
+
+    records = make_records(args.markets, args.categories)
+    directory = tempfile.mkdtemp()
+    try:
+        json_path = os.path.join(directory, "markets.json")
+        csv_path = os.path.join(directory, "markets.csv")
+        started = time.perf_counter()
+        with open(json_path, "w") as f:
+            json.dump(records, f, indent=2)
+        pd.DataFrame([{k: v for k, v in r.items() if k != 'raw_data'} for r in records]).to_csv(csv_path, index=False)
+        json_write = time.perf_counter() - started
+        started = time.perf_counter()
+        pd.read_csv(csv_path, usecols=["market_ticker", "last_price"])
+        csv_read = time.perf_counter() - started
+
+        dataset_path = os.path.join(directory, "dataset")
+        started = time.perf_counter()
+        with ColumnarExporter(dataset_path, format=args.format) as exporter:
+            for start in range(0, len(records), 1000):  # Checkpoint-sized batches
+                exporter.write(records[start:start + 1000])
+        columnar_write = time.perf_counter() - started
+        started = time.perf_counter()
+        dataset_format = "parquet" if args.format == "parquet" else "ipc"
+        ds.dataset(dataset_path, format=dataset_format, partitioning="hive").to_table(
+            columns=["market_ticker", "last_price"])
+        columnar_read = time.perf_counter() - started
+
+        json_size = disk_size(json_path) + disk_size(csv_path)
+        print(f"{len(records)} records, {args.categories} categories")
+        print(f"{'JSON + CSV':<12} write {json_write:>7.2f}s  size {json_size / 1e6:>8.1f} MB  "
+              f"read 2 columns (CSV) {csv_read:>6.3f}s")
+        print(f"{args.format:<12} write {columnar_write:>7.2f}s  size {disk_size(dataset_path) / 1e6:>8.1f} MB  "
+              f"read 2 columns {columnar_read:>6.3f}s ({exporter.stats()['files']} files)")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark the executor and native asyncio transports of KalshiHttpClient against a local stand-in server.
+
+Run from the repository root:
+
+    python -m benchmarks.http_transport --in-flight 32 64 128 256
+
+The stand-in server speaks plain HTTP/1.1 with keep-alive on its own thread and event loop,
+answers every GET with a small market payload after a fixed delay, so the numbers reflect
+client-side overhead rather than Kalshi's servers.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from typing import List
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import KalshiHttpClient, Environment
+
+MARKET_BODY = json.dumps({
+    "market": {
+        "ticker": "BENCH-25DEC-T1",
+        "title": "Benchmark market",
+        "status": "open",
+        "last_price": 48,
+        "yes_bid": 47,
+        "yes_ask": 49,
+        "volume_24h": 1200,
+        "open_interest": 3400,
+    }
+}).encode('utf-8')
+
+
+class StandInServer:
+    """Minimal keep-alive HTTP server running on a background thread."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.port = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        header = (
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Connection: keep-alive\r\n"
+            b"Content-Length: " + str(len(MARKET_BODY)).encode() + b"\r\n\r\n"
+        )
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(header + MARKET_BODY)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_case(client: KalshiHttpClient, requests_total: int, in_flight: int) -> dict:
+    semaphore = asyncio.Semaphore(in_flight)
+    latencies = []
+
+    async def timed_get(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await client.async_get(f"{client.markets_url}/BENCH-{i}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed_get(i) for i in range(requests_total)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+
+    return {
+        "rps": requests_total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run_all(args, port: int) -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    print(f"{'transport':<10} {'in-flight':>9} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for in_flight in args.in_flight:
+        for transport in args.transports:
+            client = KalshiHttpClient(
+                key_id="bench",
+                private_key=private_key,
+                environment=Environment.DEMO,
+                max_workers=args.workers,
+                rate_limit_per_second=10 ** 9,  # Measure the transport, not the limiter
+                transport=transport,
+                max_connections=max(in_flight, args.workers * 2),
+                adaptive_concurrency=False  # Measure the transport, not the window
+            )
+            client.host = f"http://127.0.0.1:{port}"
+            result = await run_case(client, args.requests, in_flight)
+            client.thread_executor.shutdown()
+            print(f"{transport:<10} {in_flight:>9} {result['rps']:>10.1f} "
+                  f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument("--transports", nargs="+", default=["executor", "aiohttp", "httpx"])
+    parser.add_argument("--requests", type=int, default=4000, help="Requests per case")
+    parser.add_argument("--workers", type=int, default=32, help="Thread pool size for the executor path")
+    parser.add_argument("--delay", type=float, default=0.005, help="Server-side delay per request in seconds")
+    args = parser.parse_args()
+
+    server = StandInServer(args.delay)
+    server.start()
+    asyncio.run(run_all(args, server.port))
+
+
+if __name__ == "__main__":
+    main()
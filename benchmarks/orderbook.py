@@ -0,0 +1,103 @@
+"""Micro-benchmark the array-backed order books in orderbook.py against dict-of-dict books.
+
+Run from the repository root:
+
+    python -m benchmarks.orderbook --markets 5000 --deltas 200000 --levels 40
+
+Loads a snapshot of --levels price levels per side for every market, applies random deltas
+in dispatcher-sized batches and reads the best bid/ask of each updated market, then reports
+deltas/sec and the memory held by the books (tracemalloc).
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from orderbook import OrderBookManager
+
+def make_messages(markets: int, deltas: int, depth: int, seed: int = 1) -> tuple:
+    rng = random.Random(seed)
+    tickers = [f"BENCH-{i}" for i in range(markets)]
+    snapshots = []
+    for seq, ticker in enumerate(tickers, 1):
+        snapshots.append({"type": "orderbook_snapshot", "sid": 1, "seq": seq, "msg": {
+            "market_ticker": ticker,
+            "yes": [[p, rng.randint(1, 500)] for p in sorted(rng.sample(range(1, 50), depth))],
+            "no": [[p, rng.randint(1, 500)] for p in sorted(rng.sample(range(1, 50), depth))],
+        }})
+    updates = []
+    for seq in range(markets + 1, markets + deltas + 1):
+        updates.append({"type": "orderbook_delta", "sid": 1, "seq": seq, "msg": {
+            "market_ticker": rng.choice(tickers),
+            "side": rng.choice(("yes", "no")),
+            "price": rng.randint(1, 49),
+            "delta": rng.randint(-300, 300),
+        }})
+    return snapshots, updates
+
+class DictBooks:
+    """Reference implementation: {ticker: {side: {price: quantity}}} with max() for the best."""
+    def __init__(self):
+        self.books = {}
+
+    def handle(self, messages):
+        for message in messages:
+            body = message["msg"]
+            if message["type"] == "orderbook_snapshot":
+                self.books[body["market_ticker"]] = {
+                    "yes": {p: q for p, q in body["yes"]},
+                    "no": {p: q for p, q in body["no"]},
+                }
+            else:
+                levels = self.books[body["market_ticker"]][body["side"]]
+                quantity = levels.get(body["price"], 0) + body["delta"]
+                if quantity > 0:
+                    levels[body["price"]] = quantity
+                else:
+                    levels.pop(body["price"], None)
+
+    def best_bid(self, ticker, side="yes"):
+        levels = self.books[ticker][side]
+        if not levels:
+            return 0, 0
+        price = max(levels)
+        return price, levels[price]
+
+    def best_ask(self, ticker, side="yes"):
+        price, quantity = self.best_bid(ticker, "no" if side == "yes" else "yes")
+        return (100 - price, quantity) if price else (0, 0)
+
+def bench(factory, snapshots, updates, batch_size: int) -> dict:
+    tracemalloc.start()
+    books = factory()
+    books.handle(snapshots)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        books.handle(batch)
+        for message in batch:
+            ticker = message["msg"]["market_ticker"]
+            books.best_bid(ticker)
+            books.best_ask(ticker)
+    elapsed = time.perf_counter() - started
+    return {"dps": len(updates) / elapsed, "memory": memory}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", type=int, default=5000)
+    parser.add_argument("--deltas", type=int, default=200000)
+    parser.add_argument("--levels", type=int, default=40, help="Price levels per side in each snapshot (max 49)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    snapshots, updates = make_messages(args.markets, args.deltas, args.levels)
+    print(f"{'books':<12} {'deltas/s':>12} {'KB/market':>10}")
+    for name, factory in (("dict", DictBooks), ("array", OrderBookManager)):
+        result = bench(factory, snapshots, updates, args.batch_size)
+        print(f"{name:<12} {result['dps']:>12.0f} {result['memory'] / args.markets / 1024:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Micro-benchmark the RSA-PSS signing backends in signing.py.
+
+Run from the repository root:
+
+    python -m benchmarks.signing --signatures 5000 --target-rps 25 --clients 4
+
+Reports signatures/sec and latency for inline signing (one thread and a thread pool) and
+for ProcessPoolSigner at a few batch sizes, plus how much of one backend's capacity the
+target request rate would use, which tells whether signing can become the bottleneck.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from signing import InlineSigner, ProcessPoolSigner
+
+def message(i: int) -> str:
+    return f"{int(time.time() * 1000)}GET/trade-api/v2/markets/BENCH-{i}"
+
+def bench_inline(private_key, signatures: int, threads: int) -> dict:
+    signer = InlineSigner(private_key)
+    started = time.perf_counter()
+    if threads == 1:
+        for i in range(signatures):
+            signer.sign(message(i))
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda i: signer.sign(message(i)), range(signatures)))
+    elapsed = time.perf_counter() - started
+    return {"sps": signatures / elapsed, **signer.stats.snapshot()}
+
+async def bench_process_pool(private_key, signatures: int, processes: int, batch_size: int) -> dict:
+    signer = ProcessPoolSigner(private_key, processes=processes, batch_size=batch_size)
+    await signer.sign_async(message(0))  # Start the worker processes before timing
+    signer.stats = type(signer.stats)()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(signer.sign_async(message(i)) for i in range(signatures)))
+    elapsed = time.perf_counter() - started
+    stats = signer.stats.snapshot()
+    signer.close()
+    return {"sps": signatures / elapsed, **stats}
+
+def report(name: str, result: dict, target: float) -> None:
+    print(f"{name:<28} {result['sps']:>10.0f} {result['avg_latency'] * 1000:>10.3f} "
+          f"{result['max_latency'] * 1000:>10.3f} {target / result['sps']:>9.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signatures", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32, help="Threads for the threaded inline case")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--target-rps", type=float, default=25, help="Request rate per client")
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    target = args.target_rps * args.clients
+
+    print(f"{'backend':<28} {'sigs/s':>10} {'avg ms':>10} {'max ms':>10} {'load':>9}")
+    report("inline, 1 thread", bench_inline(private_key, args.signatures, 1), target)
+    report(f"inline, {args.threads} threads", bench_inline(private_key, args.signatures, args.threads), target)
+    for batch_size in args.batch_sizes:
+        result = asyncio.run(bench_process_pool(private_key, args.signatures, args.processes, batch_size))
+        report(f"process x{args.processes}, batch {batch_size}", result, target)
+    print(f"\nload = {args.clients} clients x {args.target_rps:g} req/s as a share of each backend's capacity")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure the CPU cost per WebSocket frame of full parsing versus the ws_fastpath paths.
+
+Run from the repository root:
+
+    python -m benchmarks.ws_decode --capture captures/session --wanted 0.1
+    python -m benchmarks.ws_decode --frames 200000 --markets 5000 --wanted 0.1
+
+Uses recorded frames (see ws_capture.py) or synthesized ticker frames, and reports
+microseconds per frame for: json.loads on every frame, peek() + FrameFilter dropping all
+but a --wanted share of tickers before parsing, and ticker frames decoded with json.loads
+versus decode_ticker().
+"""
+import argparse
+import json
+import random
+import time
+
+from ws_capture import CaptureReader
+from ws_fastpath import FrameFilter, decode_ticker, msgspec, peek
+
+def synthesize(frames: int, markets: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    tickers = [f"KXBENCH-25DEC31-T{i}" for i in range(markets)]
+    return [json.dumps({"type": "ticker", "sid": 1, "msg": {
+        "market_ticker": rng.choice(tickers), "price": rng.randint(1, 99),
+        "yes_bid": rng.randint(1, 49), "yes_ask": rng.randint(51, 99),
+        "volume": rng.randint(0, 10 ** 6), "open_interest": rng.randint(0, 10 ** 5),
+        "dollar_volume": rng.randint(0, 10 ** 6), "dollar_open_interest": rng.randint(0, 10 ** 5),
+        "ts": int(time.time()),
+    }}) for _ in range(frames)]
+
+def per_frame(fn, frames: list) -> float:
+    started = time.perf_counter()
+    fn(frames)
+    return (time.perf_counter() - started) / len(frames) * 1e6
+
+def parse_all(frames):
+    for frame in frames:
+        json.loads(frame)
+
+def make_filtered(frame_filter):
+    def run(frames):
+        for frame in frames:
+            channel, ticker = peek(frame)
+            if frame_filter.wants(channel, ticker):
+                json.loads(frame)
+    return run
+
+def decode_tickers(frames):
+    for frame in frames:
+        decode_ticker(frame)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capture", help="Capture directory to read frames from")
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--markets", type=int, default=5000)
+    parser.add_argument("--wanted", type=float, default=0.1, help="Share of tickers the filter keeps")
+    args = parser.parse_args()
+
+    if args.capture:
+        frames = [frame for _, frame in CaptureReader(args.capture)]
+    else:
+        frames = synthesize(args.frames, args.markets)
+    tickers = {peek(frame)[1] for frame in frames} - {None}
+    wanted = set(random.Random(2).sample(sorted(tickers), int(len(tickers) * args.wanted)))
+    ticker_frames = [frame for frame in frames if peek(frame)[0] == "ticker"]
+
+    print(f"{len(frames)} frames, {len(ticker_frames)} ticker frames, {len(tickers)} markets")
+    full = per_frame(parse_all, frames)
+    frame_filter = FrameFilter(tickers=wanted)
+    filtered = per_frame(make_filtered(frame_filter), frames)
+    print(f"{'json.loads every frame':<34} {full:>8.2f} us/frame")
+    print(f"{'peek + filter ({:.0%} kept)'.format(args.wanted):<34} {filtered:>8.2f} us/frame "
+          f"({1 - filtered / full:.0%} saved, {frame_filter.dropped} dropped)")
+    if ticker_frames:
+        loads = per_frame(parse_all, ticker_frames)
+        compact = per_frame(decode_tickers, ticker_frames)
+        decoder = "msgspec" if msgspec is not None else "json fallback"
+        print(f"{'ticker frames, json.loads':<34} {loads:>8.2f} us/frame")
+        print(f"{'ticker frames, decode_ticker':<34} {compact:>8.2f} us/frame "
+              f"({1 - compact / loads:.0%} saved, {decoder})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Replay a WebSocket capture through KalshiWebSocketClient's handler pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.ws_replay --capture captures/session --speed 5
+    python -m benchmarks.ws_replay --synthesize 200000 --markets 2000
+
+Feeds recorded frames (see ws_capture.py) to a client that is never connected, with its
+order book and market state stores plus a no-op batch handler attached, and reports the
+frames/sec it sustained and the dispatcher counters. --speed replays at a multiple of the
+recorded pace; without it frames go as fast as the pipeline takes them. --synthesize writes
+a capture of random ticker and order book messages first.
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import KalshiWebSocketClient
+from ws_capture import CaptureReader, CaptureRecorder
+
+def synthesize(directory: str, frames: int, markets: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    tickers = [f"BENCH-{i}" for i in range(markets)]
+    received = time.time()
+    with CaptureRecorder(directory) as recorder:
+        for seq, ticker in enumerate(tickers, 1):
+            recorder.record(json.dumps({"type": "orderbook_snapshot", "sid": 2, "seq": seq, "msg": {
+                "market_ticker": ticker,
+                "yes": [[p, rng.randint(1, 500)] for p in range(1, 40)],
+                "no": [[p, rng.randint(1, 500)] for p in range(1, 40)],
+            }}), received)
+        seq = markets
+        for _ in range(frames):
+            received += 0.0005
+            ticker = rng.choice(tickers)
+            if rng.random() < 0.3:
+                message = {"type": "ticker", "sid": 1, "msg": {
+                    "market_ticker": ticker, "price": rng.randint(1, 99), "yes_bid": rng.randint(1, 49),
+                    "yes_ask": rng.randint(51, 99), "volume": rng.randint(0, 10 ** 6),
+                    "open_interest": rng.randint(0, 10 ** 5), "ts": int(received),
+                }}
+            else:
+                seq += 1
+                message = {"type": "orderbook_delta", "sid": 2, "seq": seq, "msg": {
+                    "market_ticker": ticker, "price": rng.randint(1, 39),
+                    "delta": rng.randint(-100, 100), "side": rng.choice(("yes", "no")),
+                }}
+            recorder.record(json.dumps(message), received)
+
+async def replay(directory: str, speed, overflow: str, batch_size: int) -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = KalshiWebSocketClient("replay", private_key, channels=(), overflow=overflow, batch_size=batch_size)
+    client.add_batch_handler(lambda messages: None, inline=True)
+    result = await CaptureReader(directory).replay(client, speed=speed)
+    print(f"{result['frames']} frames in {result['elapsed']:.2f}s = {result['fps']:.0f} frames/s")
+    for name, value in client.stats().items():
+        print(f"{name}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capture", help="Capture directory to replay")
+    parser.add_argument("--synthesize", type=int, default=0, help="Frames to synthesize instead")
+    parser.add_argument("--markets", type=int, default=1000)
+    parser.add_argument("--speed", type=float, default=None, help="Multiple of the recorded pace")
+    parser.add_argument("--overflow", default="block", choices=["block", "drop_oldest", "conflate"])
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    directory = args.capture
+    if args.synthesize:
+        directory = directory or tempfile.mkdtemp(prefix="kalshi-capture-")
+        synthesize(directory, args.synthesize, args.markets)
+        print(f"Synthesized {args.synthesize} frames in {directory}")
+    if not directory:
+        parser.error("--capture or --synthesize is required")
+    asyncio.run(replay(directory, args.speed, args.overflow, args.batch_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Append-only checkpoint store for crawl records.
+
+Each checkpoint writes only the records added since the previous one, as a new JSON-lines
+segment, then commits it by atomically replacing a small manifest that lists the
+committed segments. A crash mid-checkpoint leaves an unlisted segment that is ignored.
+Resuming streams the listed segments back a line at a time.
+
+Segments only grow in number; compact them offline, between crawls:
+
+    python -m checkpoint_store checkpoints/market_data
+"""
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+MANIFEST = "manifest.json"
+SEGMENT_PATTERN = "segment-{:06d}.jsonl"
+
+def _fsync_directory(directory: str) -> None:
+    """Makes renames and new files in a directory durable (a no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Replaces a JSON file so readers see either the old or the new contents, durably."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(path) or ".")
+
+class CheckpointStore:
+    """Segmented JSON-lines checkpoints in one directory, committed through a manifest."""
+    def __init__(self, directory: str, default: Optional[Callable[[Any], Any]] = None):
+        """Initializes the store.
+
+        Args:
+            directory: Where segments and the manifest live. Created on the first append.
+            default: json.dumps `default` hook for values JSON cannot encode, such as
+                decoding.json_default for lazy views.
+        """
+        self.directory = directory
+        self.default = default
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "records": 0, "next_segment": 0}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        write_json_atomic(os.path.join(self.directory, MANIFEST), manifest)
+        self.manifest = manifest
+
+    def exists(self) -> bool:
+        """Whether any checkpoint has been committed."""
+        return bool(self.manifest["segments"])
+
+    def __len__(self) -> int:
+        """Records committed, counting every version of a record appended more than once."""
+        return self.manifest["records"]
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Writes records as a new segment and commits it.
+
+        Returns:
+            Number of records written; nothing is written for an empty batch.
+        """
+        lines = [json.dumps(record, default=self.default, separators=(",", ":")) for record in records]
+        if not lines:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        number = self.manifest["next_segment"]
+        name = SEGMENT_PATTERN.format(number)
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_manifest({
+            "segments": self.manifest["segments"] + [{"name": name, "records": len(lines)}],
+            "records": self.manifest["records"] + len(lines),
+            "next_segment": number + 1,
+        })
+        return len(lines)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yields committed records in the order they were appended, one line at a time."""
+        for segment in self.manifest["segments"]:
+            with open(os.path.join(self.directory, segment["name"])) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def compact(self, key: str = "market_ticker") -> int:
+        """Rewrites all segments as one, keeping the last record for each key.
+
+        Run between crawls, not while another process appends. Segments a crash left
+        uncommitted are deleted too.
+
+        Returns:
+            Number of records kept.
+        """
+        latest = {}
+        for record in self:
+            latest[record[key]] = record
+        self.manifest = dict(self.manifest, segments=[], records=0)
+        kept = self.append(latest.values())
+        if not kept:
+            self._write_manifest(self.manifest)
+        # Drop the old segments, and any a crash left uncommitted
+        live = {segment["name"] for segment in self.manifest["segments"]}
+        for name in os.listdir(self.directory):
+            if name.startswith("segment-") and name.endswith(".jsonl") and name not in live:
+                os.remove(os.path.join(self.directory, name))
+        return kept
+
+    def clear(self) -> None:
+        """Deletes every segment and the manifest."""
+        for segment in self.manifest["segments"]:
+            try:
+                os.remove(os.path.join(self.directory, segment["name"]))
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(os.path.join(self.directory, MANIFEST))
+        except FileNotFoundError:
+            pass
+        self.manifest = {"segments": [], "records": 0, "next_segment": 0}
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:] or ["checkpoints/market_data"]:
+        store = CheckpointStore(directory)
+        before = len(store)
+        kept = store.compact()
+        print(f"{directory}: {before} records compacted to {kept}")
@@ -1,22 +1,77 @@
 import requests
-import base64
 import time
-from typing import Any, Dict, Optional, List, Callable
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, List, Callable, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 import asyncio
 import concurrent.futures
+import contextlib
 import random
 
 from requests.exceptions import HTTPError
 
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
-from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import rsa
 
 import websockets
 
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+from decoding import get_decoder, lazy_loads
+from congestion import (
+    CONGESTION_STATUSES,
+    RETRYABLE_STATUSES,
+    ConcurrencyController,
+    RetryBudget,
+    parse_retry_after,
+)
+from signing import InlineSigner
+from ws_dispatch import Dispatcher, message_channel
+from ws_metrics import WebSocketMetrics
+from ws_fastpath import DECODE_ERRORS, FrameFilter, decode_ticker, peek
+from orderbook import ACK_CHANNEL, ORDERBOOK_CHANNELS, OrderBookManager
+from market_state import TICKER_CHANNEL, MarketStateStore
+from subscriptions import CONTROL_CHANNELS, Subscription, SubscriptionManager, shard_of
+
+# Optional native asyncio transports
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Transport-level errors that async_get retries, for whichever transports are installed
+_REQUEST_ERRORS = (requests.RequestException, HTTPError, asyncio.TimeoutError)
+if aiohttp is not None:
+    _REQUEST_ERRORS += (aiohttp.ClientError,)
+if httpx is not None:
+    _REQUEST_ERRORS += (httpx.HTTPError,)
+
+# Errors meaning the server took too long to answer, a congestion signal
+_TIMEOUT_ERRORS = (requests.Timeout, asyncio.TimeoutError)
+if httpx is not None:
+    _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+
+def _error_status(error: Exception) -> Tuple[Optional[int], Optional[str]]:
+    """Returns the HTTP status and Retry-After header behind a transport error, if any."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code, error.response.headers.get("Retry-After")
+    if aiohttp is not None and isinstance(error, aiohttp.ClientResponseError):
+        return error.status, (error.headers or {}).get("Retry-After")
+    if httpx is not None and isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code, error.response.headers.get("Retry-After")
+    return None, None
+
+def _retry_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """Honors the server's Retry-After, otherwise exponential backoff with jitter."""
+    if retry_after is not None:
+        return retry_after
+    return 0.1 * (2 ** attempt) + (random.random() * 0.1)
+
 class Environment(Enum):
     DEMO = "demo"
     PROD = "prod"
@@ -28,7 +83,8 @@ class KalshiBaseClient:
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
-        max_workers: int = 10
+        max_workers: int = 10,
+        signer: Optional[Any] = None
     ):
         """Initializes the client with the provided API key and private key.
 
@@ -37,13 +93,16 @@ class KalshiBaseClient:
             private_key (rsa.RSAPrivateKey): Your RSA private key.
             environment (Environment): The API environment to use (DEMO or PROD).
             max_workers (int): Maximum number of worker threads for parallel requests.
+            signer: Signing backend from signing.py (InlineSigner or ProcessPoolSigner).
+                Defaults to signing inline on the calling thread. One signer may be
+                shared by several clients.
         """
         self.key_id = key_id
         self.private_key = private_key
+        self.signer = signer or InlineSigner(private_key)
         self.environment = environment
         self.last_api_call = datetime.now()
         self.max_workers = max_workers
-        self.rate_limit_lock = asyncio.Lock() if asyncio.get_event_loop_policy().get_event_loop().is_running() else None
         self.thread_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
 
         if self.environment == Environment.DEMO:
@@ -55,43 +114,44 @@ class KalshiBaseClient:
         else:
             raise ValueError("Invalid environment")
 
-    def request_headers(self, method: str, path: str) -> Dict[str, Any]:
-        """Generates the required authentication headers for API requests."""
+    def _signing_message(self, method: str, path: str) -> tuple:
+        """Returns the timestamp and the message to sign for a request."""
         current_time_milliseconds = int(time.time() * 1000)
         timestamp_str = str(current_time_milliseconds)
 
         # Remove query params from path
         path_parts = path.split('?')
 
-        msg_string = timestamp_str + method + path_parts[0]
-        signature = self.sign_pss_text(msg_string)
+        return timestamp_str, timestamp_str + method + path_parts[0]
 
-        headers = {
+    def _auth_headers(self, timestamp_str: str, signature: str) -> Dict[str, Any]:
+        return {
             "Content-Type": "application/json",
             "KALSHI-ACCESS-KEY": self.key_id,
             "KALSHI-ACCESS-SIGNATURE": signature,
             "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
         }
-        return headers
+
+    def request_headers(self, method: str, path: str) -> Dict[str, Any]:
+        """Generates the required authentication headers for API requests."""
+        timestamp_str, msg_string = self._signing_message(method, path)
+        return self._auth_headers(timestamp_str, self.sign_pss_text(msg_string))
+
+    async def async_request_headers(self, method: str, path: str) -> Dict[str, Any]:
+        """Async version of request_headers that lets the signer work off the event loop."""
+        timestamp_str, msg_string = self._signing_message(method, path)
+        return self._auth_headers(timestamp_str, await self.signer.sign_async(msg_string))
 
     def sign_pss_text(self, text: str) -> str:
         """Signs the text using RSA-PSS and returns the base64 encoded signature."""
-        message = text.encode('utf-8')
-        try:
-            signature = self.private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.DIGEST_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return base64.b64encode(signature).decode('utf-8')
-        except InvalidSignature as e:
-            raise ValueError("RSA sign PSS failed") from e
+        return self.signer.sign(text)
 
 class KalshiHttpClient(KalshiBaseClient):
     """Client for handling HTTP connections to the Kalshi API."""
+    # Limits for packing tickers into one GET /markets request
+    BULK_MARKETS_PAGE_SIZE = 1000  # Largest page the markets list endpoint returns
+    BULK_MARKETS_MAX_QUERY_CHARS = 6000  # Keeps the request URL well under common 8 KB limits
+
     def __init__(
         self,
         key_id: str,
@@ -99,206 +159,485 @@ class KalshiHttpClient(KalshiBaseClient):
         environment: Environment = Environment.DEMO,
         max_workers: int = 10,
         rate_limit_per_second: int = 8,  # Default to slightly under Basic tier's 10 reads/second
-        adaptive_rate_limiting: bool = True
+        adaptive_rate_limiting: bool = True,
+        write_rate_limit_per_second: Optional[int] = None,
+        rate_limit_burst: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        transport: str = "executor",
+        http2: bool = False,
+        max_connections: Optional[int] = None,
+        signer: Optional[Any] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = True,
+        adaptive_concurrency: bool = True,
+        json_decoder: str = "json",
+        lazy_views: bool = False
     ):
-        super().__init__(key_id, private_key, environment, max_workers)
+        """Initializes the HTTP client.
+
+        Args:
+            rate_limit_per_second: Read requests per second.
+            adaptive_rate_limiting: Kept for compatibility; every request now goes through the
+                token bucket, which paces requests evenly and allows configurable bursts.
+            write_rate_limit_per_second: Write (POST/DELETE) requests per second. Defaults to
+                rate_limit_per_second.
+            rate_limit_burst: Requests allowed back to back on each budget after an idle period.
+            rate_limiter: Shared limiter to use instead of building one from the rates above,
+                so several clients can draw from a single tier budget.
+            transport: How the async methods reach the network. "executor" runs blocking
+                `requests` calls on the thread pool; "aiohttp" and "httpx" use a native asyncio
+                connection pool shared by every coroutine. Use "httpx" when HTTP/2 is wanted.
+            http2: Negotiate HTTP/2 (httpx transport only, requires the `h2` package).
+            max_connections: Size of the async connection pool. Defaults to max_workers * 2.
+            signer: Signing backend, see KalshiBaseClient.
+            cache: Optional response cache for GETs. Cache hits skip the rate limiter.
+            coalesce_requests: Share one network call between identical GETs that are in
+                flight at the same time. Coalesced results are shared and read-only.
+            adaptive_concurrency: Size the number of async requests in flight with an AIMD
+                window that reacts to 429s, timeouts and Retry-After (see congestion.py)
+                instead of a fixed semaphore per batch.
+            json_decoder: Decoder for response bodies: "json", "orjson" or "msgspec".
+            lazy_views: Return response objects as decoding.LazyView mappings that decode
+                each field on first access and keep the raw bytes (requires msgspec).
+                Overrides json_decoder.
+        """
+        super().__init__(key_id, private_key, environment, max_workers, signer)
         self.host = self.HTTP_BASE_URL
         self.exchange_url = "/trade-api/v2/exchange"
         self.markets_url = "/trade-api/v2/markets"
         self.portfolio_url = "/trade-api/v2/portfolio"
         self.events_url = "/trade-api/v2/events"
+        self.series_url = "/trade-api/v2/series"
         self.rate_limit_per_second = rate_limit_per_second
         self.adaptive_rate_limiting = adaptive_rate_limiting
         
-        # Configure session with connection pooling for better performance
+        # Configure session with connection pooling for better performance. Retries are
+        # handled by get/async_get so they are not compounded by urllib3's own.
         self._session = requests.Session()
         adapter = requests.adapters.HTTPAdapter(
             pool_connections=max_workers,
             pool_maxsize=max_workers * 2,
-            max_retries=3
+            max_retries=0
         )
         self._session.mount('http://', adapter)
         self._session.mount('https://', adapter)
         
-        self._last_requests = []  # Track the timestamps of last N requests
-        self._request_times_lock = asyncio.Lock() if asyncio.get_event_loop_policy().get_event_loop().is_running() else None
+        if transport not in ("executor", "aiohttp", "httpx"):
+            raise ValueError(f"Invalid transport: {transport}")
+        if transport == "aiohttp" and aiohttp is None:
+            raise ImportError("transport='aiohttp' requires the aiohttp package (pip install aiohttp)")
+        if transport == "httpx" and httpx is None:
+            raise ImportError("transport='httpx' requires the httpx package (pip install httpx)")
+        if http2 and transport != "httpx":
+            raise ValueError("http2 is only supported with transport='httpx'")
+        self.transport = transport
+        self.http2 = http2
+        self.max_connections = max_connections or max_workers * 2
+        self._async_session = None
+        self._async_session_loop = None
 
-    def _adaptive_rate_limit(self) -> None:
-        """Adaptive rate limiter that adjusts based on recent request history and configured limits."""
-        now = datetime.now()
-        
-        # Keep only timestamps from the last second
-        self._last_requests = [ts for ts in self._last_requests if (now - ts).total_seconds() < 1.0]
-        
-        # Add current timestamp
-        self._last_requests.append(now)
-        
-        # If we have more than our rate limit in the last second, sleep to respect the limit
-        if len(self._last_requests) > self.rate_limit_per_second:
-            sleep_time = max(0, 1.0 - (now - self._last_requests[0]).total_seconds())
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-
-    async def async_rate_limit(self) -> None:
-        """Asynchronous rate limiter for use with async functions."""
-        if self._request_times_lock:
-            async with self._request_times_lock:
-                if self.adaptive_rate_limiting:
-                    self._adaptive_rate_limit()
-                else:
-                    # Simple rate limiting - space requests evenly
-                    await asyncio.sleep(1.0 / self.rate_limit_per_second)
+        self.rate_limiter = rate_limiter or RateLimiter(
+            read_rate=rate_limit_per_second,
+            write_rate=write_rate_limit_per_second or rate_limit_per_second,
+            read_burst=rate_limit_burst,
+            write_burst=rate_limit_burst
+        )
+        if lazy_views:
+            get_decoder("msgspec")  # Fail here rather than on the first response if msgspec is missing
+            self.decode = lazy_loads
         else:
-            if self.adaptive_rate_limiting:
-                self._adaptive_rate_limit()
-            else:
-                # Simple rate limiting - space requests evenly
-                time.sleep(1.0 / self.rate_limit_per_second)
+            self.decode = get_decoder(json_decoder)
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        # Executor requests cannot run wider than the thread pool; native ones than the connection pool
+        self.concurrency = ConcurrencyController(
+            initial_window=min(20, max_workers),
+            max_window=max_workers if transport == "executor" else self.max_connections
+        ) if adaptive_concurrency else None
 
-    def rate_limit(self) -> None:
-        """Non-async version of rate limiter."""
-        if self.adaptive_rate_limiting:
-            self._adaptive_rate_limit()
-        else:
-            # Simple rate limiting - space requests evenly
-            time.sleep(1.0 / self.rate_limit_per_second)
+    async def async_rate_limit(self, kind: str = "read") -> float:
+        """Asynchronous rate limiter for use with async functions.
+
+        Returns:
+            Seconds this request waited for the rate limit.
+        """
+        return await self.rate_limiter.acquire_async(kind)
+
+    def rate_limit(self, kind: str = "read") -> float:
+        """Non-async version of rate limiter.
+
+        Returns:
+            Seconds this request waited for the rate limit.
+        """
+        return self.rate_limiter.acquire(kind)
 
     def raise_if_bad_response(self, response: requests.Response) -> None:
         """Raises an HTTPError if the response status code indicates an error."""
-        if response.status_code not in range(200, 299):
+        # 304 Not Modified answers a cache revalidation and is not an error
+        if response.status_code not in range(200, 299) and response.status_code != 304:
             response.raise_for_status()
 
     def post(self, path: str, body: dict) -> Any:
         """Performs an authenticated POST request to the Kalshi API."""
-        self.rate_limit()
+        self.rate_limit("write")
         response = self._session.post(
             self.host + path,
             json=body,
             headers=self.request_headers("POST", path)
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        return self.decode(response.content)
+
+    def _cache_lookup(self, path: str, params: Dict[str, Any]) -> tuple:
+        if self.cache is None:
+            return None, None
+        return self.cache.lookup(path, params)
+
+    def _cache_result(self, key: Optional[tuple], entry: Any, body: Any, etag: Optional[str]) -> Any:
+        """Stores a fresh body in the cache, or renews the cached one when body is None (304)."""
+        if key is None:
+            return body
+        if body is None:
+            return self.cache.revalidated(key, entry)
+        self.cache.store(key, body, etag)
+        return body
 
     def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated GET request to the Kalshi API."""
-        self.rate_limit()
-        response = self._session.get(
-            self.host + path,
-            headers=self.request_headers("GET", path),
-            params=params
+        key, entry = self._cache_lookup(path, params)
+        if entry is not None and entry.is_fresh():
+            return entry.body
+        if self.single_flight is None:
+            return self._send_get(path, params, key, entry)
+        return self.single_flight.do(
+            SingleFlight.key(path, params),
+            lambda: self._send_get(path, params, key, entry)
         )
-        self.raise_if_bad_response(response)
-        return response.json()
+
+    def _send_get(self, path: str, params: Dict[str, Any], key: Optional[tuple], entry: Any, retries: int = 3) -> Any:
+        attempt = 0
+        while True:
+            self.rate_limit()
+            headers = self.request_headers("GET", path)
+            if entry is not None:
+                headers["If-None-Match"] = entry.etag
+            try:
+                response = self._session.get(
+                    self.host + path,
+                    headers=headers,
+                    params=params
+                )
+                self.raise_if_bad_response(response)
+                break
+            except requests.RequestException as e:
+                status, retry_after = _error_status(e)
+                attempt += 1
+                if attempt >= retries or (status is not None and status not in RETRYABLE_STATUSES):
+                    raise
+                time.sleep(_retry_delay(attempt, parse_retry_after(retry_after)))
+
+        if response.status_code == 304:
+            return self._cache_result(key, entry, None, None)
+        return self._cache_result(key, entry, self.decode(response.content), response.headers.get("ETag"))
 
     def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated DELETE request to the Kalshi API."""
-        self.rate_limit()
+        self.rate_limit("write")
         response = self._session.delete(
             self.host + path,
             headers=self.request_headers("DELETE", path),
             params=params
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        return self.decode(response.content)
         
+    def _check_batch_args(self, paths: List[str], params_list: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if params_list is None:
+            params_list = [{} for _ in paths]
+            
+        if len(paths) != len(params_list):
+            raise ValueError("paths and params_list must have the same length")
+        return params_list
+
+    def _get_or_error(self, path: str, params: Dict[str, Any]) -> Any:
+        try:
+            return self.get(path, params)
+        except Exception as e:
+            return {"error": str(e)}
+
     def batch_get(self, paths: List[str], params_list: Optional[List[Dict[str, Any]]] = None) -> List[Any]:
-        """Performs multiple GET requests in parallel using a thread pool.
+        """Performs multiple GET requests in parallel on the client's thread pool.
         
+        Must not be called from one of the client's own pool threads, which could leave
+        the pool waiting on itself.
+
         Args:
             paths: List of API paths to request
             params_list: Optional list of params dictionaries for each request
         
         Returns:
-            List of API responses
+            List of API responses in the same order as paths; failed requests are
+            {"error": ...} dicts
         """
-        if params_list is None:
-            params_list = [{} for _ in paths]
-            
-        if len(paths) != len(params_list):
-            raise ValueError("paths and params_list must have the same length")
-            
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [
-                executor.submit(self.get, path, params)
-                for path, params in zip(paths, params_list)
-            ]
-            
-            results = []
+        params_list = self._check_batch_args(paths, params_list)
+        return list(self.thread_executor.map(self._get_or_error, paths, params_list))
+
+    def iter_batch_get(
+        self,
+        paths: List[str],
+        params_list: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        """Streaming version of batch_get that yields (index, response) as each request finishes.
+
+        The index refers to the position in paths. Requests left unconsumed when the
+        iterator is closed early are cancelled if they have not started.
+        """
+        params_list = self._check_batch_args(paths, params_list)
+        futures = {
+            self.thread_executor.submit(self._get_or_error, path, params): i
+            for i, (path, params) in enumerate(zip(paths, params_list))
+        }
+        try:
             for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    results.append({"error": str(e)})
-                    
-        return results
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
         
-    async def async_get(self, path: str, params: Dict[str, Any] = {}, retries: int = 3) -> Any:
-        """Async version of the GET method with retry logic."""
-        await self.async_rate_limit()
-        
-        loop = asyncio.get_event_loop()
-        attempt = 0
-        last_error = None
+    def _get_async_session(self) -> Any:
+        """Returns the shared async connection pool, creating it on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._async_session is not None and self._async_session_loop is loop:
+            return self._async_session
 
-        while attempt < retries:
-            try:
-                response = await loop.run_in_executor(
-                    self.thread_executor,
-                    lambda: self._session.get(
-                        self.host + path,
-                        headers=self.request_headers("GET", path),
-                        params=params,
-                        timeout=(3.0, 10.0)  # (connect timeout, read timeout)
-                    )
+        if self.transport == "aiohttp":
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(connect=3.0, sock_read=10.0)  # Match the executor path
+            )
+        else:
+            self._async_session = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(10.0, connect=3.0)
+            )
+        self._async_session_loop = loop
+        return self._async_session
+
+    async def _async_send_get(self, path: str, params: Dict[str, Any], etag: Optional[str] = None) -> tuple:
+        """Sends a single signed GET over the configured transport.
+
+        Args:
+            etag: Validator of a cached response to send as If-None-Match.
+
+        Returns:
+            (body, etag) where body is None if the server answered 304 Not Modified.
+        """
+        url = self.host + path
+        if self.transport == "executor":
+            def send():
+                headers = self.request_headers("GET", path)
+                if etag:
+                    headers["If-None-Match"] = etag
+                return self._session.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=(3.0, 10.0)  # (connect timeout, read timeout)
                 )
-                
-                self.raise_if_bad_response(response)
-                return response.json()
-            except (requests.RequestException, HTTPError) as e:
-                attempt += 1
-                last_error = e
-                if attempt < retries:
-                    # Exponential backoff with jitter
-                    backoff = 0.1 * (2 ** attempt) + (random.random() * 0.1)
-                    await asyncio.sleep(backoff)
-        
-        # If we get here, all retries failed
-        if last_error:
-            return {"error": str(last_error)}
-        return {"error": "Unknown error during request"}
-        
-    async def async_batch_get(self, paths: List[str], params_list: Optional[List[Dict[str, Any]]] = None) -> List[Any]:
+
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.thread_executor, send)
+            self.raise_if_bad_response(response)
+            if response.status_code == 304:
+                return None, etag
+            return self.decode(response.content), response.headers.get("ETag")
+
+        session = self._get_async_session()
+        headers = await self.async_request_headers("GET", path)
+        if etag:
+            headers["If-None-Match"] = etag
+
+        if self.transport == "aiohttp":
+            async with session.get(url, headers=headers, params=params) as response:
+                response.raise_for_status()
+                if response.status == 304:
+                    return None, etag
+                return self.decode(await response.read()), response.headers.get("ETag")
+
+        response = await session.get(url, headers=headers, params=params)
+        self.raise_if_bad_response(response)
+        if response.status_code == 304:
+            return None, etag
+        return self.decode(response.content), response.headers.get("ETag")
+
+    async def aclose(self) -> None:
+        """Closes the async connection pool, if one was opened."""
+        if self._async_session is not None:
+            if self.transport == "aiohttp":
+                await self._async_session.close()
+            else:
+                await self._async_session.aclose()
+            self._async_session = None
+            self._async_session_loop = None
+
+    async def async_get(
+        self,
+        path: str,
+        params: Dict[str, Any] = {},
+        retries: int = 3,
+        retry_budget: Optional[RetryBudget] = None
+    ) -> Any:
+        """Async version of the GET method with retry logic.
+
+        429, 5xx, timeouts and connection errors are retried, waiting for the server's
+        Retry-After when it sends one; other 4xx answers are returned at once.
+
+        Args:
+            retries: Attempts allowed for this request.
+            retry_budget: Retries shared with the other requests of a batch. Once it is
+                spent, failures are returned without retrying.
+        """
+        key, entry = self._cache_lookup(path, params)
+        if entry is not None and entry.is_fresh():
+            return entry.body
+        if self.single_flight is None:
+            return await self._async_send_get_with_retries(path, params, retries, key, entry, retry_budget)
+        return await self.single_flight.do_async(
+            SingleFlight.key(path, params),
+            lambda: self._async_send_get_with_retries(path, params, retries, key, entry, retry_budget)
+        )
+
+    async def _async_send_get_with_retries(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        retries: int,
+        key: Optional[tuple],
+        entry: Any,
+        retry_budget: Optional[RetryBudget]
+    ) -> Any:
+        attempt = 0
+        while True:
+            if self.concurrency is not None:
+                await self.concurrency.acquire()
+            try:
+                await self.async_rate_limit()
+                started = time.monotonic()
+                body, etag = await self._async_send_get(path, params, entry.etag if entry else None)
+            except _REQUEST_ERRORS as e:
+                error = e
+                status, retry_after = _error_status(e)
+                retry_after = parse_retry_after(retry_after)
+                if self.concurrency is not None and (
+                    status in CONGESTION_STATUSES or isinstance(e, _TIMEOUT_ERRORS)
+                ):
+                    self.concurrency.on_congestion(retry_after)
+            else:
+                if self.concurrency is not None:
+                    self.concurrency.on_success(time.monotonic() - started)
+                return self._cache_result(key, entry, body, etag)
+            finally:
+                if self.concurrency is not None:
+                    self.concurrency.release()
+
+            attempt += 1
+            if attempt >= retries or (status is not None and status not in RETRYABLE_STATUSES):
+                break
+            if retry_budget is not None and not retry_budget.try_spend():
+                break
+            if self.concurrency is not None:
+                self.concurrency.retries += 1
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+
+        return {"error": str(error)}
+
+    def _batch_limit(self, concurrency: Optional[int]) -> Any:
+        """Returns the per-batch limit on requests in flight, if any is needed."""
+        if concurrency:
+            return asyncio.Semaphore(concurrency)
+        if self.concurrency is None:
+            # Set max concurrent tasks but not more than we have workers
+            # This prevents overwhelming the connection pool or the API
+            return asyncio.Semaphore(min(20, self.max_workers))
+        # The shared adaptive window already bounds requests in flight
+        return contextlib.nullcontext()
+
+    def _batch_retry_budget(self, size: int, retry_budget: Optional[int]) -> RetryBudget:
+        return RetryBudget(retry_budget if retry_budget is not None else max(10, size // 10))
+
+    async def async_batch_get(
+        self,
+        paths: List[str],
+        params_list: Optional[List[Dict[str, Any]]] = None,
+        concurrency: Optional[int] = None,
+        retry_budget: Optional[int] = None
+    ) -> List[Any]:
         """Performs multiple GET requests in parallel using asyncio with concurrency control.
         
         Args:
             paths: List of API paths to request
             params_list: Optional list of params dictionaries for each request
+            concurrency: Maximum requests in flight for this batch. By default the client's
+                adaptive window decides, or min(20, max_workers) when it is disabled.
+            retry_budget: Total retries allowed across the batch. Defaults to a tenth of
+                the batch size, at least 10.
         
         Returns:
-            List of API responses
+            List of API responses in the same order as paths
         """
-        if params_list is None:
-            params_list = [{} for _ in paths]
-            
-        if len(paths) != len(params_list):
-            raise ValueError("paths and params_list must have the same length")
-        
-        # Set max concurrent tasks but not more than we have workers
-        # This prevents overwhelming the connection pool or the API
-        semaphore = asyncio.Semaphore(min(20, self.max_workers))
+        params_list = self._check_batch_args(paths, params_list)
+        limit = self._batch_limit(concurrency)
+        budget = self._batch_retry_budget(len(paths), retry_budget)
         
-        async def fetch_with_semaphore(path, params):
-            async with semaphore:
-                return await self.async_get(path, params)
+        async def fetch_with_limit(path, params):
+            async with limit:
+                return await self.async_get(path, params, retry_budget=budget)
         
         tasks = [
-            fetch_with_semaphore(path, params)
+            fetch_with_limit(path, params)
             for path, params in zip(paths, params_list)
         ]
         
         return await asyncio.gather(*tasks, return_exceptions=True)
 
+    async def async_iter_batch_get(
+        self,
+        paths: List[str],
+        params_list: Optional[List[Dict[str, Any]]] = None,
+        concurrency: Optional[int] = None,
+        retry_budget: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Streaming version of async_batch_get that yields (index, response) as each request finishes.
+
+        As with async_batch_get, an exception raised by a request is yielded in place of
+        its response. Requests still pending when the iterator is closed early are cancelled.
+        """
+        params_list = self._check_batch_args(paths, params_list)
+        limit = self._batch_limit(concurrency)
+        budget = self._batch_retry_budget(len(paths), retry_budget)
+
+        async def fetch_with_index(i, path, params):
+            async with limit:
+                try:
+                    return i, await self.async_get(path, params, retry_budget=budget)
+                except Exception as e:
+                    return i, e
+
+        tasks = [
+            asyncio.ensure_future(fetch_with_index(i, path, params))
+            for i, (path, params) in enumerate(zip(paths, params_list))
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def get_balance(self) -> Dict[str, Any]:
         """Retrieves the account balance."""
         return self.get(self.portfolio_url + '/balance')
@@ -405,6 +744,83 @@ class KalshiHttpClient(KalshiBaseClient):
         
         return markets
 
+    def split_tickers(self, tickers: List[str]) -> List[List[str]]:
+        """Splits tickers into batches that each fit in one markets list request.
+
+        A batch holds at most BULK_MARKETS_PAGE_SIZE tickers (the endpoint's maximum page
+        size) and at most BULK_MARKETS_MAX_QUERY_CHARS characters of URL-encoded tickers.
+        Duplicate tickers are dropped.
+        """
+        batches = []
+        batch = []
+        batch_chars = 0
+        for ticker in dict.fromkeys(tickers):
+            ticker_chars = len(requests.utils.quote(ticker, safe='')) + 3  # Plus the encoded comma
+            if batch and (len(batch) >= self.BULK_MARKETS_PAGE_SIZE
+                          or batch_chars + ticker_chars > self.BULK_MARKETS_MAX_QUERY_CHARS):
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
+            batch.append(ticker)
+            batch_chars += ticker_chars
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def get_markets_bulk(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve many markets through the markets list endpoint's tickers filter.
+
+        Packs up to BULK_MARKETS_PAGE_SIZE tickers into each request instead of sending one
+        GET per ticker.
+
+        Args:
+            tickers: List of market ticker symbols
+
+        Returns:
+            Dict mapping ticker to market details. Tickers the API did not return are
+            absent; tickers in a batch that failed map to an {"error": ...} dict.
+        """
+        markets = {}
+        for batch in self.split_tickers(tickers):
+            params = {'tickers': ','.join(batch), 'limit': self.BULK_MARKETS_PAGE_SIZE}
+            try:
+                while True:
+                    response = self.get(self.markets_url, params=params)
+                    for market in response.get('markets') or []:
+                        markets[market['ticker']] = market
+                    cursor = response.get('cursor')
+                    if not cursor or not response.get('markets'):
+                        break
+                    params = {**params, 'cursor': cursor}
+            except requests.RequestException as e:
+                for ticker in batch:
+                    markets.setdefault(ticker, {"error": str(e)})
+        return markets
+
+    async def get_markets_bulk_async(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Async version of get_markets_bulk; all batches are fetched concurrently.
+
+        Args:
+            tickers: List of market ticker symbols
+
+        Returns:
+            Dict mapping ticker to market details, as for get_markets_bulk.
+        """
+        async def fetch_batch(batch):
+            try:
+                return [market async for market in self.iter_markets(tickers=batch, limit=self.BULK_MARKETS_PAGE_SIZE)]
+            except HTTPError as e:
+                return [{"ticker": ticker, "error": str(e)} for ticker in batch]
+
+        markets = {}
+        for batch_markets in await asyncio.gather(*(fetch_batch(b) for b in self.split_tickers(tickers))):
+            for market in batch_markets:
+                if 'error' in market:
+                    markets.setdefault(market['ticker'], {"error": market['error']})
+                else:
+                    markets[market['ticker']] = market
+        return markets
+
     def get_market(self, ticker: str) -> Dict[str, Any]:
         """Retrieves detailed information about a specific market.
         
@@ -416,6 +832,297 @@ class KalshiHttpClient(KalshiBaseClient):
         """
         return self.get(f"{self.markets_url}/{ticker}")
 
+    def get_orderbook(self, ticker: str, depth: Optional[int] = None) -> Dict[str, Any]:
+        """Retrieves the order book of a market.
+
+        Args:
+            ticker: Market ticker symbol
+            depth: Price levels per side, None for all
+
+        Returns:
+            Dict with 'yes' and 'no' lists of [price, quantity] bids
+        """
+        params = {'depth': depth} if depth else {}
+        return self.get(f"{self.markets_url}/{ticker}/orderbook", params).get('orderbook', {})
+
+    async def get_orderbooks_async(self, tickers: List[str], depth: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the order books of several markets concurrently.
+
+        Returns:
+            Dict mapping ticker to its order book as for get_orderbook, or to a dict with
+            an 'error' key if it could not be fetched.
+        """
+        paths = [f"{self.markets_url}/{ticker}/orderbook" for ticker in tickers]
+        params = {'depth': depth} if depth else {}
+        results = await self.async_batch_get(paths, [params] * len(paths))
+        orderbooks = {}
+        for ticker, r in zip(tickers, results):
+            if isinstance(r, Exception):
+                orderbooks[ticker] = {"error": str(r)}
+            elif 'error' in r:
+                orderbooks[ticker] = {"error": r['error']}
+            else:
+                orderbooks[ticker] = r.get('orderbook') or {}
+        return orderbooks
+
+    async def iter_pages(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        cursor: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every page of a cursor-paginated endpoint, prefetching the next page.
+
+        While the caller works on one page the request for the following page is already
+        in flight, so at most two pages are held in memory at a time. Each yielded page
+        carries a 'cursor' key; passing it back as `cursor` resumes after that page. Its
+        'fetched_at' key is the unix time the page arrived, which can be well before it
+        is yielded when the caller is slow.
+
+        Args:
+            path: API path of a list endpoint
+            params: Query filters, repeated on every page as the API requires
+            cursor: Cursor to resume from, or None to start at the first page
+
+        Raises:
+            HTTPError: If a page could not be fetched after retries.
+        """
+        async def fetch(page_cursor):
+            page_params = dict(params)
+            if page_cursor:
+                page_params['cursor'] = page_cursor
+            page = await self.async_get(path, page_params)
+            if 'error' in page:
+                raise HTTPError(f"Failed to fetch page of {path}: {page['error']}")
+            # A copy: the body may be shared with the response cache or coalesced callers
+            return {
+                **page,
+                'cursor': page.get('cursor') or page.get('next_cursor') or None,
+                'fetched_at': time.time(),
+            }
+
+        next_page = asyncio.ensure_future(fetch(cursor))
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = asyncio.ensure_future(fetch(page['cursor'])) if page['cursor'] else None
+                yield page
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def _iter_items(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        items_key: str,
+        cursor: Optional[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        async for page in self.iter_pages(path, params, cursor):
+            items = page.get(items_key) or []
+            if not items:
+                return
+            for item in items:
+                yield item
+
+    def iter_events(
+        self,
+        status: Optional[str] = None,
+        series_ticker: Optional[str] = None,
+        with_nested_markets: bool = True,
+        limit: int = 200,
+        cursor: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields events across all pages. Filters match get_events.
+
+        Args:
+            cursor: Cursor to resume from, as returned by get_events or iter_pages
+        """
+        params = {
+            'status': status,
+            'series_ticker': series_ticker,
+            'with_nested_markets': str(with_nested_markets).lower(),
+            'limit': limit,
+        }
+        return self._iter_items(self.events_url, params, 'events', cursor)
+
+    async def iter_events_sharded(
+        self,
+        shards: Iterable[Dict[str, Any]],
+        with_nested_markets: bool = True,
+        limit: int = 200,
+        concurrency: int = 8,
+        retries: int = 3,
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], float]]:
+        """Walks several events listings concurrently and yields their pages as they arrive.
+
+        Each shard is a dict of events filters, such as {'status': 'open'} or
+        {'status': 'closed', 'series_ticker': 'KXBTC'}, walked by its own cursor. Up to
+        `concurrency` shards are walked at once, each prefetching its next page, under the
+        client's rate limiter. A failed page is retried from its shard's cursor.
+
+        Args:
+            shards: Filters of each listing; together they should cover the events wanted.
+            with_nested_markets: Include nested market data in each event
+            limit: Number of results per page (1-200)
+            concurrency: Most shards walked at once.
+            retries: Retries of a shard's page before giving up.
+
+        Yields:
+            For each page, the events no earlier page listed and the unix time the page
+            arrived. Events listed by several shards are yielded once; pages with no new
+            events are skipped.
+
+        Raises:
+            Exception: The last error of a shard whose page failed after retries.
+        """
+        pages = asyncio.Queue(concurrency * 2)
+        walking = asyncio.Semaphore(concurrency)
+
+        async def walk(shard):
+            params = {'with_nested_markets': str(with_nested_markets).lower(), 'limit': limit}
+            params.update({k: v for k, v in shard.items() if v is not None})
+            cursor = None
+            failures = 0
+            async with walking:
+                while True:
+                    try:
+                        async for page in self.iter_pages(self.events_url, params, cursor=cursor):
+                            if not page.get('events'):
+                                return
+                            await pages.put((page['events'], page['fetched_at']))
+                            cursor = page['cursor']
+                            failures = 0
+                        return
+                    except Exception:
+                        failures += 1
+                        if failures > retries:
+                            raise
+                        await asyncio.sleep(_retry_delay(failures, None))
+
+        async def walk_all(tasks):
+            try:
+                await asyncio.gather(*tasks)
+            except Exception as e:
+                await pages.put(e)
+            else:
+                await pages.put(None)
+
+        tasks = [asyncio.ensure_future(walk(shard)) for shard in shards]
+        finisher = asyncio.ensure_future(walk_all(tasks))
+        seen = set()
+        try:
+            while True:
+                item = await pages.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                page_events, fetched_at = item
+                events = [event for event in page_events if event['event_ticker'] not in seen]
+                seen.update(event['event_ticker'] for event in events)
+                if events:
+                    yield events, fetched_at
+        finally:
+            finisher.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def get_series_async(self, category: str) -> List[Dict[str, Any]]:
+        """Retrieves every series in a category. The endpoint requires a category and
+        returns all of its series in one response.
+
+        Args:
+            category: Category of the series, e.g. "Economics"
+
+        Raises:
+            HTTPError: If the series could not be fetched after retries.
+        """
+        response = await self.async_get(self.series_url, {'category': category})
+        if 'error' in response:
+            raise HTTPError(f"Failed to fetch series of {category}: {response['error']}")
+        return response.get('series') or []
+
+    async def event_shards(
+        self,
+        statuses: Iterable[str],
+        categories: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Returns events filters for iter_events_sharded.
+
+        Args:
+            statuses: Event statuses to cover; one shard per status.
+            categories: When given, one shard per series of these categories and status
+                instead. Events of series outside these categories are not covered.
+        """
+        statuses = list(statuses)
+        if categories is None:
+            return [{'status': status} for status in statuses]
+        series_lists = await asyncio.gather(*(self.get_series_async(category) for category in categories))
+        series_tickers = dict.fromkeys(series['ticker'] for series_list in series_lists for series in series_list)
+        return [
+            {'status': status, 'series_ticker': series_ticker}
+            for series_ticker in series_tickers for status in statuses
+        ]
+
+    def iter_markets(
+        self,
+        event_ticker: Optional[str] = None,
+        series_ticker: Optional[str] = None,
+        status: Optional[str] = None,
+        tickers: Optional[List[str]] = None,
+        min_close_ts: Optional[int] = None,
+        max_close_ts: Optional[int] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields markets across all pages of the markets list endpoint.
+
+        Args:
+            event_ticker: Event ticker to retrieve markets for
+            series_ticker: Series ticker to retrieve markets for
+            status: Comma separated list of statuses (unopened, open, closed, settled)
+            tickers: Restrict to these market tickers
+            min_close_ts: Only markets closing at or after this unix timestamp
+            max_close_ts: Only markets closing at or before this unix timestamp
+            limit: Number of results per page (1-1000)
+            cursor: Cursor to resume from
+        """
+        params = {
+            'event_ticker': event_ticker,
+            'series_ticker': series_ticker,
+            'status': status,
+            'tickers': ','.join(tickers) if tickers else None,
+            'min_close_ts': min_close_ts,
+            'max_close_ts': max_close_ts,
+            'limit': limit,
+        }
+        return self._iter_items(self.markets_url, params, 'markets', cursor)
+
+    def iter_trades(
+        self,
+        ticker: Optional[str] = None,
+        min_ts: Optional[int] = None,
+        max_ts: Optional[int] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields trades across all pages. Filters match get_trades.
+
+        Args:
+            limit: Number of results per page (1-1000)
+            cursor: Cursor to resume from
+        """
+        params = {
+            'ticker': ticker,
+            'min_ts': min_ts,
+            'max_ts': max_ts,
+            'limit': limit,
+        }
+        return self._iter_items(self.markets_url + '/trades', params, 'trades', cursor)
+
 class KalshiWebSocketClient(KalshiBaseClient):
     """Client for handling WebSocket connections to the Kalshi API."""
     def __init__(
@@ -424,46 +1131,184 @@ class KalshiWebSocketClient(KalshiBaseClient):
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
         max_workers: int = 10,
+        signer: Optional[Any] = None,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        overflow: str = "block",
+        conflate_channels: Iterable[str] = ("ticker",),
+        log_messages: bool = False,
+        channels: Iterable[str] = ("ticker",),
+        recorder: Optional[Any] = None,
+        metrics: bool = False,
+        metrics_interval: Optional[float] = None,
+        frame_filter: Optional[FrameFilter] = None,
+        compact_tickers: bool = False
     ):
-        super().__init__(key_id, private_key, environment, max_workers)
+        """Initializes the WebSocket client.
+
+        Args:
+            max_queue: Parsed messages held between the socket reader and the handlers.
+            batch_size: Most messages handed to a batch handler in one call.
+            overflow: What to do when the queue is full: "block", "drop_oldest" or
+                "conflate" (see ws_dispatch.Dispatcher).
+            conflate_channels: Snapshot channels that "conflate" may collapse per ticker.
+            log_messages: Print every raw message received.
+            channels: Channels subscribed for every market when the connection opens. Pass
+                () to start without subscriptions and add them with subscribe().
+            recorder: ws_capture.CaptureRecorder that every raw frame is appended to, for
+                replaying later with ws_capture.CaptureReader.
+            metrics: Keep per-channel histograms of exchange-to-receive latency, queueing
+                delay and handler run time in self.metrics (see ws_metrics.py).
+            metrics_interval: Print a metrics summary this often, in seconds, while
+                connected. Implies metrics.
+            frame_filter: ws_fastpath.FrameFilter choosing which frames are parsed at all,
+                from their type and ticker read off the raw frame.
+            compact_tickers: Decode ticker messages into ws_fastpath.TickerUpdate tuples
+                instead of nested dicts. Handlers of the ticker channel then receive tuples.
+        """
+        super().__init__(key_id, private_key, environment, max_workers, signer)
         self.ws = None
         self.url_suffix = "/trade-api/ws/v2"
         self.message_id = 1  # Add counter for message IDs
         self.reconnect_delay = 1  # Initial reconnect delay in seconds
         self.max_reconnect_delay = 30  # Maximum reconnect delay
-        self.message_handlers = []  # List of message handler callbacks
+        self.log_messages = log_messages
+        self.recorder = recorder
+        self.metrics = WebSocketMetrics() if metrics or metrics_interval else None
+        self.metrics_interval = metrics_interval
+        self.frame_filter = frame_filter
+        self.compact_tickers = compact_tickers
+        self.reconnects = 0
+        self._resync_tasks = set()
+        self.dispatcher = Dispatcher(
+            max_queue=max_queue,
+            batch_size=batch_size,
+            overflow=overflow,
+            conflate_channels=conflate_channels,
+            executor=self.thread_executor,
+            metrics=self.metrics
+        )
+        self.orderbooks = OrderBookManager(on_gap=self._on_orderbook_gap)
+        self.dispatcher.add_handler(
+            self.orderbooks.handle, channels=ORDERBOOK_CHANNELS + (ACK_CHANNEL,), inline=True
+        )
+        self.markets = MarketStateStore()
+        self.dispatcher.add_handler(self.markets.handle, channels=[TICKER_CHANNEL], inline=True)
+        self.subscriptions = SubscriptionManager()
+        if channels:
+            self.subscriptions.subscriptions.append(Subscription(channels))
 
     async def connect(self, auto_reconnect=True):
         """Establishes a WebSocket connection using authentication."""
         host = self.WS_BASE_URL + self.url_suffix
-        auth_headers = self.request_headers("GET", self.url_suffix)
+        self.dispatcher.start()
+        reporter = None
+        if self.metrics is not None and self.metrics_interval:
+            reporter = asyncio.ensure_future(self.metrics.report_every(self.metrics_interval))
         
-        while True:
-            try:
-                async with websockets.connect(host, additional_headers=auth_headers) as websocket:
-                    self.ws = websocket
-                    self.reconnect_delay = 1  # Reset reconnect delay on successful connection
-                    await self.on_open()
-                    await self.handler()
-            except Exception as e:
-                await self.on_error(e)
-                
-                if not auto_reconnect:
-                    break
+        try:
+            while True:
+                # Sign every attempt; the server rejects stale timestamps
+                auth_headers = await self.async_request_headers("GET", self.url_suffix)
+                try:
+                    async with websockets.connect(host, additional_headers=auth_headers) as websocket:
+                        self.ws = websocket
+                        self.reconnect_delay = 1  # Reset reconnect delay on successful connection
+                        try:
+                            await self.on_open()
+                            await self.handler()
+                        finally:
+                            self.ws = None
+                            self.subscriptions.disconnected()
+                            if self.recorder is not None:
+                                self.recorder.flush()
+                            self.orderbooks.disconnected()
+                except Exception as e:
+                    await self.on_error(e)
                     
-                # Exponential backoff for reconnect
-                print(f"Reconnecting in {self.reconnect_delay} seconds...")
-                await asyncio.sleep(self.reconnect_delay)
-                self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
+                    if not auto_reconnect:
+                        break
+                        
+                    # Exponential backoff for reconnect
+                    print(f"Reconnecting in {self.reconnect_delay} seconds...")
+                    await asyncio.sleep(self.reconnect_delay)
+                    self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
+                self.reconnects += 1
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            await self.dispatcher.stop()
 
-    def add_message_handler(self, handler: Callable[[dict], None]):
-        """Add a callback function to handle incoming messages."""
-        self.message_handlers.append(handler)
+    def add_message_handler(
+        self,
+        handler: Callable[[dict], Any],
+        channels: Optional[Iterable[str]] = None,
+        tickers: Optional[Iterable[str]] = None
+    ):
+        """Add a callback called once per incoming message.
+
+        Handlers run on the thread pool (or the event loop for coroutine functions), one
+        batch at a time, so a slow handler delays later messages but never the socket.
+        Use add_batch_handler to receive whole batches instead.
+
+        Args:
+            handler: Function or coroutine function taking one parsed message.
+            channels: Only deliver these message types, e.g. ["ticker"]. None for all.
+            tickers: Only deliver messages about these market tickers. None for all.
+        """
+        if asyncio.iscoroutinefunction(handler):
+            async def per_message(messages):
+                for message in messages:
+                    await handler(message)
+        else:
+            def per_message(messages):
+                for message in messages:
+                    handler(message)
+        per_message.__name__ = getattr(handler, "__name__", "handler")
+        self.dispatcher.add_handler(per_message, channels, tickers)
+
+    def add_batch_handler(
+        self,
+        handler: Callable[[List[dict]], Any],
+        channels: Optional[Iterable[str]] = None,
+        tickers: Optional[Iterable[str]] = None,
+        inline: bool = False
+    ):
+        """Add a callback called with lists of incoming messages, see Dispatcher.add_handler."""
+        self.dispatcher.add_handler(handler, channels, tickers, inline)
 
     async def on_open(self):
         """Callback when WebSocket connection is opened."""
         print("WebSocket connection opened.")
-        await self.subscribe_to_tickers()
+        await self.subscriptions.replay(self.send_command)
+
+    async def send_command(self, cmd: str, params: Dict[str, Any]) -> int:
+        """Sends a command on the open connection and returns its message id."""
+        message_id = self.message_id
+        self.message_id += 1
+        await self.ws.send(json.dumps({"id": message_id, "cmd": cmd, "params": params}))
+        return message_id
+
+    async def subscribe(self, channels: Iterable[str], tickers: Optional[Iterable[str]] = None) -> Subscription:
+        """Subscribe to channels for market tickers, or for every market if tickers is None.
+
+        Subscriptions made before connect() are sent once the connection opens, and all of
+        them are renewed after every reconnect. Change the tickers of the returned
+        subscription with add_tickers / remove_tickers.
+        """
+        return await self.subscriptions.subscribe(channels, tickers)
+
+    async def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription."""
+        await self.subscriptions.unsubscribe(subscription)
+
+    async def add_tickers(self, subscription: Subscription, tickers: Iterable[str]):
+        """Add market tickers to a live subscription."""
+        await self.subscriptions.add_tickers(subscription, tickers)
+
+    async def remove_tickers(self, subscription: Subscription, tickers: Iterable[str]):
+        """Remove market tickers from a live subscription."""
+        await self.subscriptions.remove_tickers(subscription, tickers)
 
     async def subscribe_to_tickers(self, tickers=None):
         """Subscribe to ticker updates for markets.
@@ -471,17 +1316,52 @@ class KalshiWebSocketClient(KalshiBaseClient):
         Args:
             tickers: Optional list of specific tickers to subscribe to. If None, subscribes to all.
         """
-        params = {"channels": ["ticker"]}
-        if tickers:
-            params["tickers"] = tickers
-            
-        subscription_message = {
-            "id": self.message_id,
-            "cmd": "subscribe",
-            "params": params
+        return await self.subscribe(["ticker"], tickers or None)
+
+    async def subscribe_to_orderbooks(self, tickers: Iterable[str]):
+        """Subscribe to order book snapshots and deltas for markets, kept in self.orderbooks.
+
+        The server sends an orderbook_snapshot for each market followed by orderbook_delta
+        updates. Markets are added to a single order book subscription.
+
+        Args:
+            tickers: Market tickers to track.
+        """
+        subscription = self.subscriptions.find(["orderbook_delta"])
+        if subscription is None:
+            return await self.subscribe(["orderbook_delta"], tickers)
+        await self.add_tickers(subscription, tickers)
+        return subscription
+
+    def _on_orderbook_gap(self, tickers: List[str]):
+        """Starts resyncing the books a sequence gap made stale."""
+        task = asyncio.ensure_future(self.resync_orderbooks(tickers))
+        self._resync_tasks.add(task)
+        task.add_done_callback(self._resync_tasks.discard)
+
+    async def resync_orderbooks(self, tickers: List[str]):
+        """Reloads the order books of markets from a fresh snapshot.
+
+        The markets are removed from and re-added to the live subscription, so the server
+        sends an orderbook_snapshot for each in the sequenced stream. A REST order book
+        carries no sequence number, so the deltas queued around it could not be told
+        apart from the ones it already covers.
+        """
+        subscription = self.subscriptions.find(["orderbook_delta"])
+        if subscription is not None:
+            await self.subscriptions.refresh(subscription, tickers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns connection, queue and order book metrics, including gap and resync counts."""
+        return {
+            "reconnects": self.reconnects,
+            "subscription_errors": self.subscriptions.errors,
+            "dispatcher": self.dispatcher.stats(),
+            "orderbooks": self.orderbooks.stats(),
+            "markets": self.markets.stats(),
+            "metrics": self.metrics.snapshot() if self.metrics is not None else None,
+            "frame_filter": self.frame_filter.stats() if self.frame_filter is not None else None,
         }
-        await self.ws.send(json.dumps(subscription_message))
-        self.message_id += 1
 
     async def handler(self):
         """Handle incoming messages."""
@@ -494,23 +1374,45 @@ class KalshiWebSocketClient(KalshiBaseClient):
             await self.on_error(e)
 
     async def on_message(self, message):
-        """Callback for handling incoming messages."""
+        """Callback for handling incoming messages.
+
+        Parses the frame and queues it for the dispatcher, so the reader goes back to the
+        socket without waiting on handlers (unless the queue is full under "block"). With a
+        frame_filter, unwanted frames are dropped before parsing; with compact_tickers,
+        ticker frames are decoded straight into ws_fastpath.TickerUpdate tuples.
+        """
+        if self.recorder is not None:
+            self.recorder.record(message)
+        if self.log_messages:
+            print("Received message:", message)
+        channel = None
+        if self.frame_filter is not None or self.compact_tickers:
+            channel, ticker = peek(message)
+            if self.frame_filter is not None and not self.frame_filter.wants(channel, ticker):
+                return
         try:
-            data = json.loads(message)
-            
-            # Process with all registered handlers
-            for handler in self.message_handlers:
-                # Run handlers in executor to avoid blocking the event loop
-                await asyncio.get_event_loop().run_in_executor(
-                    self.thread_executor, 
-                    handler, 
-                    data
-                )
-        except Exception as e:
+            if channel == TICKER_CHANNEL and self.compact_tickers:
+                try:
+                    data = decode_ticker(message)
+                except DECODE_ERRORS:
+                    data = json.loads(message)  # Not the usual ticker shape
+            else:
+                data = json.loads(message)
+        except ValueError as e:
             print(f"Error processing message: {e}")
-        
-        # For backward compatibility
-        print("Received message:", message)
+            return
+        channel = message_channel(data)
+        if self.metrics is not None:
+            self.metrics.record_receive(channel, data, time.time())
+        if channel in CONTROL_CHANNELS:
+            # Replies to commands skip the queue so no overflow policy can drop them
+            await self.subscriptions.handle([data])
+            if channel == ACK_CHANNEL and data.get("seq") is not None:
+                # The ack takes a seq of its sid's sequence; the order books must count
+                # it in order with the deltas queued before it
+                await self.dispatcher.put(data)
+        else:
+            await self.dispatcher.put(data)
 
     async def on_error(self, error):
         """Callback for handling errors."""
@@ -518,4 +1420,94 @@ class KalshiWebSocketClient(KalshiBaseClient):
 
     async def on_close(self, close_status_code, close_msg):
         """Callback when WebSocket connection is closed."""
-        print("WebSocket connection closed with code:", close_status_code, "and message:", close_msg)
\ No newline at end of file
+        print("WebSocket connection closed with code:", close_status_code, "and message:", close_msg)
+
+class ShardedWebSocketClient:
+    """Spreads market subscriptions over several WebSocket connections.
+
+    Each ticker belongs to one shard (subscriptions.shard_of), and each shard is a
+    KalshiWebSocketClient with its own connection, queue and handler task, so a large
+    ticker set's message load is split across sockets. Handlers are registered on every
+    shard and may run concurrently for different shards. To spread the load across cores,
+    run one process per shard and have each subscribe only to its own tickers.
+    """
+    def __init__(
+        self,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        environment: Environment = Environment.DEMO,
+        shards: int = 4,
+        **client_options
+    ):
+        """Initializes the shards.
+
+        Args:
+            shards: Number of connections.
+            client_options: Passed to every KalshiWebSocketClient. channels defaults to ()
+                here, since subscriptions are made per ticker with subscribe().
+        """
+        client_options.setdefault("channels", ())
+        self.clients = [
+            KalshiWebSocketClient(key_id, private_key, environment, **client_options)
+            for _ in range(shards)
+        ]
+
+    def shard(self, ticker: str) -> KalshiWebSocketClient:
+        """Returns the client whose connection carries a market ticker."""
+        return self.clients[shard_of(ticker, len(self.clients))]
+
+    def _by_shard(self, tickers: Iterable[str]) -> Dict[int, List[str]]:
+        groups = {}
+        for ticker in tickers:
+            groups.setdefault(shard_of(ticker, len(self.clients)), []).append(ticker)
+        return groups
+
+    async def connect(self, auto_reconnect=True):
+        """Connects every shard and runs them until they all stop."""
+        await asyncio.gather(*(client.connect(auto_reconnect) for client in self.clients))
+
+    def add_message_handler(self, handler: Callable[[dict], Any], **routing):
+        """Add a per-message callback to every shard, see KalshiWebSocketClient.add_message_handler."""
+        for client in self.clients:
+            client.add_message_handler(handler, **routing)
+
+    def add_batch_handler(self, handler: Callable[[List[dict]], Any], **routing):
+        """Add a batch callback to every shard, see KalshiWebSocketClient.add_batch_handler."""
+        for client in self.clients:
+            client.add_batch_handler(handler, **routing)
+
+    async def subscribe(self, channels: Iterable[str], tickers: Iterable[str]):
+        """Subscribe each shard to channels for its share of tickers.
+
+        Tickers are added to a shard's existing subscription to the same channels if it
+        has one, so repeated calls grow one subscription per shard.
+        """
+        channels = tuple(channels)
+        for index, group in self._by_shard(tickers).items():
+            manager = self.clients[index].subscriptions
+            subscription = manager.find(channels)
+            if subscription is None:
+                await manager.subscribe(channels, group)
+            else:
+                await manager.add_tickers(subscription, group)
+
+    async def unsubscribe(self, channels: Iterable[str], tickers: Iterable[str]):
+        """Remove tickers from each shard's subscription to channels."""
+        channels = tuple(channels)
+        for index, group in self._by_shard(tickers).items():
+            manager = self.clients[index].subscriptions
+            subscription = manager.find(channels)
+            if subscription is not None:
+                await manager.remove_tickers(subscription, group)
+
+    async def subscribe_to_orderbooks(self, tickers: Iterable[str]):
+        """Track order books for markets on their shards, see orderbook()."""
+        await self.subscribe(["orderbook_delta"], tickers)
+
+    def orderbook(self, ticker: str):
+        """Returns the local order book of a market, or None if none was received."""
+        return self.shard(ticker).orderbooks.get(ticker)
+
+    def market(self, ticker: str):
+        """Returns the live state record of a market, or None if it is unknown."""
+        return self.shard(ticker).markets.get(ticker)
@@ -0,0 +1,260 @@
+"""Columnar export of crawl records to Parquet or Arrow IPC files.
+
+Records are written while the crawl runs, into a hive-partitioned dataset keyed by
+snapshot date (the day the crawl started) and event category:
+
+    exports/kalshi_markets/snapshot_date=2025-05-10/event_category=Politics/20250510_213737-00003.parquet
+
+Each partition file gets a row group per ROW_GROUP_SIZE records. Prices, volumes and
+times are typed columns. raw_data holds each market's JSON in its own zstd-compressed
+column, so a read that selects other columns never decompresses it:
+
+    import pyarrow.dataset as ds
+    table = ds.dataset("exports/kalshi_markets", format="parquet", partitioning="hive").to_table(
+        columns=["market_ticker", "last_price"], filter=ds.field("snapshot_date") == "2025-05-10")
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from decoding import LazyView, json_default
+from delta_sync import close_timestamp
+
+# Optional: pyarrow writes both formats
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+ROW_GROUP_SIZE = 10000
+
+if pa is not None:
+    # Partition columns (snapshot_date, event_category) live in the directory names
+    MARKET_SCHEMA = pa.schema([
+        ("event_ticker", pa.string()),
+        ("market_ticker", pa.string()),
+        ("market_title", pa.string()),
+        ("status", pa.string()),
+        ("market_type", pa.string()),
+        ("close_time", pa.timestamp("s", tz="UTC")),
+        ("last_price", pa.float64()),
+        ("yes_bid", pa.float64()),
+        ("yes_ask", pa.float64()),
+        ("volume_24h", pa.int64()),
+        ("open_interest", pa.int64()),
+        ("timestamp", pa.timestamp("s")),
+        ("raw_data", pa.binary()),
+    ])
+    _STRING_COLUMNS = ["event_ticker", "market_ticker", "market_title", "status", "market_type"]
+    _NUMBER_COLUMNS = ["last_price", "yes_bid", "yes_ask", "volume_24h", "open_interest"]
+
+def _raw_json(value: Any) -> Optional[bytes]:
+    """Encodes raw_data as JSON bytes, reusing a lazy view's original bytes."""
+    if value is None:
+        return None
+    if isinstance(value, LazyView):
+        return value.to_json()
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
+
+def records_to_table(records: List[Dict[str, Any]]) -> Any:
+    """Converts crawl records (see main.build_market_record) to a MARKET_SCHEMA table."""
+    columns = {}
+    for name in _STRING_COLUMNS:
+        columns[name] = pa.array([record.get(name) for record in records], pa.string())
+    closes = []
+    for record in records:
+        close = close_timestamp(record.get('close_time'))
+        closes.append(int(close) if close is not None else None)
+    columns["close_time"] = pa.array(closes, pa.int64()).cast(pa.timestamp("s", tz="UTC"))
+    for name in _NUMBER_COLUMNS:
+        columns[name] = pa.array([record.get(name) for record in records], MARKET_SCHEMA.field(name).type)
+    columns["timestamp"] = pc.strptime(
+        pa.array([record.get('timestamp') for record in records], pa.string()),
+        format="%Y-%m-%d %H:%M:%S", unit="s", error_is_null=True
+    )
+    columns["raw_data"] = pa.array([_raw_json(record.get('raw_data')) for record in records], pa.binary())
+    return pa.table([columns[field.name] for field in MARKET_SCHEMA], schema=MARKET_SCHEMA)
+
+class ColumnarExporter:
+    """Streams crawl records into a partitioned Parquet or Arrow IPC dataset.
+
+    Records are buffered per partition and written as a row group once a partition has
+    row_group_size of them; close() writes the rest and finishes every file. Each
+    exporter writes its own files, named after the time it was created, so repeated
+    runs add snapshots to the same dataset.
+
+    Each market_ticker appears once in an exporter's files and the last record written
+    for it wins, as in the crawl's checkpoint, whatever partition each record fell in. A
+    record still buffered is simply replaced. A record already written is kept until
+    close(), which rewrites the files holding superseded rows without them.
+    """
+    def __init__(
+        self,
+        directory: str,
+        format: str = "parquet",
+        row_group_size: int = ROW_GROUP_SIZE,
+        compression: str = "snappy",
+        raw_compression: str = "zstd",
+        snapshot_date: Optional[str] = None,
+    ):
+        """Initializes the exporter.
+
+        Args:
+            directory: Dataset root; partition directories are created under it.
+            format: "parquet" or "arrow" (Arrow IPC file, i.e. Feather v2).
+            row_group_size: Records per partition buffered before each write.
+            compression: Parquet codec for the typed columns.
+            raw_compression: Parquet codec for raw_data; Arrow IPC files use it for every
+                column, since IPC compression is per file.
+            snapshot_date: Partition date (YYYY-MM-DD) of every record; defaults to the
+                day the exporter was created, so a crawl past midnight stays in one
+                snapshot.
+        """
+        if pa is None:
+            raise ImportError("ColumnarExporter requires the pyarrow package (pip install pyarrow)")
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {sorted(FORMATS)}, not {format!r}")
+        self.directory = directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.raw_compression = raw_compression
+        self.run = time.strftime('%Y%m%d_%H%M%S')
+        self.snapshot_date = snapshot_date or time.strftime('%Y-%m-%d')
+        self.rows = 0
+        self.row_groups = 0
+        self.duplicates = 0
+        self.paths = []
+        self._buffers = {}  # (snapshot date, category) -> {market ticker: record}
+        self._buffered = {}  # market ticker -> partition of its buffered record
+        self._positions = {}  # market ticker -> (file index, row) of its written record
+        self._file_rows = []  # Rows written to each file, by file index
+        self._superseded = {}  # file index -> rows replaced by a later record
+        self._writers = {}  # (snapshot date, category) -> (writer, sink, file index)
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Adds records, writing a row group for each partition that has filled up."""
+        for record in records:
+            ticker = record.get('market_ticker')
+            key = (self.snapshot_date, record.get('event_category') or 'N/A')
+            buffered = self._buffered.get(ticker)
+            if buffered is not None:
+                del self._buffers[buffered][ticker]  # Also when its category changed
+                self.duplicates += 1
+            elif ticker in self._positions:
+                self.duplicates += 1
+            buffer = self._buffers.setdefault(key, {})
+            buffer[ticker] = record
+            self._buffered[ticker] = key
+            if len(buffer) >= self.row_group_size:
+                self._flush(key)
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        records = self._buffers.pop(key, None)
+        if not records:
+            return
+        writer = self._writers.get(key)
+        if writer is None:
+            writer = self._writers[key] = self._open(key)
+        index = writer[2]
+        row = self._file_rows[index]
+        for ticker in records:
+            del self._buffered[ticker]
+            previous = self._positions.get(ticker)
+            if previous is not None:
+                self._superseded.setdefault(previous[0], set()).add(previous[1])
+            self._positions[ticker] = (index, row)
+            row += 1
+        self._file_rows[index] = row
+        records = list(records.values())
+        writer[0].write_table(records_to_table(records))
+        self.rows += len(records)
+        self.row_groups += 1
+
+    def _open(self, key: Tuple[str, str]) -> Tuple[Any, Any, int]:
+        snapshot_date, category = key
+        directory = os.path.join(
+            self.directory, f"snapshot_date={quote(snapshot_date, safe='')}",
+            f"event_category={quote(category, safe='')}"
+        )
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.run}-{len(self.paths):05d}{FORMATS[self.format]}")
+        self.paths.append(path)
+        self._file_rows.append(0)
+        return self._new_writer(path) + (len(self.paths) - 1,)
+
+    def _new_writer(self, path: str) -> Tuple[Any, Any]:
+        if self.format == "parquet":
+            compression = {name: self.compression for name in MARKET_SCHEMA.names}
+            compression["raw_data"] = self.raw_compression
+            return pq.ParquetWriter(path, MARKET_SCHEMA, compression=compression, use_dictionary=_STRING_COLUMNS), None
+        sink = pa.OSFile(path, "wb")
+        options = pa.ipc.IpcWriteOptions(compression=self.raw_compression)
+        return pa.ipc.new_file(sink, MARKET_SCHEMA, options=options), sink
+
+    def _read(self, path: str) -> Any:
+        if self.format == "parquet":
+            return pq.ParquetFile(path).read().cast(MARKET_SCHEMA)  # Parquet stores seconds as ms
+        with pa.OSFile(path, "rb") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _drop_superseded(self) -> None:
+        """Rewrites each file holding rows a later record replaced, without those rows."""
+        emptied = set()
+        for index, rows in sorted(self._superseded.items()):
+            path = self.paths[index]
+            table = self._read(path)
+            keep = [row not in rows for row in range(table.num_rows)]
+            table = table.filter(pa.array(keep, pa.bool_()))
+            self.rows -= len(rows)
+            if not table.num_rows:
+                os.remove(path)
+                emptied.add(path)
+                continue
+            temp_path = path + ".tmp"
+            writer, sink = self._new_writer(temp_path)
+            for batch in table.to_batches(max_chunksize=self.row_group_size):
+                writer.write_table(pa.Table.from_batches([batch], schema=MARKET_SCHEMA))
+            writer.close()
+            if sink is not None:
+                sink.close()
+            os.replace(temp_path, path)
+        self._superseded = {}
+        self.paths = [path for path in self.paths if path not in emptied]
+
+    def close(self) -> List[str]:
+        """Writes the buffered records, finishes every file and drops superseded rows.
+
+        Returns:
+            The files written.
+        """
+        for key in list(self._buffers):
+            self._flush(key)
+        for writer, sink, _ in self._writers.values():
+            writer.close()
+            if sink is not None:
+                sink.close()
+        self._writers = {}
+        self._drop_superseded()
+        return self.paths
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "row_groups": self.row_groups,
+            "files": len(self.paths),
+            "duplicates": self.duplicates,
+            "buffered": sum(len(buffer) for buffer in self._buffers.values()),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
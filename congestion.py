@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+# Statuses that mean the server wants us to slow down
+CONGESTION_STATUSES = (429, 503)
+# Statuses worth retrying; other 4xx answers will not change on a retry
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryBudget:
+    """A pool of retries shared by every request of one batch.
+
+    Once it is spent, failing requests return their error instead of retrying, so a
+    struggling server sees at most len(batch) + budget requests from the batch.
+    """
+    def __init__(self, retries: int):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+class ConcurrencyController:
+    """AIMD window limiting how many requests are in flight across all callers.
+
+    The window grows by about one request per round trip while requests succeed and is
+    halved on a congestion signal: a 429/503 or a timeout. Optionally, smoothed latency
+    rising above latency_threshold times the best latency seen recently also counts; that
+    signal assumes requests of broadly similar cost, so it is off by default (a crawl
+    mixing cheap list pages with slower detail GETs would trip it constantly). The window
+    is halved at most once per smoothed round trip, so a burst of failures from the same
+    moment counts once.
+    A Retry-After from the server pauses every caller until it has passed.
+
+    Meant to be used from coroutines; the window is shared by all callers on the loop.
+    """
+    def __init__(
+        self,
+        initial_window: int = 20,
+        min_window: int = 1,
+        max_window: int = 64,
+        latency_threshold: Optional[float] = None,
+        latency_samples: int = 200
+    ):
+        """Initializes the controller.
+
+        Args:
+            initial_window: Requests allowed in flight before any feedback.
+            min_window: The window never shrinks below this.
+            max_window: The window never grows above this, e.g. the connection pool size.
+            latency_threshold: Ratio of smoothed to baseline latency treated as congestion,
+                e.g. 3.0 for uniform requests, or None (the default) to ignore latency.
+            latency_samples: Recent successes the baseline (minimum) latency is taken over.
+        """
+        self.window = float(min(max(initial_window, min_window), max_window))
+        self.min_window = min_window
+        self.max_window = max_window
+        self.latency_threshold = latency_threshold
+        self.in_flight = 0
+        self.paused_until = 0.0
+
+        self._waiters = deque()
+        self._recent_latencies = deque(maxlen=latency_samples)
+        self._smoothed_latency = None
+        self._last_decrease = 0.0
+
+        self.successes = 0
+        self.congestion_events = 0
+        self.decreases = 0
+        self.retries = 0
+
+    async def acquire(self) -> None:
+        """Waits for a slot in the window and for any Retry-After pause to pass.
+
+        Callers are served in arrival order: release() hands a freed slot straight to the
+        longest waiting caller, so a new caller cannot take it first.
+        """
+        await self._wait_pause()
+        if not self._waiters and self.in_flight < int(self.window):
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    self.release()  # Handed a slot just before being cancelled
+                raise
+        try:
+            await self._wait_pause()  # A Retry-After that arrived while queued
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    async def _wait_pause(self) -> None:
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def release(self) -> None:
+        """Gives back a slot taken by acquire."""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hands free slots to waiters in arrival order."""
+        while self._waiters and self.in_flight < int(self.window):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self, latency: float) -> None:
+        """Records a successful request and its latency in seconds."""
+        self.successes += 1
+        self._recent_latencies.append(latency)
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += 0.125 * (latency - self._smoothed_latency)
+
+        if self.latency_threshold and len(self._recent_latencies) >= 10:
+            if self._smoothed_latency > min(self._recent_latencies) * self.latency_threshold:
+                self.on_congestion()
+                return
+        # Additive increase: about one extra slot per window's worth of successes
+        self.window = min(self.max_window, self.window + 1.0 / self.window)
+        self._wake()
+
+    def on_congestion(self, retry_after: Optional[float] = None) -> None:
+        """Records a congestion signal, optionally with the server's Retry-After in seconds."""
+        now = time.monotonic()
+        self.congestion_events += 1
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        if now - self._last_decrease >= (self._smoothed_latency or 0.0):
+            self.window = max(self.min_window, self.window / 2)
+            self._last_decrease = now
+            self.decreases += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current window and counters."""
+        return {
+            "window": int(self.window),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "smoothed_latency": self._smoothed_latency,
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+            "successes": self.successes,
+            "congestion_events": self.congestion_events,
+            "decreases": self.decreases,
+            "retries": self.retries,
+        }
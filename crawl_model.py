@@ -0,0 +1,97 @@
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+class CrawlModel:
+    """Events and market records of one crawl, indexed by ticker.
+
+    Events are stored without their nested markets. The event -> markets, market -> event
+    and category -> events relations are built once as events are added, so every lookup
+    the summary and export need is a dict access and a pass over all markets is linear.
+    Market records are the flat dicts built by main.build_market_record, kept in the
+    order they were added; adding a record for a ticker again replaces it. Records added
+    since the last take_added() are kept aside so checkpoints can write only those.
+    """
+    def __init__(self):
+        self.events = {}  # event ticker -> event without 'markets'
+        self.markets = {}  # market ticker -> market record
+        self.event_markets = {}  # event ticker -> market tickers listed by the event
+        self.market_event = {}  # market ticker -> event ticker
+        self.category_events = {}  # category -> event tickers
+        self._added = []
+
+    def add_events(self, events: Iterable[Mapping[str, Any]]) -> None:
+        """Indexes events as returned by the events endpoint, with or without nested markets.
+
+        An event listed again without nested markets keeps the markets indexed before.
+        """
+        for event in events:
+            event_ticker = event['event_ticker']
+            if event_ticker not in self.events:
+                self.category_events.setdefault(event.get('category', 'N/A'), []).append(event_ticker)
+            self.events[event_ticker] = {k: v for k, v in event.items() if k != 'markets'}
+            if event.get('markets') is None and event_ticker in self.event_markets:
+                continue
+            tickers = [market['ticker'] for market in event.get('markets') or []]
+            self.event_markets[event_ticker] = tickers
+            for ticker in tickers:
+                self.market_event[ticker] = event_ticker
+
+    def add_market(self, record: Dict[str, Any], new: bool = True) -> None:
+        """Stores a market record under its 'market_ticker'.
+
+        Args:
+            new: Whether take_added() should return it; False for records restored from
+                a checkpoint.
+        """
+        self.markets[record['market_ticker']] = record
+        if new:
+            self._added.append(record)
+
+    def take_added(self) -> List[Dict[str, Any]]:
+        """Returns the records added since the last call and forgets them."""
+        added, self._added = self._added, []
+        return added
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def __contains__(self, market_ticker: str) -> bool:
+        return market_ticker in self.markets
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.markets.values())
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Returns every market record in the order they were added."""
+        return list(self.markets.values())
+
+    def tickers(self) -> List[str]:
+        """Returns every market ticker listed by the indexed events, in event order."""
+        return [ticker for tickers in self.event_markets.values() for ticker in tickers]
+
+    def event(self, event_ticker: str) -> Dict[str, Any]:
+        """Returns an event's fields, or an empty dict for an unknown event."""
+        return self.events.get(event_ticker, {})
+
+    def event_of(self, market_ticker: str) -> Optional[str]:
+        """Returns the ticker of the event listing a market."""
+        return self.market_event.get(market_ticker)
+
+    def markets_of(self, event_ticker: str) -> List[Dict[str, Any]]:
+        """Returns the records of an event's markets that have one, in the event's order."""
+        markets = self.markets
+        return [markets[t] for t in self.event_markets.get(event_ticker, ()) if t in markets]
+
+    def markets_by_event(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Groups every market record by its event ticker in one pass."""
+        groups = {}
+        for record in self.markets.values():
+            groups.setdefault(record['event_ticker'], []).append(record)
+        return groups
+
+    def category_counts(self) -> Dict[str, int]:
+        """Returns the number of market records per event category."""
+        counts = {}
+        for record in self.markets.values():
+            category = record['event_category']
+            counts[category] = counts.get(category, 0) + 1
+        return counts
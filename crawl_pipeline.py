@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+_DONE = object()
+
+class CrawlPipeline:
+    """Streams tickers through a pool of fetchers to a single writer.
+
+    The producer (whatever run() iterates) puts tickers on a bounded ticker queue as it
+    finds them. Each of `fetchers` workers takes up to batch_size tickers at a time and
+    awaits fetch(batch); results go on a bounded result queue that one writer drains,
+    calling write(ticker, details) for each ticker. Fetchers start the next batch as soon
+    as their last one returns, so no request waits for the slowest of a chunk and the
+    client's rate limiter, not the pipeline, sets the request rate. Full queues push back
+    on the stage before them.
+
+    A fetcher that finds fewer than batch_size tickers queued waits up to `linger`
+    seconds for more while the producer is still running, so bulk requests stay full.
+    """
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        write: Callable[[str, Optional[Any]], Any],
+        fetchers: int = 8,
+        batch_size: int = 1,
+        linger: float = 0.05,
+        max_queue: int = 10000
+    ):
+        """Initializes the pipeline.
+
+        Args:
+            fetch: Coroutine function mapping a batch of tickers to {ticker: details}.
+                If it raises, every ticker of the batch is written as {"error": str(e)}.
+            write: Called once per ticker, in the order results arrive, with the details
+                fetched for it, or None if fetch returned nothing for it. Exceptions are
+                printed and counted, and the pipeline carries on.
+            fetchers: Number of batches in flight at once.
+            batch_size: Most tickers passed to one fetch call.
+            linger: Longest a fetcher waits to fill a batch.
+            max_queue: Bound of the ticker queue; the result queue holds `fetchers` batches.
+        """
+        self.fetch = fetch
+        self.write = write
+        self.fetchers = fetchers
+        self.batch_size = batch_size
+        self.linger = linger
+        self.tickers = asyncio.Queue(max_queue)
+        self.results = asyncio.Queue(fetchers)
+        self.produced = 0
+        self.fetching = 0
+        self.fetched = 0
+        self.batches = 0
+        self.written = 0
+        self.errors = 0
+        self.stopped = False
+        self._producing = False
+        self.started = None
+
+    def stop(self) -> None:
+        """Stops producing and fetching; run() returns once queued tickers are dropped."""
+        self.stopped = True
+
+    async def run(self, tickers: Union[Iterable[str], AsyncIterable[str]]) -> None:
+        """Feeds tickers through the pipeline and returns when all are written or stop() was called."""
+        self.started = time.monotonic()
+        self._producing = True
+        fetchers = [asyncio.ensure_future(self._fetcher()) for _ in range(self.fetchers)]
+        writer = asyncio.ensure_future(self._writer())
+        try:
+            if hasattr(tickers, '__aiter__'):
+                async for ticker in tickers:
+                    if self.stopped:
+                        break
+                    await self._produce(ticker)
+            else:
+                for ticker in tickers:
+                    if self.stopped:
+                        break
+                    await self._produce(ticker)
+            self._producing = False
+            await self.tickers.put(_DONE)
+            await asyncio.gather(*fetchers)
+            self.tickers.get_nowait()  # The end marker the last fetcher passed on
+            await self.results.put(_DONE)
+            await writer
+        finally:
+            self._producing = False
+            for task in fetchers + [writer]:
+                task.cancel()
+
+    async def _produce(self, ticker: str) -> None:
+        await self.tickers.put(ticker)
+        self.produced += 1
+
+    async def _next_batch(self) -> List[Any]:
+        batch = [await self.tickers.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size and batch[-1] is not _DONE:
+            try:
+                batch.append(self.tickers.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if not self._producing or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.tickers.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _fetcher(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            done = batch[-1] is _DONE
+            if done:
+                batch.pop()
+                self.tickers.put_nowait(_DONE)  # Pass the end marker on to the next fetcher
+            if batch and not self.stopped:
+                self.fetching += 1
+                try:
+                    results = await self.fetch(batch)
+                except Exception as e:
+                    results = {ticker: {"error": str(e)} for ticker in batch}
+                finally:
+                    self.fetching -= 1
+                self.batches += 1
+                self.fetched += len(batch)
+                await self.results.put((batch, results))
+            if done:
+                return
+
+    async def _writer(self) -> None:
+        while True:
+            item = await self.results.get()
+            if item is _DONE:
+                return
+            if self.stopped:
+                continue
+            batch, results = item
+            for ticker in batch:
+                try:
+                    self.write(ticker, results.get(ticker))
+                except Exception as e:
+                    print(f"Error writing {ticker}: {e}")
+                    self.errors += 1
+                self.written += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns stage counters and the depth of both queues."""
+        elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        return {
+            "produced": self.produced,
+            "ticker_queue": self.tickers.qsize(),
+            "fetching": self.fetching,
+            "fetched": self.fetched,
+            "batches": self.batches,
+            "result_queue": self.results.qsize(),
+            "written": self.written,
+            "errors": self.errors,
+            "written_per_second": self.written / elapsed if elapsed > 0 else 0.0,
+        }
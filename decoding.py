@@ -0,0 +1,154 @@
+import json
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, List
+
+# Optional faster decoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+def get_decoder(name: str) -> Callable[[bytes], Any]:
+    """Returns a function decoding a JSON document from bytes.
+
+    Args:
+        name: "json" (standard library), "orjson" or "msgspec".
+    """
+    if name == "json":
+        return json.loads
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("json_decoder='orjson' requires the orjson package (pip install orjson)")
+        return orjson.loads
+    if name == "msgspec":
+        if msgspec is None:
+            raise ImportError("json_decoder='msgspec' requires the msgspec package (pip install msgspec)")
+        return msgspec.json.Decoder().decode
+    raise ValueError(f"Invalid JSON decoder: {name}")
+
+if msgspec is not None:
+    _fields_decoder = msgspec.json.Decoder(Dict[str, msgspec.Raw])
+    _items_decoder = msgspec.json.Decoder(List[msgspec.Raw])
+    _value_decoder = msgspec.json.Decoder()
+
+_MISSING = object()
+
+class LazyView(MutableMapping):
+    """Read-mostly mapping over one JSON object that decodes values only when accessed.
+
+    Creating a view just keeps the object's bytes. The first lookup splits the object
+    into its top-level fields without decoding them, and each field is decoded the first
+    time it is read. Nested objects, and lists of objects such as an event's markets,
+    become views themselves, so a crawl that reads a dozen fields of each market never
+    builds the rest. The original bytes stay available as `raw`.
+
+    Values assigned to a view override the decoded ones. Requires msgspec.
+    """
+    __slots__ = ("raw", "_fields", "_values", "_modified")
+
+    def __init__(self, raw: bytes):
+        if msgspec is None:
+            raise ImportError("LazyView requires the msgspec package (pip install msgspec)")
+        self.raw = raw
+        self._fields = None
+        self._values = {}
+        self._modified = False
+
+    def _split(self) -> Dict[str, Any]:
+        if self._fields is None:
+            self._fields = _fields_decoder.decode(self.raw)
+        return self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = _decode_value(bytes(self._split()[key]))
+        self._values[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values[key] = value
+        self._modified = True
+
+    def __delitem__(self, key: str) -> None:
+        in_fields = self._split().pop(key, _MISSING) is not _MISSING
+        in_values = self._values.pop(key, _MISSING) is not _MISSING
+        if not (in_fields or in_values):
+            raise KeyError(key)
+        self._modified = True
+
+    def __iter__(self):
+        fields = self._split()
+        yield from fields
+        for key in self._values:
+            if key not in fields:
+                yield key
+
+    def __len__(self) -> int:
+        fields = self._split()
+        return len(fields) + sum(1 for key in self._values if key not in fields)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._values or key in self._split()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fully decodes the object into plain dicts and lists, with assignments and deletions."""
+        values = self._values
+        result = {}
+        for key, raw in self._split().items():
+            result[key] = _plain(values[key]) if key in values else _value_decoder.decode(bytes(raw))
+        for key, value in values.items():
+            if key not in result:
+                result[key] = _plain(value)
+        return result
+
+    def modified(self) -> bool:
+        """Whether a value was assigned or deleted here or in a nested view already read."""
+        if self._modified:
+            return True
+        for value in self._values.values():
+            items = value if isinstance(value, list) else (value,)
+            if any(isinstance(item, LazyView) and item.modified() for item in items):
+                return True
+        return False
+
+    def to_json(self) -> bytes:
+        """Returns the object as JSON bytes, reusing `raw` unless the view was modified."""
+        if not self.modified():
+            return self.raw
+        return json.dumps(self.to_dict(), separators=(",", ":")).encode()
+
+    def __repr__(self) -> str:
+        return f"LazyView({len(self.raw)} bytes)"
+
+def _decode_value(raw: bytes) -> Any:
+    if raw[:1] == b'{':
+        return LazyView(raw)
+    if raw[:1] == b'[':
+        items = [bytes(item) for item in _items_decoder.decode(raw)]
+        if items and all(item[:1] == b'{' for item in items):
+            return [LazyView(item) for item in items]
+    return _value_decoder.decode(raw)
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, LazyView):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+def lazy_loads(raw: bytes) -> Any:
+    """Decodes a response body into a LazyView when it is a JSON object."""
+    return _decode_value(raw.lstrip())
+
+def json_default(obj: Any) -> Any:
+    """`default` hook for json.dump that serializes LazyView objects."""
+    if isinstance(obj, LazyView):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,166 @@
+"""Incremental sync of a saved crawl against the Kalshi API.
+
+After a full crawl its market records are kept as a snapshot. Each later sync lists
+only what may have changed since the previous one, and the caller merges that in:
+
+- new events: open events are listed without their nested markets, and the markets of
+  events missing from the snapshot are listed event by event
+- status changes: markets that closed since the last sync are listed with the status
+  and close time filters; snapshot markets past their close time, or closed but not yet
+  settled, are refetched until they report a settlement
+- moved markets: markets traded since the last sync are refetched
+
+Snapshot markets already settled or finalized cannot change, so they are never refetched.
+A market added to an event already in the snapshot is only found once it trades, so a
+full crawl should still run now and then.
+
+Each sync appends to the saved records; compact them between syncs:
+
+    python -m delta_sync checkpoints/sync
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from checkpoint_store import CheckpointStore, write_json_atomic
+from crawl_model import CrawlModel
+
+SYNC_STATE = "state.json"
+OPEN_STATUSES = ("open", "active")
+UNSETTLED_STATUSES = ("closed",)
+FINAL_STATUSES = ("settled", "finalized")
+
+def close_timestamp(close_time: Any) -> Optional[float]:
+    """Parses an API close time such as '2025-05-10T21:00:00Z'; None if it is not one."""
+    try:
+        return datetime.fromisoformat(close_time.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+class SyncState:
+    """The market records of the last crawl or sync, and when they were taken."""
+    def __init__(self, directory: str, default: Optional[Callable[[Any], Any]] = None):
+        """Initializes the state.
+
+        Args:
+            directory: Where the records (a CheckpointStore) and state file live.
+            default: json.dumps `default` hook for the records, as for CheckpointStore.
+        """
+        self.directory = directory
+        self.records = CheckpointStore(os.path.join(directory, "markets"), default=default)
+        self.state_path = os.path.join(directory, SYNC_STATE)
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {}
+
+    @property
+    def last_sync(self) -> Optional[float]:
+        """Unix time the records were last brought up to date."""
+        return self.state.get("last_sync")
+
+    @property
+    def last_full(self) -> Optional[float]:
+        """Unix time of the full crawl the records started from."""
+        return self.state.get("last_full")
+
+    def exists(self) -> bool:
+        return self.last_sync is not None and self.records.exists()
+
+    def load(self, crawl: CrawlModel) -> int:
+        """Streams the saved records into a crawl. Returns the number of markets loaded."""
+        for record in self.records:
+            crawl.add_market(record, new=False)
+        return len(crawl)
+
+    def save_full(self, crawl: CrawlModel, started: float) -> None:
+        """Replaces the records with a full crawl that started at `started`."""
+        self.records.clear()
+        self.records.append(crawl.records())
+        self._write_state({"last_sync": started, "last_full": started})
+
+    def save_delta(self, crawl: CrawlModel, synced: float) -> int:
+        """Appends the records added to a crawl since it was loaded.
+
+        Args:
+            synced: Time the changes were listed from; pass last_sync to keep the same
+                window for the next sync, e.g. when some markets could not be fetched.
+
+        Returns:
+            Number of records written.
+        """
+        written = self.records.append(crawl.take_added())
+        self._write_state(dict(self.state, last_sync=synced))
+        return written
+
+    def compact(self) -> int:
+        """Keeps only the latest record of each market. Run between syncs.
+
+        Returns:
+            Number of records kept.
+        """
+        return self.records.compact()
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        write_json_atomic(self.state_path, state)
+        self.state = state
+
+async def find_changes(
+    client: Any,
+    crawl: CrawlModel,
+    since: float
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Set[str]]:
+    """Lists what changed since `since` against the markets loaded in a crawl.
+
+    Args:
+        client: KalshiHttpClient
+        crawl: Crawl holding the snapshot's market records
+        since: Unix time of the last sync, less a margin for clock skew
+
+    Returns:
+        Open events (without nested markets); market payloads listed by the API, by
+        ticker, which are current and need no refetch; and tickers of markets to refetch.
+    """
+    since_ts = int(since)
+    now = time.time()
+    events = [event async for event in client.iter_events(status="open", with_nested_markets=False)]
+
+    markets = {}
+    known_events = {record['event_ticker'] for record in crawl}
+    for event in events:
+        if event['event_ticker'] not in known_events:
+            async for market in client.iter_markets(event_ticker=event['event_ticker']):
+                markets[market['ticker']] = market
+    async for market in client.iter_markets(status="closed", min_close_ts=since_ts):
+        markets[market['ticker']] = market
+
+    stale = set()
+    async for trade in client.iter_trades(min_ts=since_ts):
+        if trade.get('ticker'):
+            stale.add(trade['ticker'])
+    final = set()
+    for record in crawl:
+        status = record['status']
+        if status in FINAL_STATUSES:
+            final.add(record['market_ticker'])
+        elif status in UNSETTLED_STATUSES:
+            stale.add(record['market_ticker'])
+        elif status in OPEN_STATUSES:
+            closes = close_timestamp(record['close_time'])
+            if closes is not None and closes <= now:
+                stale.add(record['market_ticker'])
+    stale.difference_update(markets)
+    stale.difference_update(final)
+    return events, markets, stale
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:] or ["checkpoints/sync"]:
+        state = SyncState(directory)
+        before = len(state.records)
+        kept = state.compact()
+        print(f"{directory}: {before} records compacted to {kept}")
@@ -15,6 +15,13 @@ import pickle
 import pathlib
 
 from clients import KalshiHttpClient, KalshiWebSocketClient, Environment
+from rate_limiter import RateLimiter
+from decoding import json_default
+from crawl_model import CrawlModel
+from checkpoint_store import CheckpointStore
+from delta_sync import SyncState, find_changes
+from columnar_export import ColumnarExporter, pa
+from crawl_pipeline import CrawlPipeline
 
 # Load environment variables
 load_dotenv()
@@ -22,22 +29,78 @@ env = Environment.DEMO  # toggle environment here
 KEYID = os.getenv('DEMO_KEYID') if env == Environment.DEMO else os.getenv('PROD_KEYID')
 KEYFILE = os.getenv('DEMO_KEYFILE') if env == Environment.DEMO else os.getenv('PROD_KEYFILE')
 
-# Set the maximum number of concurrent workers based on your machine
+# Set the maximum number of concurrent workers based on your machine. This sizes the
+# thread and connection pools; requests in flight adapt below it to the server's 429s.
 NUM_WORKERS = 32  # Increased from 16 for better parallelism
 
-# Chunk size for parallel processing
-CHUNK_SIZE = 200  # Increased from 50 to process more markets at once
-CHUNK_DELAY = 0.05  # Reduced from 0.1s to 0.05s
+# Market details are fetched by NUM_WORKERS fetchers draining a queue of tickers, each
+# taking up to CHUNK_SIZE tickers per batch (one bulk request) and waiting at most
+# PIPELINE_LINGER seconds to fill it
+CHUNK_SIZE = 200
+PIPELINE_LINGER = 0.05
 
-# Rate limits - Aiming for Advanced tier (30 reads/sec)
-API_RATE_LIMIT = 25  # Slightly under the Advanced tier limit of 30 req/s
+# Fetch each batch through the markets list endpoint's tickers filter (one request per
+# few hundred markets) instead of one GET per market
+BULK_FETCH = True
+
+# Rate limits - Advanced tier (30 reads/sec). The token bucket paces requests evenly,
+# so we can run at the tier limit itself instead of a safety margin below it.
+API_TIER = "advanced"
+
+# Walk the events listing over concurrent cursors, one per status in EVENT_STATUSES
+# ("status"), or one per series and status ("series", which costs at least one request per
+# series and status, so it only pays off when the rate budget far exceeds one cursor's
+# page rate). None walks a single cursor over every status.
+EVENT_SHARDS = "status"
+EVENT_STATUSES = ("open", "closed")
+EVENT_SHARD_CONCURRENCY = 8
+# The series listing requires a category, so series shards cover these categories only
+EVENT_SERIES_CATEGORIES = (
+    "Politics", "Elections", "Economics", "Financials", "Companies", "Crypto",
+    "Climate and Weather", "Science and Technology", "Health", "World", "Social",
+    "Entertainment", "Sports", "Transportation",
+)
+
+# Build market records from the markets nested in each event page instead of fetching
+# every market again. Details are only fetched for markets whose nested payload lacks an
+# identifying field, or for open markets whose page is older than NESTED_MAX_AGE seconds.
+# Prices and volumes may be absent: the API omits them when null (e.g. yes_bid/yes_ask of
+# a market nobody quotes), and the record stores None or 0 for them as it would from a
+# detail fetch.
+NESTED_ONLY = True
+NESTED_MAX_AGE = 600
+NESTED_REQUIRED_FIELDS = ('ticker', 'title', 'status', 'market_type', 'close_time')
+
+# Decode responses with msgspec into plain dicts. Lazy views (decoding.LazyView) only
+# pay off when few fields of each object are read; the crawl reads most of a market and
+# keeps raw_data, so a view's raw buffer plus decoded-field cache costs more than
+# decoding once.
+JSON_DECODER = "msgspec"
+LAZY_VIEWS = False
 
 # Checkpoint settings
 CHECKPOINT_DIR = "checkpoints"
 CHECKPOINT_INTERVAL = 1000  # Increased from 500 to reduce checkpoint overhead
-MARKET_DATA_CHECKPOINT = os.path.join(CHECKPOINT_DIR, "market_data_checkpoint.json")
+# Append-only: each checkpoint writes only the markets added since the last one. Compact
+# between crawls with `python -m checkpoint_store checkpoints/market_data`.
+MARKET_DATA_CHECKPOINT = os.path.join(CHECKPOINT_DIR, "market_data")
 META_CHECKPOINT = os.path.join(CHECKPOINT_DIR, "meta_checkpoint.json")
 
+# Incremental sync: the records of a full crawl are kept in SYNC_DIR, and later runs only
+# fetch new, closed and traded markets and merge them in (see delta_sync.py). A full
+# crawl still runs when the last one is older than SYNC_FULL_EVERY seconds. Syncs only
+# append; compact the records between runs with `python -m delta_sync checkpoints/sync`.
+SYNC_MODE = True
+SYNC_DIR = os.path.join(CHECKPOINT_DIR, "sync")
+SYNC_FULL_EVERY = 24 * 3600
+SYNC_OVERLAP = 60  # Seconds before the last sync to list again, for clock skew
+
+# Export format: "parquet" or "arrow" stream records into a dataset under EXPORT_DIR,
+# partitioned by snapshot date and event category, as the crawl proceeds (needs
+# pyarrow); "json" writes one indented JSON file and a CSV at the end.
+EXPORT_FORMAT = "parquet"
+EXPORT_DIR = os.path.join("exports", "kalshi_markets")
+
 # Ensure checkpoint directory exists
 os.makedirs(CHECKPOINT_DIR, exist_ok=True)
 
@@ -58,47 +121,85 @@ client = KalshiHttpClient(
     private_key=private_key,
     environment=env,
     max_workers=NUM_WORKERS,
-    rate_limit_per_second=API_RATE_LIMIT,  # Use the Advanced tier rate limit
-    adaptive_rate_limiting=True  # Enable adaptive rate limiting
+    rate_limiter=RateLimiter.for_tier(API_TIER),  # Separate read/write budgets for our tier
+    transport="aiohttp",  # Native asyncio connection pool for the async fetches
+    json_decoder=JSON_DECODER,
+    lazy_views=LAZY_VIEWS
 )
 
-# Create a list to store all market data
-all_market_data = []
+# Events and market records of the crawl, indexed by ticker
+crawl = CrawlModel()
+checkpoints = CheckpointStore(MARKET_DATA_CHECKPOINT, default=json_default)
+sync = SyncState(SYNC_DIR, default=json_default)
 
 def load_checkpoint():
-    """Attempts to load checkpoint data if available"""
-    checkpoint_data = {
-        'processed_tickers': set(),
-        'market_data': []
-    }
-    
-    # Check if market data checkpoint exists
-    if os.path.exists(MARKET_DATA_CHECKPOINT):
-        try:
-            with open(MARKET_DATA_CHECKPOINT, 'r') as f:
-                checkpoint_data['market_data'] = json.load(f)
-            # Extract processed tickers from the checkpoint
-            checkpoint_data['processed_tickers'] = set(item['market_ticker'] for item in checkpoint_data['market_data'])
-            print(f"Loaded {len(checkpoint_data['market_data'])} markets from checkpoint")
-            print(f"Resuming from {len(checkpoint_data['processed_tickers'])} previously processed markets")
-        except Exception as e:
-            print(f"Error loading checkpoint: {e}")
-    
-    return checkpoint_data
+    """Restores checkpointed markets into the crawl, streaming segments one record at a time.
+
+    Returns:
+        Set of tickers already processed.
+    """
+    processed_tickers = set()
+    try:
+        for market_data in checkpoints:
+            crawl.add_market(market_data, new=False)
+            processed_tickers.add(market_data['market_ticker'])
+        print(f"Loaded {len(crawl)} markets from checkpoint")
+        print(f"Resuming from {len(processed_tickers)} previously processed markets")
+    except Exception as e:
+        print(f"Error loading checkpoint: {e}")
+    return processed_tickers
 
-def save_checkpoint(market_data):
-    """Save market data to checkpoint file"""
+def save_checkpoint(exporter=None):
+    """Appends the markets added since the last checkpoint, streaming them to the exporter too"""
     try:
-        with open(MARKET_DATA_CHECKPOINT, 'w') as f:
-            json.dump(market_data, f, indent=2)
-        print(f"Checkpoint saved: {len(market_data)} markets")
+        added = crawl.take_added()
+        if exporter is not None:
+            exporter.write(added)
+        written = checkpoints.append(added)
+        print(f"Checkpoint saved: {written} new markets, {len(checkpoints)} in total")
     except Exception as e:
         print(f"Error saving checkpoint: {e}")
 
+def build_market_record(market_details, event_ticker, event_data):
+    """Flattens one market from the API into the record we checkpoint and export."""
+    return {
+        'event_ticker': event_ticker,
+        'event_category': event_data.get('category', 'N/A'),
+        'market_title': market_details.get('title', 'N/A'),
+        'market_ticker': market_details.get('ticker', 'N/A'),
+        'status': market_details.get('status', 'N/A'),
+        'market_type': market_details.get('market_type', 'N/A'),
+        'close_time': market_details.get('close_time', 'N/A'),
+        'last_price': market_details.get('last_price', 0) / 100 if market_details.get('last_price') is not None else None,
+        'yes_bid': market_details.get('yes_bid', 0) / 100 if market_details.get('yes_bid') is not None else None,
+        'yes_ask': market_details.get('yes_ask', 0) / 100 if market_details.get('yes_ask') is not None else None,
+        'volume_24h': market_details.get('volume_24h', 0),
+        'open_interest': market_details.get('open_interest', 0),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        # Store the raw market details for complete data
+        'raw_data': market_details
+    }
+
+def nested_market_needs_details(market, fetched_at):
+    """Whether a market nested in an event page must be fetched on its own.
+
+    A required field that is present but None counts as present.
+    """
+    if any(field not in market for field in NESTED_REQUIRED_FIELDS):
+        return True
+    # Prices of open markets move; closed and settled ones are final
+    return market.get('status') in ('open', 'active') and time.time() - fetched_at > NESTED_MAX_AGE
+
+async def event_shards():
+    """Returns the events filters walked concurrently for EVENT_SHARDS."""
+    if EVENT_SHARDS == "series":
+        return await client.event_shards(EVENT_STATUSES, categories=EVENT_SERIES_CATEGORIES)
+    return await client.event_shards(EVENT_STATUSES)
+
 def check_for_resume():
     """Check if we can resume from a checkpoint"""
     print("Checking for checkpoints to resume from...")
-    checkpoint_exists = os.path.exists(MARKET_DATA_CHECKPOINT)
+    checkpoint_exists = checkpoints.exists()
     
     if checkpoint_exists:
         response = input("Checkpoint found. Resume from checkpoint? (y/n): ")
@@ -113,200 +214,207 @@ async def fetch_all_market_data():
     # Performance monitoring variables
     request_count = 0
     error_count = 0
-    last_progress_report = time.time()
     progress_report_interval = 30  # Report performance every 30 seconds
     
     # Check if we should resume from checkpoint
     should_resume = check_for_resume()
-    checkpoint_data = load_checkpoint() if should_resume else {'processed_tickers': set(), 'market_data': []}
-    
-    # Restore market data from checkpoint if available
-    if checkpoint_data['market_data']:
-        all_market_data.extend(checkpoint_data['market_data'])
+    if not should_resume:
+        checkpoints.clear()  # Start a fresh checkpoint rather than appending to an old crawl
     
     # Keep track of processed tickers to avoid duplicates
-    processed_tickers = checkpoint_data['processed_tickers']
+    processed_tickers = load_checkpoint() if should_resume else set()
     
     print("Fetching account balance...")
     # Get account balance
     balance = client.get_balance()
     print("Balance:", balance)
     
-    print("\nFetching events...")
-    all_events = []
-    cursor = None
+    # Event pages feed a queue of tickers to fetch, a pool of fetchers drains it under
+    # the client's rate limiter, and the results are recorded as they arrive
+    print("\nCrawling events and markets...")
+    exporter = open_exporter(datetime.fromtimestamp(start_time).strftime('%Y-%m-%d'))
+    if exporter is not None:
+        exporter.write(crawl.records())  # Resumed records first
+    queued_tickers = set()
+    listed_markets = 0
+    nested_count = 0
+    successful_markets = 0
+    checkpoint_count = 0
+    aborted = False
+    
+    event_pbar = tqdm(desc="Fetching events", unit="page", position=0)
+    market_pbar = tqdm(desc="Fetching market details", unit="market", position=1)
     
-    with tqdm(desc="Fetching events", unit="page") as pbar:
+    async def event_pages():
+        """Yields the events of each page of the events listing, and when the page arrived."""
+        nonlocal request_count, error_count
+        if EVENT_SHARDS:
+            shards = await event_shards()
+            print(f"\nWalking {len(shards)} event listings, {EVENT_SHARD_CONCURRENCY} at a time")
+            async for events, fetched_at in client.iter_events_sharded(shards, concurrency=EVENT_SHARD_CONCURRENCY):
+                request_count += 1
+                yield events, fetched_at
+            return
+        cursor = None
         while True:
             try:
-                events_response = client.get_events(
-                    status="open,closed",  # Get both open and closed markets
-                    with_nested_markets=True,
-                    limit=200,  # Maximum limit per request
+                # The next page is requested while this one is being processed; on an
+                # error we resume from the cursor of the last page we finished.
+                async for events_page in client.iter_pages(
+                    client.events_url,
+                    {
+                        'status': ",".join(EVENT_STATUSES),  # Get both open and closed markets
+                        'with_nested_markets': "true",
+                        'limit': 200,  # Maximum limit per request
+                    },
                     cursor=cursor
-                )
-                
-                if not events_response.get('events'):
-                    break
-                    
-                all_events.extend(events_response.get('events', []))
-                cursor = events_response.get('cursor')
-                pbar.update(1)
-                request_count += 1
-                
-                if not cursor:
-                    break
+                ):
+                    if not events_page.get('events'):
+                        break
+                    request_count += 1
+                    yield events_page['events'], events_page['fetched_at']
+                    cursor = events_page['cursor']
+                return
             except Exception as e:
                 error_count += 1
                 print(f"Error fetching events: {e}")
                 # Add a short delay before retrying
                 await asyncio.sleep(1)
                 if error_count > 10:
-                    print("Too many errors, aborting...")
-                    return
-    
-    print(f"\nFound {len(all_events)} events")
-    
-    # Collect all market tickers across all events
-    all_tickers = []
-    event_market_map = {}  # Map tickers to their events
-    
-    print("\nOrganizing markets by events...")
-    for event in all_events:
-        if 'markets' in event:
-            event_tickers = [market['ticker'] for market in event['markets']]
-            all_tickers.extend(event_tickers)
-            
-            # Map each ticker to its event
-            for ticker in event_tickers:
-                event_market_map[ticker] = event['event_ticker']
-    
-    # Filter out already processed tickers
-    unprocessed_tickers = [t for t in all_tickers if t not in processed_tickers]
-    
-    total_markets = len(all_tickers)
-    remaining_markets = len(unprocessed_tickers)
-    print(f"\nFetching details for {remaining_markets} remaining markets out of {total_markets} total")
-    
-    if unprocessed_tickers:
-        # Split tickers into chunks to avoid overwhelming the API
-        chunk_size = CHUNK_SIZE  # Use the configured chunk size constant
-        num_chunks = (remaining_markets + chunk_size - 1) // chunk_size
-        
-        # Create progress bar for chunks
-        checkpoint_count = 0
-        successful_markets = 0
-        
-        with tqdm(total=remaining_markets, desc="Fetching market details", unit="market") as pbar:
-            for chunk_start in range(0, remaining_markets, chunk_size):
-                chunk_end = min(chunk_start + chunk_size, remaining_markets)
-                chunk_tickers = unprocessed_tickers[chunk_start:chunk_end]
-                
-                # Monitor and report performance
-                current_time = time.time()
-                if current_time - last_progress_report > progress_report_interval:
-                    elapsed = current_time - start_time
-                    markets_per_second = successful_markets / elapsed if elapsed > 0 else 0
-                    requests_per_second = request_count / elapsed if elapsed > 0 else 0
-                    print(f"\nPerformance: {markets_per_second:.2f} markets/sec, {requests_per_second:.2f} requests/sec, {error_count} errors")
-                    remaining_time = (remaining_markets - successful_markets) / markets_per_second if markets_per_second > 0 else 0
-                    print(f"Estimated time remaining: {remaining_time/60:.2f} minutes")
-                    last_progress_report = current_time
-                
-                try:
-                    chunk_results = await client.get_markets_async(chunk_tickers)
-                    request_count += len(chunk_tickers)  # Count each market request
-                    
-                    # Process results immediately
-                    successful_chunk_markets = 0
-                    for j, market_details in enumerate(chunk_results):
-                        ticker = chunk_tickers[j]
-                        event_ticker = event_market_map.get(ticker, 'N/A')
-                        
-                        # Find the event data
-                        event_data = next((e for e in all_events 
-                                         if e['event_ticker'] == event_ticker), {})
-                        
-                        # Skip if there was an error fetching this market
-                        if isinstance(market_details, dict) and 'error' in market_details:
-                            print(f"Error fetching details for {ticker}: {market_details['error']}")
-                            processed_tickers.add(ticker)  # Mark as processed even if error
-                            error_count += 1
+                    raise
+    
+    async def detail_tickers():
+        """Pages through events, records nested markets and yields the tickers to fetch."""
+        nonlocal listed_markets, nested_count, aborted
+        try:
+            # fetched_at is when the page arrived: a full ticker queue can hold the producer
+            # back long enough for open markets' nested prices to go stale
+            async for events, fetched_at in event_pages():
+                crawl.add_events(events)
+                event_pbar.update(1)
+                for event in events:
+                    for market in event.get('markets') or []:
+                        ticker = market['ticker']
+                        listed_markets += 1
+                        if ticker in processed_tickers or ticker in queued_tickers:
                             continue
-                            
-                        # Create a dictionary for this market's data
-                        market_data = {
-                            'event_ticker': event_ticker,
-                            'event_category': event_data.get('category', 'N/A'),
-                            'market_title': market_details.get('title', 'N/A'),
-                            'market_ticker': market_details.get('ticker', 'N/A'),
-                            'status': market_details.get('status', 'N/A'),
-                            'market_type': market_details.get('market_type', 'N/A'),
-                            'close_time': market_details.get('close_time', 'N/A'),
-                            'last_price': market_details.get('last_price', 0) / 100 if market_details.get('last_price') is not None else None,
-                            'yes_bid': market_details.get('yes_bid', 0) / 100 if market_details.get('yes_bid') is not None else None,
-                            'yes_ask': market_details.get('yes_ask', 0) / 100 if market_details.get('yes_ask') is not None else None,
-                            'volume_24h': market_details.get('volume_24h', 0),
-                            'open_interest': market_details.get('open_interest', 0),
-                            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            # Store the raw market details for complete data
-                            'raw_data': market_details
-                        }
-                        
-                        all_market_data.append(market_data)
+                        if not NESTED_ONLY or nested_market_needs_details(market, fetched_at):
+                            queued_tickers.add(ticker)
+                            yield ticker
+                            continue
+                        # Record the market straight from the event payload
+                        crawl.add_market(build_market_record(market, event['event_ticker'], event))
                         processed_tickers.add(ticker)
-                        successful_chunk_markets += 1
-                    
-                    successful_markets += successful_chunk_markets
-                    pbar.update(len(chunk_tickers))
-                    checkpoint_count += len(chunk_tickers)
-                    
-                    # Create checkpoint every CHECKPOINT_INTERVAL markets
-                    if checkpoint_count >= CHECKPOINT_INTERVAL:
-                        save_checkpoint(all_market_data)
-                        checkpoint_count = 0
-                
-                except Exception as e:
-                    print(f"Error processing chunk: {e}")
-                    error_count += 1
-                    # If we encounter too many errors in a row, abort
-                    if error_count > 50:
-                        print("Too many errors, saving checkpoint and aborting...")
-                        save_checkpoint(all_market_data)
-                        return
-                
-                # Small delay between chunks to avoid rate limits - reduced for speed
-                await asyncio.sleep(CHUNK_DELAY)
+                        nested_count += 1
+                        count_record()
+        except Exception as e:
+            print(f"Too many errors fetching events ({e}), aborting...")
+            aborted = True
+            pipeline.stop()
+    
+    async def fetch_markets(tickers):
+        nonlocal request_count
+        if BULK_FETCH:
+            markets = await client.get_markets_bulk_async(tickers)
+            request_count += len(client.split_tickers(tickers))
+            return markets
+        results = await client.get_markets_async(tickers)
+        request_count += len(tickers)  # Count each market request
+        return dict(zip(tickers, results))
+    
+    def count_record():
+        """Counts a recorded market, checkpointing every CHECKPOINT_INTERVAL of them."""
+        nonlocal checkpoint_count
+        checkpoint_count += 1
+        if checkpoint_count >= CHECKPOINT_INTERVAL:
+            save_checkpoint(exporter)
+            checkpoint_count = 0
+    
+    def write_market(ticker, market_details):
+        nonlocal error_count, successful_markets, aborted
+        market_pbar.update(1)
+        processed_tickers.add(ticker)  # Mark as processed even if error
+        if market_details is None:
+            market_details = {"error": "not returned by the markets endpoint"}
+        
+        # Skip if there was an error fetching this market
+        if isinstance(market_details, dict) and 'error' in market_details:
+            print(f"Error fetching details for {ticker}: {market_details['error']}")
+            error_count += 1
+            # If we encounter too many errors, abort
+            if error_count > 50 and not aborted:
+                print("Too many errors, saving checkpoint and aborting...")
+                aborted = True
+                pipeline.stop()
+            return
+        
+        event_ticker = crawl.event_of(ticker) or 'N/A'
+        crawl.add_market(build_market_record(market_details, event_ticker, crawl.event(event_ticker)))
+        successful_markets += 1
+        count_record()
+    
+    async def report_progress():
+        # Monitor and report performance
+        while True:
+            await asyncio.sleep(progress_report_interval)
+            elapsed = time.time() - start_time
+            markets_per_second = successful_markets / elapsed if elapsed > 0 else 0
+            requests_per_second = request_count / elapsed if elapsed > 0 else 0
+            print(f"\nPerformance: {markets_per_second:.2f} markets/sec, {requests_per_second:.2f} requests/sec, {error_count} errors")
+            stage_stats = pipeline.stats()
+            print(f"Pipeline: {stage_stats['ticker_queue']} tickers queued, {stage_stats['fetching']} batches fetching, "
+                  f"{stage_stats['result_queue']} batches awaiting the writer, {stage_stats['written']} written")
+            read_stats = client.rate_limiter.stats()['read']
+            print(f"Rate limiter: {read_stats['waited']}/{read_stats['acquired']} requests throttled, "
+                  f"avg wait {read_stats['avg_wait'] * 1000:.1f} ms")
+            if client.concurrency is not None:
+                window_stats = client.concurrency.stats()
+                print(f"Concurrency window: {window_stats['window']} "
+                      f"({window_stats['congestion_events']} congestion signals, {window_stats['retries']} retries)")
+    
+    pipeline = CrawlPipeline(
+        fetch_markets,
+        write_market,
+        fetchers=NUM_WORKERS,
+        batch_size=CHUNK_SIZE if BULK_FETCH else 1,
+        linger=PIPELINE_LINGER
+    )
+    reporter = asyncio.ensure_future(report_progress())
+    try:
+        await pipeline.run(detail_tickers())
+    finally:
+        reporter.cancel()
+        event_pbar.close()
+        market_pbar.close()
+    
+    print(f"\nFound {len(crawl.events)} events listing {listed_markets} markets")
+    fallback_rate = successful_markets / listed_markets if listed_markets else 0.0
+    print(f"Built {nested_count} markets from nested event data, fetched details for {successful_markets} "
+          f"({fallback_rate:.1%} of listed markets)")
+    if aborted:
+        save_checkpoint(exporter)
+        if exporter is not None:
+            exporter.close()
+        return
     
     # Final checkpoint save
-    save_checkpoint(all_market_data)
+    save_checkpoint(exporter)
+    if SYNC_MODE:
+        sync.save_full(crawl, start_time)
+        print(f"Saved {len(crawl)} markets for incremental syncs")
     
     # Group markets by event for display
     print("\nGrouping markets by event...")
-    markets_by_event = {}
-    for market_data in all_market_data:
-        event_ticker = market_data['event_ticker']
-        if event_ticker not in markets_by_event:
-            markets_by_event[event_ticker] = []
-        markets_by_event[event_ticker].append(market_data)
+    markets_by_event = crawl.markets_by_event()
     
     # Print summary by event
     print("\nSummary of Events:")
-    total_markets = 0
-    categories = {}  # Track categories and their market counts
+    total_markets = len(crawl)
+    categories = crawl.category_counts()  # Market counts per category
     
     for event_ticker, markets in markets_by_event.items():
-        if not markets:
-            continue
-            
-        total_markets += len(markets)
         category = markets[0]['event_category']
         
-        # Track category counts
-        if category not in categories:
-            categories[category] = 0
-        categories[category] += len(markets)
-        
         print(f"\nEvent: {event_ticker}")
         print(f"Category: {category}")
         print(f"Number of markets: {len(markets)}")
@@ -328,41 +436,137 @@ async def fetch_all_market_data():
     
     print("\nNote: Prices shown as percentages (e.g., 55.0% means $0.55 per share)")
     
-    # Export data to JSON
-    if all_market_data:
-        print("\nExporting data to JSON...")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        json_filename = f'kalshi_markets_{timestamp}.json'
-        
-        # Save as JSON
-        with open(json_filename, 'w') as f:
-            json.dump(all_market_data, f, indent=2)
-        print(f"Data exported to {json_filename}")
-        
-        # Also save a CSV version for easy viewing
-        csv_filename = f'kalshi_markets_{timestamp}.csv'
-        # Remove raw_data field for CSV export
-        csv_data = [{k: v for k, v in item.items() if k != 'raw_data'} for item in all_market_data]
-        df = pd.DataFrame(csv_data)
-        df.to_csv(csv_filename, index=False)
-        print(f"Summary data also exported to {csv_filename}")
-        
+    # Finish the export
+    if export_market_data(exporter):
         # Clean up checkpoint files if export successful
         response = input("\nExport successful. Remove checkpoint file? (y/n): ")
         if response.lower() == 'y':
-            if os.path.exists(MARKET_DATA_CHECKPOINT):
-                os.remove(MARKET_DATA_CHECKPOINT)
+            checkpoints.clear()
             print("Checkpoint file removed.")
     
     end_time = time.time()
     print(f"\nTotal execution time: {end_time - start_time:.2f} seconds")
 
+def open_exporter(snapshot_date=None):
+    """Returns a ColumnarExporter for EXPORT_FORMAT, or None to export JSON and CSV.
+
+    Args:
+        snapshot_date: Date (YYYY-MM-DD) the crawl started, partitioning all its records.
+    """
+    if EXPORT_FORMAT == "json":
+        return None
+    if pa is None:
+        print("pyarrow is not installed; exporting JSON and CSV instead")
+        return None
+    return ColumnarExporter(EXPORT_DIR, format=EXPORT_FORMAT, snapshot_date=snapshot_date)
+
+def export_market_data(exporter=None):
+    """Exports the crawl's market records.
+
+    Args:
+        exporter: ColumnarExporter the records were streamed to; it is closed. Without
+            one, all records are exported now, in EXPORT_FORMAT.
+
+    Returns:
+        Whether there was anything to export.
+    """
+    if exporter is None:
+        exporter = open_exporter()
+        if exporter is not None:
+            exporter.write(crawl.records())
+    if exporter is not None:
+        paths = exporter.close()
+        if not exporter.rows:
+            return False
+        print(f"\nExported {exporter.rows} markets in {exporter.row_groups} row groups "
+              f"to {len(paths)} {exporter.format} files under {exporter.directory}")
+        return True
+    
+    all_market_data = crawl.records()
+    if not all_market_data:
+        return False
+    print("\nExporting data to JSON...")
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    json_filename = f'kalshi_markets_{timestamp}.json'
+    
+    # Save as JSON
+    with open(json_filename, 'w') as f:
+        json.dump(all_market_data, f, indent=2, default=json_default)
+    print(f"Data exported to {json_filename}")
+    
+    # Also save a CSV version for easy viewing
+    csv_filename = f'kalshi_markets_{timestamp}.csv'
+    # Remove raw_data field for CSV export
+    csv_data = [{k: v for k, v in item.items() if k != 'raw_data'} for item in all_market_data]
+    df = pd.DataFrame(csv_data)
+    df.to_csv(csv_filename, index=False)
+    print(f"Summary data also exported to {csv_filename}")
+    return True
+
+def sync_record(market):
+    """Builds the record of a market fetched during a sync, keeping its known category."""
+    ticker = market.get('ticker')
+    event_ticker = market.get('event_ticker') or crawl.event_of(ticker) or 'N/A'
+    event_data = crawl.event(event_ticker)
+    if not event_data and ticker in crawl:
+        event_data = {'category': crawl.markets[ticker]['event_category']}
+    return build_market_record(market, event_ticker, event_data)
+
+async def sync_market_data():
+    """Merges the markets changed since the last sync into the saved records and exports them."""
+    start_time = time.time()
+    print(f"Loaded {sync.load(crawl)} markets last synced "
+          f"{datetime.fromtimestamp(sync.last_sync).strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    print("\nListing changes since the last sync...")
+    try:
+        events, listed_markets, stale_tickers = await find_changes(client, crawl, sync.last_sync - SYNC_OVERLAP)
+    except Exception as e:
+        print(f"Error listing changes: {e}")
+        return
+    crawl.add_events(events)
+    for market in listed_markets.values():
+        crawl.add_market(sync_record(market))
+    print(f"{len(events)} open events, {len(listed_markets)} new or closed markets, "
+          f"{len(stale_tickers)} markets to refetch")
+    
+    failed = 0
+    pbar = tqdm(total=len(stale_tickers), desc="Refetching changed markets", unit="market")
+    
+    def write_market(ticker, market_details):
+        nonlocal failed
+        pbar.update(1)
+        if market_details is None:
+            market_details = {"error": "not returned by the markets endpoint"}
+        if 'error' in market_details:
+            print(f"Error fetching details for {ticker}: {market_details['error']}")
+            failed += 1
+            return
+        crawl.add_market(sync_record(market_details))
+    
+    pipeline = CrawlPipeline(
+        client.get_markets_bulk_async,
+        write_market,
+        fetchers=NUM_WORKERS,
+        batch_size=CHUNK_SIZE
+    )
+    try:
+        await pipeline.run(sorted(stale_tickers))
+    finally:
+        pbar.close()
+    
+    # Keep the old window when markets are missing so the next sync lists them again
+    written = sync.save_delta(crawl, sync.last_sync if failed else start_time)
+    print(f"\nMerged {written} changed markets into {len(crawl)} ({failed} failed)")
+    export_market_data()
+    print(f"\nTotal execution time: {time.time() - start_time:.2f} seconds")
+
 # WebSocket message handler
-def handle_market_update(message_data):
-    if 'message' in message_data and 'ticker' in message_data['message']:
-        # Process and update market data in real-time
-        ticker = message_data['message'].get('ticker')
-        print(f"Received update for {ticker}")
+def handle_market_update(markets, message_data):
+    # The client's market state store has already applied this update
+    ticker = message_data.get('msg', {}).get('market_ticker')
+    if ticker:
+        print(f"Received update for {markets.get(ticker)}")
         # TODO: Add more processing as needed
 
 # WebSocket event handler
@@ -374,17 +578,25 @@ async def handle_websocket():
         environment=env,
         max_workers=NUM_WORKERS,
     )
+
+    # Seed live market state from the crawl so every market is readable before its first update
+    seeded = ws_client.markets.seed(item['raw_data'] for item in crawl if 'raw_data' in item)
+    print(f"Seeded live state for {seeded} markets")
     
     # Add message handler
-    ws_client.add_message_handler(handle_market_update)
+    ws_client.add_message_handler(partial(handle_market_update, ws_client.markets), channels=["ticker"])
     
     # Connect via WebSocket
     await ws_client.connect()
 
 async def main():
     """Main async function to run both data fetching and websocket."""
-    # Run the market data fetching
-    await fetch_all_market_data()
+    # Run the market data fetching, incrementally when a recent full crawl was saved
+    if SYNC_MODE and sync.exists() and time.time() - sync.last_full < SYNC_FULL_EVERY:
+        await sync_market_data()
+    else:
+        await fetch_all_market_data()
+    await client.aclose()
     
     # Ask if user wants to start WebSocket listening
     response = input("\nDo you want to start real-time WebSocket updates? (y/n): ")
@@ -0,0 +1,132 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from ws_fastpath import TickerUpdate
+
+TICKER_CHANNEL = "ticker"
+
+class MarketRecord:
+    """Latest known state of one market. Prices are in cents.
+
+    Records are never modified: every update stores a new one, so a record read from the
+    store is always internally consistent, whichever thread reads it.
+    """
+    __slots__ = ("ticker", "last_price", "yes_bid", "yes_ask", "volume", "open_interest", "ts", "updated")
+
+    def __init__(
+        self,
+        ticker: str,
+        last_price: Optional[int],
+        yes_bid: Optional[int],
+        yes_ask: Optional[int],
+        volume: Optional[int],
+        open_interest: Optional[int],
+        ts: Optional[int],
+        updated: float
+    ):
+        self.ticker = ticker
+        self.last_price = last_price
+        self.yes_bid = yes_bid
+        self.yes_ask = yes_ask
+        self.volume = volume
+        self.open_interest = open_interest
+        self.ts = ts  # Exchange timestamp (unix seconds) of the update, None if seeded from REST
+        self.updated = updated  # Local time.time() the record was stored
+
+    def __repr__(self) -> str:
+        return (f"MarketRecord({self.ticker}, last={self.last_price}, bid={self.yes_bid}, "
+                f"ask={self.yes_ask}, volume={self.volume}, oi={self.open_interest}, ts={self.ts})")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class MarketStateStore:
+    """Live last price, quotes, volume and open interest per market.
+
+    Seed it once from REST market objects with seed(), then register handle() as an inline
+    dispatcher handler for the "ticker" channel to keep it current. get() is a dict lookup,
+    and snapshot() copies the ticker -> record map in one step, giving a consistent view of
+    every market at a single point in the stream.
+    """
+    def __init__(self):
+        self._records = {}
+        self.seeded = 0
+        self.updates = 0
+        self.out_of_order = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._records
+
+    def get(self, ticker: str) -> Optional[MarketRecord]:
+        """Returns the latest record of a market, or None if it is unknown."""
+        return self._records.get(ticker)
+
+    def snapshot(self) -> Dict[str, MarketRecord]:
+        """Returns a point-in-time copy of every market's record."""
+        return self._records.copy()
+
+    def seed(self, markets: Iterable[Dict[str, Any]]) -> int:
+        """Stores markets as returned by the REST API, keeping newer streamed records.
+
+        Returns:
+            Number of markets stored.
+        """
+        records = self._records
+        now = time.time()
+        count = 0
+        for market in markets:
+            ticker = market.get("ticker")
+            current = records.get(ticker)
+            if not ticker or (current is not None and current.ts is not None):
+                continue
+            records[ticker] = MarketRecord(
+                ticker,
+                market.get("last_price"),
+                market.get("yes_bid"),
+                market.get("yes_ask"),
+                market.get("volume"),
+                market.get("open_interest"),
+                None,
+                now
+            )
+            count += 1
+        self.seeded += count
+        return count
+
+    async def seed_from(self, http_client: Any, **filters) -> int:
+        """Seeds the store from KalshiHttpClient.iter_markets(**filters), e.g. status="open"."""
+        return self.seed([market async for market in http_client.iter_markets(**filters)])
+
+    def handle(self, messages: List[Dict[str, Any]]) -> None:
+        """Applies a batch of ticker channel messages, parsed or as ws_fastpath.TickerUpdate
+        tuples; other message types are ignored."""
+        records = self._records
+        now = time.time()
+        for message in messages:
+            if type(message) is TickerUpdate:
+                ticker, price, yes_bid, yes_ask, volume, open_interest, ts, _ = message
+            elif message.get("type") == TICKER_CHANNEL:
+                body = message["msg"]
+                ticker = body["market_ticker"]
+                price, yes_bid, yes_ask = body.get("price"), body.get("yes_bid"), body.get("yes_ask")
+                volume, open_interest, ts = body.get("volume"), body.get("open_interest"), body.get("ts")
+            else:
+                continue
+            current = records.get(ticker)
+            if current is not None and ts is not None and current.ts is not None and ts < current.ts:
+                self.out_of_order += 1
+                continue
+            records[ticker] = MarketRecord(ticker, price, yes_bid, yes_ask, volume, open_interest, ts, now)
+            self.updates += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns market and update counters."""
+        return {
+            "markets": len(self._records),
+            "seeded": self.seeded,
+            "updates": self.updates,
+            "out_of_order": self.out_of_order,
+        }
@@ -0,0 +1,290 @@
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Kalshi prices are whole cents from 1 to 99, so a price is its own index into a side
+PRICE_LEVELS = 100
+SIDES = ("yes", "no")
+
+SNAPSHOT_CHANNEL = "orderbook_snapshot"
+DELTA_CHANNEL = "orderbook_delta"
+ORDERBOOK_CHANNELS = (SNAPSHOT_CHANNEL, DELTA_CHANNEL)
+# The reply to update_subscription takes a seq number of the subscription's sequence
+ACK_CHANNEL = "ok"
+
+# Offset of each side in a book's level array. Price 0 never trades, so slot 0 of each side
+# holds that side's best bid price instead.
+_OFFSETS = {"yes": 0, "no": PRICE_LEVELS}
+_EMPTY_LEVELS = array("i", bytes(4 * 2 * PRICE_LEVELS))
+
+class OrderBook:
+    """Resting bids for one market, indexed by price.
+
+    Kalshi books hold bids only: a YES bid at p is equivalent to a NO ask at 100 - p. Both
+    sides live in one array of 32-bit quantities by price, and the best price and total
+    quantity of each side are kept up to date, so best bid/ask and total depth are O(1).
+    Removing the best level scans down to the next one, at most 99 steps.
+
+    A book has a single writer (the dispatcher consumer). Reads are safe from any thread
+    without a lock: the writer makes version odd while it updates, and readers retry until
+    they see the same even version before and after reading.
+    """
+    __slots__ = ("ticker", "levels", "yes_total", "no_total", "stale", "version")
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.levels = array("i", _EMPTY_LEVELS)
+        self.yes_total = 0
+        self.no_total = 0
+        self.stale = True  # Until the first snapshot
+        self.version = 0
+
+    def load(self, yes: Iterable[Iterable[int]], no: Iterable[Iterable[int]]) -> None:
+        """Replaces the book with [price, quantity] levels from a snapshot."""
+        self.version += 1
+        levels = self.levels
+        levels[:] = _EMPTY_LEVELS
+        totals = []
+        for offset, side in ((0, yes), (PRICE_LEVELS, no)):
+            best = total = 0
+            for price, quantity in side or ():
+                if 0 < price < PRICE_LEVELS and quantity > 0:
+                    levels[offset + price] = quantity
+                    total += quantity
+                    if price > best:
+                        best = price
+            levels[offset] = best
+            totals.append(total)
+        self.yes_total, self.no_total = totals
+        self.stale = False
+        self.version += 1
+
+    def apply(self, side: str, price: int, delta: int) -> None:
+        """Adds delta contracts (negative to remove) at a price level."""
+        offset = _OFFSETS[side]
+        if not 0 < price < PRICE_LEVELS:
+            raise ValueError(f"Invalid price: {price}")
+        self.version += 1
+        levels = self.levels
+        index = offset + price
+        before = levels[index]
+        after = before + delta
+        if after < 0:
+            after = 0
+        levels[index] = after
+        if offset:
+            self.no_total += after - before
+        else:
+            self.yes_total += after - before
+        best = levels[offset]
+        if after:
+            if price > best:
+                levels[offset] = price
+        elif price == best:
+            while best and not levels[offset + best]:
+                best -= 1
+            levels[offset] = best
+        self.version += 1
+
+    def _read(self, read: Callable[[array], Any]) -> Any:
+        """Runs read on the levels until it completes without a concurrent update."""
+        while True:
+            version = self.version
+            if not version & 1:
+                result = read(self.levels)
+                if self.version == version:
+                    return result
+
+    def best_bid(self, side: str = "yes") -> Tuple[int, int]:
+        """Returns (price, quantity) of the best bid on a side, (0, 0) if there is none."""
+        offset = _OFFSETS[side]
+        while True:
+            version = self.version
+            price = self.levels[offset]
+            result = (price, self.levels[offset + price]) if price else (0, 0)
+            if self.version == version and not version & 1:
+                return result
+
+    def best_ask(self, side: str = "yes") -> Tuple[int, int]:
+        """Returns (price, quantity) of the best ask on a side, implied by the other side's
+        best bid. (0, 0) if there is none."""
+        offset = PRICE_LEVELS - _OFFSETS[side]
+        while True:
+            version = self.version
+            price = self.levels[offset]
+            result = (PRICE_LEVELS - price, self.levels[offset + price]) if price else (0, 0)
+            if self.version == version and not version & 1:
+                return result
+
+    def spread(self) -> Optional[int]:
+        """Returns the YES ask minus the YES bid in cents, None if either side is empty."""
+        yes, no = self._read(lambda levels: (levels[0], levels[PRICE_LEVELS]))
+        if not yes or not no:
+            return None
+        return PRICE_LEVELS - no - yes
+
+    def quantity(self, side: str, price: int) -> int:
+        """Returns the quantity bid at a price level."""
+        if not 0 < price < PRICE_LEVELS:
+            raise ValueError(f"Invalid price: {price}")
+        return self.levels[_OFFSETS[side] + price]
+
+    def total(self, side: str) -> int:
+        """Returns the total quantity bid on a side."""
+        _OFFSETS[side]  # Validates the side
+        return self.yes_total if side == "yes" else self.no_total
+
+    def depth(self, side: str, levels: int = 5) -> List[Tuple[int, int]]:
+        """Returns up to levels non-empty (price, quantity) bid levels, best first."""
+        offset = _OFFSETS[side]
+
+        def read(book):
+            result = []
+            price = book[offset]
+            while price and len(result) < levels:
+                if book[offset + price]:
+                    result.append((price, book[offset + price]))
+                price -= 1
+            return result
+        return self._read(read)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the book as [price, quantity] lists in the snapshot message format."""
+        yes, no = self._read(lambda levels: (levels[1:PRICE_LEVELS], levels[PRICE_LEVELS + 1:]))
+        return {
+            "market_ticker": self.ticker,
+            "yes": [[p, q] for p, q in enumerate(yes, 1) if q],
+            "no": [[p, q] for p, q in enumerate(no, 1) if q],
+        }
+
+class OrderBookManager:
+    """Keeps one OrderBook per market from orderbook_snapshot / orderbook_delta messages.
+
+    handle() takes batches of parsed WebSocket messages and is meant to be registered as an
+    inline dispatcher handler. Messages carry a sequence number per subscription; when one
+    is missing, every book of that subscription is marked stale and on_gap is called with
+    their tickers so the owner can resync them. A book stays stale until load() gives it a
+    new snapshot, and the time from gap to snapshot is recorded.
+    """
+    def __init__(self, on_gap: Optional[Callable[[List[str]], Any]] = None):
+        """Initializes the manager.
+
+        Args:
+            on_gap: Called with the tickers of the books a sequence gap made stale.
+        """
+        self.on_gap = on_gap
+        self._lock = threading.Lock()
+        self.books = {}
+        self._sids = {}  # ticker -> subscription id
+        self._seqs = {}  # subscription id -> last sequence number
+        self._stale_since = {}  # ticker -> monotonic time of the gap, until resynced
+        self.snapshots = 0
+        self.deltas = 0
+        self.gaps = 0
+        self.resyncs = 0
+        self.resync_time_total = 0.0
+        self.resync_time_max = 0.0
+
+    def book(self, ticker: str) -> OrderBook:
+        """Returns the book for a market, creating an empty (stale) one if needed."""
+        book = self.books.get(ticker)
+        if book is None:
+            with self._lock:
+                book = self.books.setdefault(ticker, OrderBook(ticker))
+        return book
+
+    def get(self, ticker: str) -> Optional[OrderBook]:
+        """Returns the book for a market, or None if nothing was received for it."""
+        return self.books.get(ticker)
+
+    def _gap(self, sid: Any) -> None:
+        self.gaps += 1
+        now = time.monotonic()
+        tickers = []
+        for ticker, book_sid in self._sids.items():
+            if book_sid == sid:
+                self.books[ticker].stale = True
+                if ticker not in self._stale_since:
+                    self._stale_since[ticker] = now
+                    tickers.append(ticker)
+        if tickers and self.on_gap is not None:
+            self.on_gap(tickers)
+
+    def disconnected(self) -> None:
+        """Marks every book stale after the connection dropped; resubscribing reloads them."""
+        now = time.monotonic()
+        for ticker, book in list(self.books.items()):
+            book.stale = True
+            self._stale_since.setdefault(ticker, now)
+        self._sids.clear()
+        self._seqs.clear()
+
+    def load(self, ticker: str, yes: Iterable[Iterable[int]], no: Iterable[Iterable[int]]) -> None:
+        """Replaces a market's book with a snapshot from the stream or the REST API."""
+        self.book(ticker).load(yes, no)
+        since = self._stale_since.pop(ticker, None)
+        if since is not None:
+            elapsed = time.monotonic() - since
+            self.resyncs += 1
+            self.resync_time_total += elapsed
+            self.resync_time_max = max(self.resync_time_max, elapsed)
+
+    def handle(self, messages: List[Dict[str, Any]]) -> None:
+        """Applies a batch of orderbook messages; other message types are ignored.
+
+        "ok" replies to update_subscription carry the next seq of their sid, so they are
+        counted into the sequence; they must arrive in stream order with the deltas.
+        """
+        books, seqs = self.books, self._seqs
+        for message in messages:
+            kind = message.get("type")
+            if kind == DELTA_CHANNEL:
+                sid, seq = message.get("sid"), message.get("seq")
+                if seq is not None:
+                    last = seqs.get(sid)
+                    seqs[sid] = seq
+                    if last is not None and seq != last + 1:
+                        self._gap(sid)
+                body = message["msg"]
+                ticker = body["market_ticker"]
+                book = books.get(ticker) or self.book(ticker)
+                book.apply(body["side"], body["price"], body["delta"])
+                self.deltas += 1
+            elif kind == SNAPSHOT_CHANNEL:
+                body = message["msg"]
+                ticker = body["market_ticker"]
+                sid, seq = message.get("sid"), message.get("seq")
+                if seq is not None:
+                    seqs[sid] = seq
+                self._sids[ticker] = sid
+                self.load(ticker, body.get("yes"), body.get("no"))
+                self.snapshots += 1
+            elif kind == ACK_CHANNEL:
+                sid, seq = message.get("sid"), message.get("seq")
+                if seq is not None and sid in seqs:
+                    seqs[sid] = seq
+
+    def best_bid(self, ticker: str, side: str = "yes") -> Tuple[int, int]:
+        """Returns (price, quantity) of a market's best bid, (0, 0) if unknown."""
+        book = self.books.get(ticker)
+        return book.best_bid(side) if book is not None else (0, 0)
+
+    def best_ask(self, ticker: str, side: str = "yes") -> Tuple[int, int]:
+        """Returns (price, quantity) of a market's best ask, (0, 0) if unknown."""
+        book = self.books.get(ticker)
+        return book.best_ask(side) if book is not None else (0, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns book and message counters, and gap-to-resync times in seconds."""
+        return {
+            "books": len(self.books),
+            "stale": sum(1 for book in list(self.books.values()) if book.stale),
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "gaps": self.gaps,
+            "resyncing": len(self._stale_since),
+            "resyncs": self.resyncs,
+            "avg_resync_time": self.resync_time_total / self.resyncs if self.resyncs else 0.0,
+            "max_resync_time": self.resync_time_max,
+        }
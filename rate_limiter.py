@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Kalshi access tiers as (reads per second, writes per second)
+KALSHI_TIERS = {
+    "basic": (10, 5),
+    "advanced": (30, 30),
+    "premier": (100, 100),
+    "prime": (100, 400),
+}
+
+class TokenBucket:
+    """Token bucket that can be shared by threads and coroutines.
+
+    Every acquire reserves its tokens up front under a short lock, letting the balance go
+    negative, and then sleeps outside the lock for as long as the debt takes to refill.
+    Callers are therefore served in arrival order, each acquire is O(1), and async callers
+    wait with asyncio.sleep instead of blocking the event loop.
+    """
+    def __init__(self, rate: float, burst: float = 1.0):
+        """Initializes the bucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity, i.e. how many tokens can be spent back to back after
+                an idle period. In any one-second window at most rate + burst tokens are spent.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve(self, tokens: float) -> float:
+        """Takes tokens from the bucket and returns how long the caller must wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self.acquired += 1
+            if wait > 0:
+                self.waited += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def _refund(self, tokens: float) -> None:
+        """Returns tokens reserved by a caller that gave up before using them."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + tokens)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks the calling thread until the tokens are available.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Waits without blocking the event loop until the tokens are available.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._refund(tokens)
+                raise
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns counters describing how much this bucket has throttled its callers."""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "total_wait": self.total_wait,
+                "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+class RateLimiter:
+    """Separate read and write token buckets matching Kalshi's per-tier limits.
+
+    A single instance can be passed to several clients so they share one budget.
+    """
+    def __init__(
+        self,
+        read_rate: float,
+        write_rate: Optional[float] = None,
+        read_burst: float = 1.0,
+        write_burst: float = 1.0
+    ):
+        """Initializes the limiter.
+
+        Args:
+            read_rate: Read requests per second.
+            write_rate: Write requests per second. Defaults to read_rate.
+            read_burst: Read requests allowed back to back after an idle period.
+            write_burst: Write requests allowed back to back after an idle period.
+        """
+        self.read = TokenBucket(read_rate, read_burst)
+        self.write = TokenBucket(write_rate or read_rate, write_burst)
+
+    @classmethod
+    def for_tier(cls, tier: str, read_burst: float = 1.0, write_burst: float = 1.0) -> "RateLimiter":
+        """Builds a limiter running at the published limits of a Kalshi access tier."""
+        try:
+            read_rate, write_rate = KALSHI_TIERS[tier.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown tier: {tier}") from None
+        return cls(read_rate, write_rate, read_burst, write_burst)
+
+    def _bucket(self, kind: str) -> TokenBucket:
+        if kind == "read":
+            return self.read
+        if kind == "write":
+            return self.write
+        raise ValueError(f"Invalid rate limit kind: {kind}")
+
+    def acquire(self, kind: str = "read", cost: float = 1.0) -> float:
+        """Blocks until a request of the given kind may be sent. Returns seconds waited."""
+        return self._bucket(kind).acquire(cost)
+
+    async def acquire_async(self, kind: str = "read", cost: float = 1.0) -> float:
+        """Async version of acquire. Returns seconds waited."""
+        return await self._bucket(kind).acquire_async(cost)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns wait statistics for both budgets."""
+        return {"read": self.read.stats(), "write": self.write.stats()}
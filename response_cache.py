@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class CacheEntry:
+    """A cached response body with its expiry time and validator."""
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body: Any, etag: Optional[str], expires: float):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+class ResponseCache:
+    """Size-bounded LRU cache of GET responses with a TTL per endpoint.
+
+    TTLs are looked up by the longest matching path prefix, falling back to default_ttl.
+    A TTL of 0 (or a default_ttl of None) leaves the endpoint uncached. Expired entries
+    that carry an ETag are kept so the next request can revalidate them with
+    If-None-Match; a 304 answer renews the entry without transferring the body again.
+
+    Cached bodies are shared between callers and must be treated as read-only.
+    """
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: Optional[float] = None,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        """Initializes the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used one is evicted.
+            default_ttl: Seconds to cache endpoints without an entry in ttls. None disables
+                caching for them.
+            ttls: Seconds to cache responses, keyed by path prefix, e.g.
+                {"/trade-api/v2/exchange/status": 5, "/trade-api/v2/markets/": 1}.
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # Longest prefixes first so the most specific rule wins
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        """Returns how long responses for the path are cached, or None if they are not."""
+        for prefix, ttl in self.ttls:
+            if path.startswith(prefix):
+                return ttl or None
+        return self.default_ttl or None
+
+    def lookup(self, path: str, params: Dict[str, Any]) -> Tuple[Optional[tuple], Optional[CacheEntry]]:
+        """Finds the cached response for a request.
+
+        Returns:
+            (key, entry). key is None when the path is not cacheable. entry is None on a
+            miss, fresh on a hit, or stale but carrying an ETag when it can be revalidated.
+        """
+        if self.ttl_for(path) is None:
+            return None, None
+        key = (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.is_fresh():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry
+            self.misses += 1
+            if entry is not None and entry.etag is None:
+                del self._entries[key]
+                entry = None
+            return key, entry
+
+    def store(self, key: tuple, body: Any, etag: Optional[str]) -> None:
+        """Caches a response body under a key returned by lookup."""
+        entry = CacheEntry(body, etag, time.monotonic() + self.ttl_for(key[0]))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: tuple, entry: CacheEntry) -> Any:
+        """Renews a stale entry after a 304 Not Modified and returns its body."""
+        self.store(key, entry.body, entry.etag)
+        with self._lock:
+            self.revalidations += 1
+        return entry.body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,216 @@
+import asyncio
+import base64
+import concurrent.futures
+import queue
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization, hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.exceptions import InvalidSignature
+
+def sign_pss(private_key: rsa.RSAPrivateKey, text: str) -> str:
+    """Signs the text using RSA-PSS and returns the base64 encoded signature."""
+    message = text.encode('utf-8')
+    try:
+        signature = private_key.sign(
+            message,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.DIGEST_LENGTH
+            ),
+            hashes.SHA256()
+        )
+        return base64.b64encode(signature).decode('utf-8')
+    except InvalidSignature as e:
+        raise ValueError("RSA sign PSS failed") from e
+
+class SigningStats:
+    """Thread-safe counters for signature throughput and latency."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.signatures = 0
+        self.batches = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latencies: List[float]) -> None:
+        """Records one batch of completed signatures and the latency of each."""
+        with self._lock:
+            self.signatures += len(latencies)
+            self.batches += 1
+            self.total_latency += sum(latencies)
+            self.max_latency = max(self.max_latency, max(latencies, default=0.0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the counters along with derived signatures/sec and average latency."""
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "signatures": self.signatures,
+                "batches": self.batches,
+                "signatures_per_second": self.signatures / elapsed if elapsed > 0 else 0.0,
+                "avg_latency": self.total_latency / self.signatures if self.signatures else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+class InlineSigner:
+    """Signs on the calling thread. This is the default and matches the original behaviour."""
+    def __init__(self, private_key: rsa.RSAPrivateKey):
+        self.private_key = private_key
+        self.stats = SigningStats()
+
+    def sign(self, text: str) -> str:
+        started = time.perf_counter()
+        signature = sign_pss(self.private_key, text)
+        self.stats.record([time.perf_counter() - started])
+        return signature
+
+    async def sign_async(self, text: str) -> str:
+        return self.sign(text)
+
+    def close(self) -> None:
+        pass
+
+# Key loaded once per worker process by ProcessPoolSigner's initializer
+_worker_key = None
+
+def _init_worker(private_key_pem: bytes) -> None:
+    global _worker_key
+    _worker_key = serialization.load_pem_private_key(private_key_pem, password=None)
+
+def _sign_batch(texts: List[str]) -> List[str]:
+    return [sign_pss(_worker_key, text) for text in texts]
+
+class ProcessPoolSigner:
+    """Signs in worker processes, outside the GIL of the process issuing requests.
+
+    Requests are queued and a dispatcher thread groups them into batches of up to
+    batch_size, waiting at most max_batch_delay for a batch to fill, so bursts pay one
+    inter-process round trip per batch rather than per signature. Several batches can
+    be in flight at once, one per worker process.
+
+    If the pool breaks (e.g. a worker died), the batches it failed are signed in process
+    instead, and so is every later request, in the dispatcher thread.
+    """
+    def __init__(
+        self,
+        private_key: rsa.RSAPrivateKey,
+        processes: Optional[int] = None,
+        batch_size: int = 32,
+        max_batch_delay: float = 0.002
+    ):
+        """Initializes the signer and starts its worker processes.
+
+        Args:
+            private_key: RSA private key; it is handed to the workers as unencrypted PEM.
+            processes: Number of worker processes. Defaults to the CPU count.
+            batch_size: Maximum signatures sent to a worker in one call.
+            max_batch_delay: Seconds to wait for more requests before sending a partial batch.
+        """
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.stats = SigningStats()
+        self.private_key = private_key
+        self.pool_error = None  # Set once the pool fails and signing falls back in process
+
+        private_key_pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(private_key_pem,)
+        )
+        self._pending = queue.Queue()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="signer-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text: str) -> concurrent.futures.Future:
+        """Queues the text for signing and returns a future for the signature."""
+        if self._closed:
+            raise RuntimeError("Signer is closed")
+        future = concurrent.futures.Future()
+        self._pending.put((text, future, time.perf_counter()))
+        return future
+
+    def sign(self, text: str) -> str:
+        return self.submit(text).result()
+
+    async def sign_async(self, text: str) -> str:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def close(self) -> None:
+        """Signs whatever is still queued, then stops the dispatcher and worker processes."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.put(None)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=True)
+
+    def _dispatch(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._pending.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._pending.get(timeout=timeout) if timeout > 0 else self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            if self.pool_error is not None:
+                self._sign_inline(batch)
+                continue
+            try:
+                result = self._pool.submit(_sign_batch, [text for text, _, _ in batch])
+            except Exception as e:
+                self._pool_failed(e)
+                self._sign_inline(batch)
+                continue
+            result.add_done_callback(partial(self._complete, batch))
+
+    def _pool_failed(self, error: BaseException) -> None:
+        if self.pool_error is None:
+            print(f"Signing pool failed, signing in process from now on: {error}")
+            self.pool_error = error
+
+    def _sign_inline(self, batch: List[tuple]) -> None:
+        for text, future, _ in batch:
+            try:
+                future.set_result(sign_pss(self.private_key, text))
+            except Exception as e:
+                future.set_exception(e)
+        finished = time.perf_counter()
+        self.stats.record([finished - submitted for _, _, submitted in batch])
+
+    def _complete(self, batch: List[tuple], result: concurrent.futures.Future) -> None:
+        error = result.exception()
+        if isinstance(error, concurrent.futures.BrokenExecutor):
+            self._pool_failed(error)
+            self._sign_inline(batch)
+            return
+        if error is not None:
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+
+        finished = time.perf_counter()
+        for (_, future, _), signature in zip(batch, result.result()):
+            future.set_result(signature)
+        self.stats.record([finished - submitted for _, _, submitted in batch])
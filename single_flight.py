@@ -0,0 +1,80 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Coalesces identical concurrent calls so only one of them does the work.
+
+    The first caller for a key runs the call; callers arriving with the same key while it
+    is in flight wait for it and receive the same result (or exception). Threads coalesce
+    with threads and coroutines with coroutines on the same loop, so a blocking call made
+    from the event loop thread never waits on a coroutine that loop would have to run.
+
+    Results are shared between callers and must be treated as read-only.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        self.calls = 0
+        self.saved = 0
+
+    @staticmethod
+    def key(path: str, params: Dict[str, Any]) -> tuple:
+        """Builds the key identifying a GET request."""
+        return (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Runs fn, or waits for the identical call already running on another thread."""
+        with self._lock:
+            self.calls += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self.saved += 1
+                leader = False
+            else:
+                future = self._calls[key] = concurrent.futures.Future()
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits fn(), or the identical call already in flight on this event loop.
+
+        The shared call runs as its own task, so cancelling one waiter does not cancel
+        it for the others.
+        """
+        task_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(task_key)
+            if task is not None and not task.done():
+                self.saved += 1
+            else:
+                task = self._tasks[task_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda done: self._forget(task_key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key: tuple, task: asyncio.Future) -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns how many calls were made and how many were served by another caller's request."""
+        with self._lock:
+            return {"calls": self.calls, "saved": self.saved, "in_flight": len(self._calls) + len(self._tasks)}
@@ -0,0 +1,202 @@
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+# Message types the server answers subscription commands with
+CONTROL_CHANNELS = ("subscribed", "unsubscribed", "ok", "error")
+
+def shard_of(ticker: str, shards: int) -> int:
+    """Returns the shard (0 to shards - 1) a market ticker belongs to.
+
+    Stable across processes and runs, so separate processes can each own one shard of a
+    ticker set by keeping the tickers where shard_of(ticker, shards) == their index.
+    """
+    return zlib.crc32(ticker.encode()) % shards
+
+class Subscription:
+    """Channels and market tickers of one subscribe command, and the sids the server gave it.
+
+    tickers is None for a subscription to every market. The server assigns one sid per
+    channel; sids is empty until it acknowledges the subscription and after a disconnect.
+    failed counts the channels the server answered with an error instead.
+    """
+    __slots__ = ("channels", "tickers", "sids", "sent_tickers", "failed")
+
+    def __init__(self, channels: Iterable[str], tickers: Optional[Iterable[str]] = None):
+        self.channels = tuple(channels)
+        self.tickers = set(tickers) if tickers is not None else None
+        self.sids = {}
+        self.sent_tickers = None  # Tickers the server has, or will have once it acknowledges
+        self.failed = 0
+
+    def answered(self) -> bool:
+        """Whether the server has acknowledged or refused every channel."""
+        return len(self.sids) + self.failed >= len(self.channels)
+
+    def __repr__(self) -> str:
+        tickers = "all" if self.tickers is None else len(self.tickers)
+        return f"Subscription(channels={list(self.channels)}, tickers={tickers}, sids={self.sids})"
+
+class SubscriptionManager:
+    """Tracks the subscriptions of one WebSocket connection and keeps the server in sync.
+
+    Subscriptions can be added, changed and removed whether or not the connection is open.
+    While it is open, changes go out right away: new tickers with update_subscription once
+    the server has acknowledged the subscription, or after the acknowledgement arrives.
+    replay() resubscribes everything on a new connection, since sids do not survive a
+    reconnect.
+
+    handle() takes batches of the server's replies (CONTROL_CHANNELS) and is meant to be
+    registered as a dispatcher handler.
+    """
+    def __init__(self):
+        self.subscriptions = []
+        self._send = None
+        self._requests = {}  # subscribe command id -> Subscription
+        self.errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._send is not None
+
+    async def subscribe(self, channels: Iterable[str], tickers: Optional[Iterable[str]] = None) -> Subscription:
+        """Adds a subscription to channels for tickers, or for every market if tickers is None."""
+        subscription = Subscription(channels, tickers)
+        self.subscriptions.append(subscription)
+        if self._send is not None:
+            await self._subscribe(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        """Removes a subscription."""
+        self.subscriptions.remove(subscription)
+        if self._send is not None and subscription.sids:
+            await self._send("unsubscribe", {"sids": list(subscription.sids.values())})
+        subscription.sids = {}
+
+    async def add_tickers(self, subscription: Subscription, tickers: Iterable[str]) -> None:
+        """Adds market tickers to a subscription."""
+        if subscription.tickers is None:
+            raise ValueError("Subscription already covers every market")
+        subscription.tickers.update(tickers)
+        await self._sync(subscription)
+
+    async def remove_tickers(self, subscription: Subscription, tickers: Iterable[str]) -> None:
+        """Removes market tickers from a subscription. Removing the last one unsubscribes."""
+        if subscription.tickers is None:
+            raise ValueError("Cannot remove tickers from a subscription to every market")
+        subscription.tickers.difference_update(tickers)
+        if not subscription.tickers:
+            await self.unsubscribe(subscription)
+        else:
+            await self._sync(subscription)
+
+    async def refresh(self, subscription: Subscription, tickers: Iterable[str]) -> bool:
+        """Removes and re-adds tickers on the server so it sends them fresh snapshots.
+
+        Returns:
+            False if the subscription is not live, in which case the next replay() or
+            acknowledgement sends everything anyway.
+        """
+        tickers = sorted(set(tickers) & (subscription.sent_tickers or set()))
+        if self._send is None or not subscription.sids or not tickers:
+            return False
+        for action in ("delete_markets", "add_markets"):
+            for sid in subscription.sids.values():
+                await self._send("update_subscription", {
+                    "sids": [sid],
+                    "market_tickers": tickers,
+                    "action": action,
+                })
+        return True
+
+    def find(self, channels: Iterable[str]) -> Optional[Subscription]:
+        """Returns the first subscription to exactly these channels, if any."""
+        channels = tuple(channels)
+        for subscription in self.subscriptions:
+            if subscription.channels == channels:
+                return subscription
+        return None
+
+    async def replay(self, send: Callable[[str, Dict[str, Any]], Awaitable[int]]) -> None:
+        """Sends every subscription on a newly opened connection.
+
+        Args:
+            send: Coroutine function sending a command with params and returning its id.
+        """
+        self.disconnected()
+        self._send = send
+        for subscription in list(self.subscriptions):
+            await self._subscribe(subscription)
+
+    def disconnected(self) -> None:
+        """Forgets server state after the connection closed."""
+        self._send = None
+        self._requests.clear()
+        for subscription in self.subscriptions:
+            subscription.sids = {}
+            subscription.sent_tickers = None
+            subscription.failed = 0
+
+    async def _subscribe(self, subscription: Subscription) -> None:
+        subscription.failed = 0
+        params = {"channels": list(subscription.channels)}
+        if subscription.tickers is not None:
+            params["market_tickers"] = sorted(subscription.tickers)
+            subscription.sent_tickers = set(subscription.tickers)
+        request_id = await self._send("subscribe", params)
+        self._requests[request_id] = subscription
+
+    async def _sync(self, subscription: Subscription) -> None:
+        """Sends ticker changes for an acknowledged subscription; others sync on their ack.
+
+        Changes wait until the server has answered every channel, so each sid receives
+        the same changes against the same sent_tickers; refused channels get none.
+        """
+        if (self._send is None or subscription.sent_tickers is None or not subscription.sids
+                or not subscription.answered()):
+            return
+        added = subscription.tickers - subscription.sent_tickers
+        removed = subscription.sent_tickers - subscription.tickers
+        subscription.sent_tickers = set(subscription.tickers)
+        for action, tickers in (("add_markets", added), ("delete_markets", removed)):
+            if not tickers:
+                continue
+            for sid in subscription.sids.values():
+                await self._send("update_subscription", {
+                    "sids": [sid],
+                    "market_tickers": sorted(tickers),
+                    "action": action,
+                })
+
+    async def handle(self, messages: List[Dict[str, Any]]) -> None:
+        """Records sids from subscription acknowledgements and counts errors."""
+        for message in messages:
+            kind = message.get("type")
+            body = message.get("msg") or {}
+            if kind == "subscribed":
+                subscription = self._requests.get(message.get("id"))
+                if subscription is None:
+                    continue
+                subscription.sids[body.get("channel")] = body.get("sid")
+                await self._answered(message["id"], subscription)
+            elif kind == "error":
+                self.errors += 1
+                print(f"WebSocket command {message.get('id')} failed: {body.get('msg', body)}")
+                subscription = self._requests.get(message.get("id"))
+                if subscription is not None:
+                    # Errors name no channel; the other channels may still be acknowledged
+                    subscription.failed += 1
+                    await self._answered(message["id"], subscription)
+
+    async def _answered(self, request_id: int, subscription: Subscription) -> None:
+        """Finishes a subscribe command once every channel is acknowledged or refused."""
+        if not subscription.answered():
+            return
+        del self._requests[request_id]
+        if subscription not in self.subscriptions:
+            # Unsubscribed before the server acknowledged it
+            if subscription.sids:
+                await self._send("unsubscribe", {"sids": list(subscription.sids.values())})
+            subscription.sids = {}
+        else:
+            await self._sync(subscription)
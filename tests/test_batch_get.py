@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiHttpClient
+
+@pytest.fixture
+def client():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return KalshiHttpClient("test", private_key, Environment.DEMO, max_workers=4)
+
+def slow_get(path, params={}):
+    """Later tickers answer first, so completion order is the reverse of input order."""
+    index = int(path.rsplit("-", 1)[1])
+    time.sleep(0.02 * (5 - index))
+    if index == 2:
+        raise ValueError("boom")
+    return {"market": {"ticker": path.rsplit("/", 1)[1], "thread": threading.current_thread().name}}
+
+def test_batch_get_keeps_input_order_on_the_persistent_pool(client, monkeypatch):
+    monkeypatch.setattr(client, "get", slow_get)
+    executor = client.thread_executor
+    markets = client.get_markets_batch([f"KX-{i}" for i in range(5)])
+    assert [m.get("ticker") for m in markets] == ["KX-0", "KX-1", None, "KX-3", "KX-4"]
+    assert markets[2] == {"error": "boom"}
+    client.batch_get(["/trade-api/v2/markets/KX-0"])
+    assert client.thread_executor is executor  # No pool is built per call
+
+def test_iter_batch_get_yields_as_requests_finish(client, monkeypatch):
+    monkeypatch.setattr(client, "get", slow_get)
+    paths = [f"/trade-api/v2/markets/KX-{i}" for i in range(5)]
+    indexes = [index for index, _ in client.iter_batch_get(paths)]
+    assert sorted(indexes) == list(range(5))
+    assert indexes[0] != 0  # The slowest request does not hold the others back
+
+def test_async_iter_batch_get_cancels_pending_requests_when_closed(client, monkeypatch):
+    started, finished = [], []
+
+    async def async_get(path, params={}, **kwargs):
+        started.append(path)
+        await asyncio.sleep(0.01 if path.endswith("fast") else 10)
+        finished.append(path)
+        return {"path": path}
+
+    monkeypatch.setattr(client, "async_get", async_get)
+
+    async def run():
+        stream = client.async_iter_batch_get(["/slow", "/fast"], concurrency=2)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == (1, {"path": "/fast"})
+    assert finished == ["/fast"]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiHttpClient
+
+@pytest.fixture(scope="module")
+def client():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return KalshiHttpClient("test", private_key, Environment.DEMO)
+
+def test_split_tickers_respects_page_and_url_limits(client, monkeypatch):
+    monkeypatch.setattr(client, "BULK_MARKETS_PAGE_SIZE", 3)
+    tickers = [f"KX-{i}" for i in range(7)] + ["KX-0"]
+    assert client.split_tickers(tickers) == [["KX-0", "KX-1", "KX-2"], ["KX-3", "KX-4", "KX-5"], ["KX-6"]]
+    monkeypatch.setattr(client, "BULK_MARKETS_MAX_QUERY_CHARS", 20)
+    assert [len(batch) for batch in client.split_tickers(tickers)] == [2, 2, 2, 1]
+
+def test_bulk_fetch_sends_one_request_per_batch(client, monkeypatch):
+    monkeypatch.setattr(client, "BULK_MARKETS_PAGE_SIZE", 3)
+    requests = []
+
+    async def async_get(path, params={}, **kwargs):
+        requests.append(params["tickers"])
+        if "FAIL" in params["tickers"]:
+            return {"error": "500: server error"}
+        # GONE is not returned by the API
+        return {"markets": [{"ticker": t} for t in params["tickers"].split(",") if t != "GONE"], "cursor": ""}
+
+    monkeypatch.setattr(client, "async_get", async_get)
+    markets = asyncio.run(client.get_markets_bulk_async(["A", "B", "GONE", "FAIL"]))
+    assert sorted(requests) == ["A,B,GONE", "FAIL"]
+    assert markets["A"] == {"ticker": "A"} and markets["B"] == {"ticker": "B"}
+    assert "GONE" not in markets
+    assert "error" in markets["FAIL"]
+
+def test_sync_bulk_fetch_follows_cursors(client, monkeypatch):
+    pages = {None: {"markets": [{"ticker": "A"}], "cursor": "next"},
+             "next": {"markets": [{"ticker": "B"}], "cursor": ""}}
+    monkeypatch.setattr(client, "get", lambda path, params={}: pages[params.get("cursor")])
+    assert set(client.get_markets_bulk(["A", "B"])) == {"A", "B"}
@@ -0,0 +1,48 @@
+import os
+
+from checkpoint_store import MANIFEST, CheckpointStore
+
+def records(*pairs):
+    return [{"market_ticker": ticker, "last_price": price} for ticker, price in pairs]
+
+def test_appends_segments_and_reads_them_back(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    assert not store.exists() and len(store) == 0
+    assert store.append([]) == 0
+    assert store.append(records(("A", 1), ("B", 2))) == 2
+    assert store.append(records(("A", 3))) == 1
+    assert store.exists() and len(store) == 3
+    reopened = CheckpointStore(str(tmp_path))
+    assert list(reopened) == records(("A", 1), ("B", 2), ("A", 3))
+    assert [segment["name"] for segment in reopened.manifest["segments"]] == ["segment-000000.jsonl", "segment-000001.jsonl"]
+
+def test_uncommitted_segment_is_ignored(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.append(records(("A", 1)))
+    # A crash after writing a segment but before committing the manifest
+    with open(tmp_path / "segment-000001.jsonl", "w") as f:
+        f.write('{"market_ticker":"B","last_price":2}\n{"market_ticker":"C"')
+    reopened = CheckpointStore(str(tmp_path))
+    assert list(reopened) == records(("A", 1))
+    reopened.append(records(("D", 4)))
+    assert list(CheckpointStore(str(tmp_path))) == records(("A", 1), ("D", 4))
+
+def test_compact_keeps_last_record_per_key(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.append(records(("A", 1), ("B", 2)))
+    store.append(records(("A", 3)))
+    (tmp_path / "segment-000009.jsonl").write_text("stray\n")
+    assert store.compact() == 2
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("segment-")) == ["segment-000002.jsonl"]
+    reopened = CheckpointStore(str(tmp_path))
+    assert len(reopened) == 2
+    assert list(reopened) == records(("A", 3), ("B", 2))
+
+def test_clear(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.append(records(("A", 1)))
+    store.clear()
+    assert not store.exists()
+    assert os.listdir(tmp_path) == []
+    assert not CheckpointStore(str(tmp_path)).exists()
+    assert not (tmp_path / MANIFEST).exists()
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds
+
+from columnar_export import ColumnarExporter
+
+def record(ticker, last_price, timestamp="2025-05-10 23:59:59"):
+    return {
+        'event_ticker': "KXTEST", 'event_category': "Politics", 'market_title': ticker,
+        'market_ticker': ticker, 'status': "active", 'market_type': "binary",
+        'close_time': "2025-12-31T21:00:00Z", 'last_price': last_price, 'yes_bid': None,
+        'yes_ask': None, 'volume_24h': 0, 'open_interest': 0, 'timestamp': timestamp,
+        'raw_data': {"ticker": ticker},
+    }
+
+def read(directory):
+    table = ds.dataset(directory, format="parquet", partitioning="hive").to_table()
+    return sorted(zip(table["snapshot_date"].to_pylist(), table["market_ticker"].to_pylist(),
+                      table["last_price"].to_pylist()))
+
+def test_crawl_past_midnight_stays_in_one_snapshot(tmp_path):
+    with ColumnarExporter(str(tmp_path), snapshot_date="2025-05-10") as exporter:
+        exporter.write([record("A", 0.1), record("B", 0.2, timestamp="2025-05-11 00:00:01")])
+    assert [row[0] for row in read(str(tmp_path))] == ["2025-05-10", "2025-05-10"]
+
+def test_last_record_of_a_ticker_wins_as_in_the_checkpoint(tmp_path):
+    with ColumnarExporter(str(tmp_path), row_group_size=2, snapshot_date="2025-05-10") as exporter:
+        exporter.write([record("A", 0.1), record("A", 0.15)])  # Still buffered: replaced
+        exporter.write([record("B", 0.2), record("C", 0.3)])  # Fills and flushes the row group
+        exporter.write([record("B", 0.25)])  # Already written: its row is rewritten at close
+    assert read(str(tmp_path)) == [
+        ("2025-05-10", "A", 0.15), ("2025-05-10", "B", 0.25), ("2025-05-10", "C", 0.3),
+    ]
+    assert exporter.rows == 3
+    assert exporter.stats()["duplicates"] == 2
+
+def test_ticker_that_changes_category_is_written_once(tmp_path):
+    moved = dict(record("A", 0.2), event_category="Economics")
+    with ColumnarExporter(str(tmp_path / "written"), row_group_size=1, snapshot_date="2025-05-10") as exporter:
+        exporter.write([record("A", 0.1), moved])
+    with ColumnarExporter(str(tmp_path / "buffered"), snapshot_date="2025-05-10") as buffered:
+        buffered.write([record("A", 0.1), moved])
+    for directory in (tmp_path / "written", tmp_path / "buffered"):
+        table = ds.dataset(str(directory), format="parquet", partitioning="hive").to_table()
+        assert table["event_category"].to_pylist() == ["Economics"]
+        assert table["last_price"].to_pylist() == [0.2]
+    assert len(exporter.paths) == 1 and len(buffered.paths) == 1
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_typed_columns_and_partitions(tmp_path, format):
+    sports = dict(record("S", 0.5), event_category="Sports & Games")
+    with ColumnarExporter(str(tmp_path), format=format, row_group_size=2, snapshot_date="2025-05-10") as exporter:
+        exporter.write([record("A", 0.1), record("B", None), record("C", 0.3), sports])
+    assert exporter.stats() == {"rows": 4, "row_groups": 3, "files": 2, "duplicates": 0, "buffered": 0}
+    assert any("event_category=Sports%20%26%20Games" in path for path in exporter.paths)
+    dataset = ds.dataset(str(tmp_path), format="ipc" if format == "arrow" else "parquet", partitioning="hive")
+    table = dataset.to_table(filter=ds.field("event_category") == "Politics").sort_by("market_ticker")
+    assert table["market_ticker"].to_pylist() == ["A", "B", "C"]
+    assert table["last_price"].to_pylist() == [0.1, None, 0.3]
+    assert table.schema.field("close_time").type.tz == "UTC"  # Parquet reads seconds back as ms
+    assert table["close_time"][0].as_py().isoformat() == "2025-12-31T21:00:00+00:00"
+    assert table["timestamp"][0].as_py().isoformat() == "2025-05-10T23:59:59"
+    assert table["raw_data"][0].as_py() == b'{"ticker":"A"}'
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+from congestion import ConcurrencyController, RetryBudget, parse_retry_after
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert 58 <= parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_retry_budget_is_shared_until_spent():
+    budget = RetryBudget(2)
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+def test_retry_after_pauses_every_caller():
+    async def run():
+        controller = ConcurrencyController(initial_window=4)
+        controller.on_congestion(retry_after=0.05)
+        started = time.monotonic()
+        await asyncio.gather(controller.acquire(), controller.acquire())
+        return time.monotonic() - started, controller
+
+    waited, controller = asyncio.run(run())
+    assert waited >= 0.045
+    assert controller.in_flight == 2
+    assert controller.stats()["congestion_events"] == 1
+
+def test_freed_slot_goes_to_the_longest_waiting_caller():
+    async def run():
+        controller = ConcurrencyController(initial_window=1, max_window=1)
+        order = []
+
+        async def request(name):
+            await controller.acquire()
+            order.append(name)
+            await asyncio.sleep(0)
+            controller.release()
+
+        await controller.acquire()
+        waiting = asyncio.ensure_future(request("waiting"))
+        await asyncio.sleep(0)  # Queued behind the held slot
+        controller.release()
+        # A caller arriving right after the release must not overtake the waiter
+        await asyncio.gather(request("new"), waiting)
+        return order, controller
+
+    order, controller = asyncio.run(run())
+    assert order == ["waiting", "new"]
+    assert controller.in_flight == 0
+
+def test_cancelled_waiter_passes_its_slot_on():
+    async def run():
+        controller = ConcurrencyController(initial_window=1, max_window=1)
+        await controller.acquire()
+        cancelled = asyncio.ensure_future(controller.acquire())
+        second = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()  # Hands the slot to `cancelled`...
+        cancelled.cancel()  # ...which gives it up before it runs
+        await asyncio.wait_for(second, 1)
+        return controller
+
+    assert asyncio.run(run()).in_flight == 1
+
+def test_window_halves_once_per_round_trip_and_grows_back():
+    controller = ConcurrencyController(initial_window=16)
+    controller.on_success(0.1)
+    controller.on_congestion()
+    controller.on_congestion()  # Same moment: counted once
+    assert int(controller.window) == 8
+    for _ in range(9):  # About one extra slot per window's worth of successes
+        controller.on_success(0.1)
+    assert int(controller.window) == 9
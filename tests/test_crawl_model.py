@@ -0,0 +1,52 @@
+from crawl_model import CrawlModel
+
+def record(ticker, event_ticker, category="Politics", **fields):
+    return dict({"market_ticker": ticker, "event_ticker": event_ticker, "event_category": category}, **fields)
+
+def test_add_events_indexes_relations():
+    model = CrawlModel()
+    model.add_events([
+        {"event_ticker": "E1", "category": "Politics", "markets": [{"ticker": "M1"}, {"ticker": "M2"}]},
+        {"event_ticker": "E2", "category": "Sports", "markets": [{"ticker": "M3"}]},
+        {"event_ticker": "E3", "category": "Politics"},
+    ])
+    assert "markets" not in model.event("E1")
+    assert model.event("E9") == {}
+    assert model.tickers() == ["M1", "M2", "M3"]
+    assert model.event_of("M3") == "E2" and model.event_of("M9") is None
+    assert model.category_events == {"Politics": ["E1", "E3"], "Sports": ["E2"]}
+
+def test_event_listed_again_without_markets_keeps_them():
+    model = CrawlModel()
+    model.add_events([{"event_ticker": "E1", "category": "Politics", "markets": [{"ticker": "M1"}]}])
+    model.add_events([{"event_ticker": "E1", "category": "Politics", "title": "New"}])
+    assert model.event("E1")["title"] == "New"
+    assert model.tickers() == ["M1"]
+    assert model.category_events == {"Politics": ["E1"]}  # Not listed twice
+    model.add_events([{"event_ticker": "E1", "category": "Politics", "markets": []}])
+    assert model.tickers() == []
+
+def test_add_market_replaces_and_take_added():
+    model = CrawlModel()
+    model.add_market(record("M1", "E1", last_price=1), new=False)
+    model.add_market(record("M2", "E1"))
+    model.add_market(record("M1", "E1", last_price=2))
+    assert len(model) == 2 and "M1" in model
+    assert [r["market_ticker"] for r in model] == ["M1", "M2"]
+    assert model.records()[0]["last_price"] == 2
+    assert [r["market_ticker"] for r in model.take_added()] == ["M2", "M1"]
+    assert model.take_added() == []
+
+def test_groupings():
+    model = CrawlModel()
+    model.add_events([
+        {"event_ticker": "E1", "category": "Politics", "markets": [{"ticker": "M2"}, {"ticker": "M1"}]},
+        {"event_ticker": "E2", "category": "Sports", "markets": [{"ticker": "M3"}]},
+    ])
+    for ticker, event_ticker, category in (("M1", "E1", "Politics"), ("M3", "E2", "Sports"), ("M2", "E1", "Politics")):
+        model.add_market(record(ticker, event_ticker, category))
+    assert [r["market_ticker"] for r in model.markets_of("E1")] == ["M2", "M1"]  # The event's order
+    assert model.markets_of("E9") == []
+    groups = model.markets_by_event()
+    assert {k: [r["market_ticker"] for r in v] for k, v in groups.items()} == {"E1": ["M1", "M2"], "E2": ["M3"]}
+    assert model.category_counts() == {"Politics": 2, "Sports": 1}
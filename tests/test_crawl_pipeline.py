@@ -0,0 +1,102 @@
+import asyncio
+
+from crawl_pipeline import CrawlPipeline
+
+def run_pipeline(tickers, fetch, **options):
+    written = {}
+
+    async def run():
+        pipeline = CrawlPipeline(fetch, written.__setitem__, **options)
+        await pipeline.run(tickers)
+        return pipeline
+
+    return asyncio.run(run()), written
+
+def test_every_ticker_is_written_once():
+    async def fetch(batch):
+        await asyncio.sleep(0.001 * (hash(batch[0]) % 3))
+        return {ticker: {"ticker": ticker} for ticker in batch}
+
+    tickers = [f"T{i}" for i in range(100)]
+    pipeline, written = run_pipeline(tickers, fetch, fetchers=4, batch_size=7)
+    assert sorted(written) == sorted(tickers)
+    assert all(details == {"ticker": ticker} for ticker, details in written.items())
+    stats = pipeline.stats()
+    assert stats["produced"] == stats["fetched"] == stats["written"] == 100
+    assert stats["ticker_queue"] == stats["result_queue"] == stats["fetching"] == 0
+
+def test_batches_fill_up_to_batch_size():
+    sizes = []
+
+    async def fetch(batch):
+        sizes.append(len(batch))
+        return {}
+
+    pipeline, written = run_pipeline([f"T{i}" for i in range(10)], fetch, fetchers=1, batch_size=4)
+    assert sizes == [4, 4, 2]
+    assert pipeline.batches == 3
+    assert written == {f"T{i}": None for i in range(10)}  # Nothing fetched for them
+
+def test_linger_waits_for_a_slow_producer():
+    sizes = []
+
+    async def fetch(batch):
+        sizes.append(len(batch))
+        return {}
+
+    async def slow_tickers():
+        for i in range(6):
+            await asyncio.sleep(0.005)
+            yield f"T{i}"
+
+    run_pipeline(slow_tickers(), fetch, fetchers=1, batch_size=3, linger=1.0)
+    assert sizes == [3, 3]
+    sizes.clear()
+    run_pipeline(slow_tickers(), fetch, fetchers=1, batch_size=3, linger=0.0)
+    assert sizes == [1] * 6
+
+def test_fetch_errors_are_written_per_ticker():
+    async def fetch(batch):
+        if "B" in batch:
+            raise RuntimeError("boom")
+        return {ticker: {} for ticker in batch}
+
+    pipeline, written = run_pipeline(["A", "B", "C"], fetch, fetchers=1, batch_size=1)
+    assert written == {"A": {}, "B": {"error": "boom"}, "C": {}}
+    assert pipeline.errors == 0
+
+def test_write_errors_are_counted():
+    async def fetch(batch):
+        return {}
+
+    def write(ticker, details):
+        if ticker == "B":
+            raise ValueError("bad record")
+
+    async def run():
+        pipeline = CrawlPipeline(fetch, write, fetchers=2)
+        await pipeline.run(["A", "B", "C"])
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert pipeline.errors == 1
+    assert pipeline.written == 3
+
+def test_stop_drops_the_rest():
+    pipelines = []
+
+    async def fetch(batch):
+        if batch == ["T2"]:
+            pipelines[0].stop()
+        return {}
+
+    async def run():
+        written = []
+        pipeline = CrawlPipeline(fetch, lambda ticker, details: written.append(ticker), fetchers=1, max_queue=1)
+        pipelines.append(pipeline)
+        await asyncio.wait_for(pipeline.run(f"T{i}" for i in range(100)), 5)
+        return pipeline, written
+
+    pipeline, written = asyncio.run(run())
+    assert written == ["T0", "T1"]
+    assert pipeline.produced < 100
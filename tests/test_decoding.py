@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from decoding import LazyView, get_decoder, json_default, lazy_loads
+
+BODY = b'{"cursor":"c1","markets":[{"ticker":"A","yes_bid":40,"rules":"long text"},{"ticker":"B","yes_bid":null}]}'
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_decoders_agree(name):
+    pytest.importorskip(name)
+    assert get_decoder(name)(BODY) == json.loads(BODY)
+
+def test_unknown_decoder():
+    with pytest.raises(ValueError):
+        get_decoder("yaml")
+
+def test_lazy_views_decode_fields_on_access():
+    pytest.importorskip("msgspec")
+    view = lazy_loads(b"  " + BODY)
+    assert isinstance(view, LazyView)
+    markets = view["markets"]
+    assert [type(market) for market in markets] == [LazyView, LazyView]
+    assert markets[0]["yes_bid"] == 40
+    assert markets[1]["yes_bid"] is None
+    assert "rules" not in markets[0]._values  # Never decoded
+    assert view.to_dict() == json.loads(BODY)
+    assert json.loads(json.dumps(view, default=json_default)) == json.loads(BODY)
+    assert lazy_loads(b"[1, 2]") == [1, 2]
+
+def test_assignment_in_nested_view_marks_the_parent_modified():
+    pytest.importorskip("msgspec")
+    view = lazy_loads(BODY)
+    assert view.to_json() is view.raw
+    view["markets"][0]["yes_bid"] = 41
+    assert view.modified()
+    assert json.loads(view.to_json())["markets"][0]["yes_bid"] == 41
+
+def test_deleting_null_and_assigned_none_values():
+    pytest.importorskip("msgspec")
+    view = LazyView(b'{"a":null,"b":1,"c":{"d":2}}')
+    del view["a"]  # JSON null
+    view["e"] = None
+    del view["e"]  # Assigned None
+    assert "a" not in view and "e" not in view
+    assert view.to_dict() == {"b": 1, "c": {"d": 2}}
+    assert view.to_json() == b'{"b":1,"c":{"d":2}}'
+    with pytest.raises(KeyError):
+        del view["a"]
+
+def test_deleted_key_read_before_stays_deleted():
+    pytest.importorskip("msgspec")
+    view = LazyView(b'{"a":null,"b":1}')
+    assert view["a"] is None
+    del view["a"]
+    assert list(view) == ["b"]
+    assert view.to_dict() == {"b": 1}
+
+def test_unmodified_view_reuses_raw_bytes():
+    pytest.importorskip("msgspec")
+    raw = b'{"a": 1}'
+    assert LazyView(raw).to_json() is raw
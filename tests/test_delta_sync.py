@@ -0,0 +1,83 @@
+import asyncio
+
+from crawl_model import CrawlModel
+from delta_sync import SyncState, find_changes
+
+class FakeClient:
+    def __init__(self, traded=(), events=("KXEVENT",), markets=()):
+        self.traded = traded
+        self.events = events
+        self.markets = markets
+        self.market_params = []
+
+    async def iter_events(self, **params):
+        for event_ticker in self.events:
+            yield {"event_ticker": event_ticker, "category": "Politics"}
+
+    async def iter_markets(self, **params):
+        self.market_params.append(params)
+        for market in self.markets:
+            if params.get("event_ticker", market["event_ticker"]) == market["event_ticker"] and (
+                    params.get("status") is None or params["status"] == market["status"]):
+                yield market
+
+    async def iter_trades(self, **params):
+        for ticker in self.traded:
+            yield {"ticker": ticker}
+
+def record(ticker, status, close_time="2020-01-01T00:00:00Z"):
+    return {"market_ticker": ticker, "event_ticker": "KXEVENT", "status": status, "close_time": close_time}
+
+def test_settled_markets_are_not_refetched_but_closed_ones_are():
+    crawl = CrawlModel()
+    for ticker, status in (("OPEN", "open"), ("CLOSED", "closed"), ("SETTLED", "settled"),
+                           ("FUTURE", "active")):
+        close_time = "2999-01-01T00:00:00Z" if ticker == "FUTURE" else "2020-01-01T00:00:00Z"
+        crawl.add_market(record(ticker, status, close_time), new=False)
+    client = FakeClient(traded=("FUTURE", "SETTLED"))
+    _, _, stale = asyncio.run(find_changes(client, crawl, 0))
+    assert stale == {"OPEN", "CLOSED", "FUTURE"}
+
+def test_new_events_and_closed_markets_are_listed_not_refetched():
+    crawl = CrawlModel()
+    crawl.add_market(record("OLD", "open"), new=False)
+    client = FakeClient(
+        traded=("OLD", "NEW"),
+        events=("KXEVENT", "KXNEW"),
+        markets=[{"ticker": "NEW", "event_ticker": "KXNEW", "status": "active"},
+                 {"ticker": "OLD", "event_ticker": "KXEVENT", "status": "closed"}],
+    )
+    events, markets, stale = asyncio.run(find_changes(client, crawl, 1000.9))
+    assert [event["event_ticker"] for event in events] == ["KXEVENT", "KXNEW"]
+    assert sorted(markets) == ["NEW", "OLD"]
+    assert stale == set()  # Both were listed with their current state
+    assert {"event_ticker": "KXNEW"} in client.market_params
+    assert {"status": "closed", "min_close_ts": 1000} in client.market_params
+
+def test_state_round_trip(tmp_path):
+    state = SyncState(str(tmp_path))
+    assert not state.exists()
+    crawl = CrawlModel()
+    crawl.add_market(record("A", "open"))
+    state.save_full(crawl, 10.0)
+    crawl.take_added()
+    crawl.add_market(record("B", "open"))
+    assert state.save_delta(crawl, 20.0) == 1
+    reopened = SyncState(str(tmp_path))
+    assert reopened.exists()
+    assert (reopened.last_full, reopened.last_sync) == (10.0, 20.0)
+    loaded = CrawlModel()
+    assert reopened.load(loaded) == 2
+    assert loaded.take_added() == []
+
+def test_save_delta_appends_until_compacted(tmp_path):
+    state = SyncState(str(tmp_path))
+    crawl = CrawlModel()
+    crawl.add_market(record("A", "open"), new=False)
+    state.save_full(crawl, 1.0)
+    for synced in (2.0, 3.0, 4.0):
+        crawl.add_market(record("A", "open"))
+        state.save_delta(crawl, synced)
+    assert len(state.records) == 4
+    assert state.compact() == 1
+    assert len(SyncState(str(tmp_path)).records) == 1
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiHttpClient
+
+SERIES = {
+    "Economics": [{"ticker": "KXCPI"}, {"ticker": "KXFED"}],
+    "Crypto": [{"ticker": "KXBTC"}, {"ticker": "KXFED"}],
+}
+
+def make_client(responses):
+    """A client whose async_get answers from a fake that, like the API, requires a category."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = KalshiHttpClient("test", private_key, Environment.DEMO)
+    requests = []
+
+    async def async_get(path, params={}, **kwargs):
+        requests.append((path, dict(params)))
+        return responses(path, params)
+
+    client.async_get = async_get
+    return client, requests
+
+def series_responses(path, params):
+    assert path == "/trade-api/v2/series"
+    if not params.get("category"):
+        return {"error": "400: category is required"}
+    assert set(params) == {"category"}
+    return {"series": SERIES.get(params["category"], [])}
+
+def test_series_shards_request_each_category_and_dedupe_series():
+    client, requests = make_client(series_responses)
+    shards = asyncio.run(client.event_shards(("open", "closed"), categories=("Economics", "Crypto")))
+    assert [params["category"] for _, params in requests] == ["Economics", "Crypto"]
+    assert shards == [
+        {"status": status, "series_ticker": ticker}
+        for ticker in ("KXCPI", "KXFED", "KXBTC") for status in ("open", "closed")
+    ]
+
+def test_status_shards_make_no_requests():
+    client, requests = make_client(series_responses)
+    shards = asyncio.run(client.event_shards(("open", "closed")))
+    assert shards == [{"status": "open"}, {"status": "closed"}]
+    assert requests == []
+
+def test_series_error_raises():
+    client, _ = make_client(lambda path, params: {"error": "500: unavailable"})
+    with pytest.raises(Exception, match="Economics"):
+        asyncio.run(client.get_series_async("Economics"))
+
+def test_sharded_walk_over_series_shards_yields_each_event_once():
+    def responses(path, params):
+        if path == "/trade-api/v2/series":
+            return series_responses(path, params)
+        assert path == "/trade-api/v2/events" and params["series_ticker"]
+        page = int(params.get("cursor") or 0)
+        events = [{"event_ticker": f"{params['series_ticker']}-{page}"}, {"event_ticker": "SHARED"}]
+        return {"events": events, "cursor": str(page + 1) if page < 1 else None}
+
+    client, _ = make_client(responses)
+
+    async def walk():
+        shards = await client.event_shards(("open", "closed"), categories=("Economics",))
+        return [event["event_ticker"] async for events, _ in client.iter_events_sharded(shards) for event in events]
+
+    assert sorted(asyncio.run(walk())) == ["KXCPI-0", "KXCPI-1", "KXFED-0", "KXFED-1", "SHARED"]
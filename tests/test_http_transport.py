@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("cryptography")
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiHttpClient
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+async def serve(handler):
+    app = web.Application()
+    app.router.add_get("/trade-api/v2/markets/{ticker}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+@pytest.mark.parametrize("transport", ["executor", "aiohttp", "httpx"])
+def test_transports_send_signed_gets_and_decode(private_key, transport):
+    if transport == "httpx":
+        pytest.importorskip("httpx")
+    seen = []
+
+    async def market(request):
+        seen.append((request.match_info["ticker"], request.query.get("depth"),
+                     request.headers.get("KALSHI-ACCESS-KEY"),
+                     bool(request.headers.get("KALSHI-ACCESS-SIGNATURE"))))
+        return web.json_response({"market": {"ticker": request.match_info["ticker"]}})
+
+    async def run():
+        runner, host = await serve(market)
+        client = KalshiHttpClient("key-id", private_key, Environment.DEMO, transport=transport,
+                                  coalesce_requests=False)
+        client.host = host
+        try:
+            results = await client.async_batch_get(
+                [f"/trade-api/v2/markets/T{i}" for i in range(5)], [{"depth": 1}] * 5)
+            session = client._async_session
+            await client.async_get("/trade-api/v2/markets/T5")
+            reused = client._async_session is session
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+        return results, reused, client
+
+    results, reused, client = asyncio.run(run())
+    assert [r["market"]["ticker"] for r in results] == [f"T{i}" for i in range(5)]
+    assert sorted(seen)[:5] == [(f"T{i}", "1", "key-id", True) for i in range(5)]
+    assert reused  # One connection pool for every coroutine on the loop
+    assert client._async_session is None
+
+def test_server_errors_come_back_as_error_dicts(private_key):
+    async def failing(request):
+        return web.json_response({"error": "not found"}, status=404)
+
+    async def run():
+        runner, host = await serve(failing)
+        client = KalshiHttpClient("key-id", private_key, Environment.DEMO, transport="aiohttp")
+        client.host = host
+        try:
+            return await client.async_get("/trade-api/v2/markets/MISSING")
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+
+    result = asyncio.run(run())
+    assert "error" in result and "404" in result["error"]
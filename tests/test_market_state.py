@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from market_state import MarketStateStore
+from ws_fastpath import TickerUpdate
+
+def ticker(name, price, ts):
+    return {"type": "ticker", "msg": {"market_ticker": name, "price": price, "yes_bid": price - 1,
+                                      "yes_ask": price + 1, "volume": 10, "open_interest": 5, "ts": ts}}
+
+def test_updates_replace_records_and_skip_out_of_order():
+    store = MarketStateStore()
+    store.handle([ticker("A", 40, 100), ticker("A", 45, 102), ticker("A", 41, 101),
+                  {"type": "trade", "msg": {"market_ticker": "A"}}])
+    record = store.get("A")
+    assert (record.last_price, record.yes_bid, record.ts) == (45, 44, 102)
+    assert store.stats() == {"markets": 1, "seeded": 0, "updates": 2, "out_of_order": 1}
+
+def test_seed_never_overwrites_streamed_records():
+    store = MarketStateStore()
+    store.handle([ticker("A", 45, 102)])
+    seeded = store.seed([{"ticker": "A", "last_price": 10}, {"ticker": "B", "last_price": 20}])
+    assert seeded == 1
+    assert store.get("A").last_price == 45
+    assert store.get("B").last_price == 20 and store.get("B").ts is None
+    store.handle([ticker("B", 21, 1)])  # A streamed update replaces the seeded one
+    assert store.get("B").last_price == 21
+
+def test_snapshot_is_a_point_in_time_copy():
+    store = MarketStateStore()
+    store.handle([ticker("A", 40, 100)])
+    snapshot = store.snapshot()
+    first = snapshot["A"]
+    store.handle([ticker("A", 50, 101)])
+    assert snapshot["A"] is first and first.last_price == 40
+    assert store.get("A").last_price == 50
+
+def test_compact_ticker_updates():
+    store = MarketStateStore()
+    store.handle([TickerUpdate("A", 40, 39, 41, 10, 5, 100, None)])
+    assert store.get("A").to_dict()["yes_ask"] == 41
+
+def test_client_keeps_market_state_from_the_ticker_channel():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient("test", private_key)
+        client.dispatcher.start()
+        await client.on_message(json.dumps(ticker("A", 40, 100)))
+        await client.dispatcher.stop()
+        return client
+
+    assert asyncio.run(run()).markets.get("A").last_price == 40
@@ -0,0 +1,46 @@
+import importlib
+import time
+
+import pytest
+
+for module in ("cryptography", "dotenv", "pandas", "tqdm"):
+    pytest.importorskip(module)
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_path = tmp_path / "key.pem"
+    key_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    monkeypatch.setenv("DEMO_KEYID", "test")
+    monkeypatch.setenv("DEMO_KEYFILE", str(key_path))
+    monkeypatch.chdir(tmp_path)  # main creates its checkpoint directory on import
+    return importlib.import_module("main")
+
+def nested(**fields):
+    market = {"ticker": "M1", "title": "Title", "status": "active", "market_type": "binary",
+              "close_time": "2999-01-01T00:00:00Z", "last_price": 40}
+    market.update(fields)
+    return market
+
+def test_nested_market_with_null_prices_is_recorded_from_the_page(main):
+    market = nested(yes_bid=None)
+    del market["last_price"]  # Omitted null price
+    assert not main.nested_market_needs_details(market, time.time())
+    record = main.build_market_record(market, "E1", {"category": "Politics"})
+    assert (record["yes_bid"], record["last_price"], record["event_category"]) == (None, None, "Politics")
+
+def test_nested_market_missing_a_required_field_is_fetched(main):
+    market = nested()
+    del market["close_time"]
+    assert main.nested_market_needs_details(market, time.time())
+    assert not main.nested_market_needs_details(nested(close_time=None), time.time())
+
+def test_only_open_markets_age_out(main):
+    old = time.time() - main.NESTED_MAX_AGE - 1
+    assert main.nested_market_needs_details(nested(status="open"), old)
+    assert not main.nested_market_needs_details(nested(status="settled"), old)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from orderbook import OrderBook, OrderBookManager
+
+def snapshot(seq, ticker="KXTEST", sid=7):
+    return {"type": "orderbook_snapshot", "sid": sid, "seq": seq,
+            "msg": {"market_ticker": ticker, "yes": [[40, 10]], "no": [[55, 5]]}}
+
+def delta(seq, ticker="KXTEST", sid=7, price=40, change=3):
+    return {"type": "orderbook_delta", "sid": sid, "seq": seq,
+            "msg": {"market_ticker": ticker, "side": "yes", "price": price, "delta": change}}
+
+def ack(seq, sid=7):
+    return {"type": "ok", "id": 3, "sid": sid, "seq": seq, "market_tickers": ["KXTEST", "KXOTHER"]}
+
+def test_book_tracks_best_levels_totals_and_implied_asks():
+    book = OrderBook("KXTEST")
+    book.load([[40, 10], [38, 5]], [[55, 7]])
+    assert not book.stale
+    assert book.best_bid("yes") == (40, 10) and book.best_ask("yes") == (45, 7)
+    assert book.spread() == 5
+    book.apply("yes", 42, 3)
+    book.apply("yes", 40, -10)  # Removing a level below the best keeps the best
+    assert book.best_bid("yes") == (42, 3)
+    book.apply("yes", 42, -5)  # Removing the best scans down, never below zero
+    assert book.best_bid("yes") == (38, 5)
+    assert book.quantity("yes", 42) == 0
+    assert book.total("yes") == 5 and book.total("no") == 7
+    assert book.depth("yes") == [(38, 5)]
+    assert book.snapshot()["no"] == [[55, 7]]
+    with pytest.raises(ValueError):
+        book.apply("yes", 100, 1)
+
+def test_gap_marks_books_stale_once_until_a_snapshot():
+    gaps = []
+    manager = OrderBookManager(on_gap=gaps.append)
+    manager.handle([snapshot(1), snapshot(2, ticker="KXOTHER"), delta(4), delta(5)])
+    assert gaps == [["KXTEST", "KXOTHER"]]
+    assert manager.get("KXTEST").stale
+    manager.handle([snapshot(6)])
+    assert not manager.get("KXTEST").stale
+    stats = manager.stats()
+    assert (stats["gaps"], stats["resyncs"], stats["resyncing"]) == (1, 1, 1)
+
+def test_delta_after_update_subscription_ack_is_not_a_gap():
+    gaps = []
+    manager = OrderBookManager(on_gap=gaps.append)
+    manager.handle([snapshot(1), delta(2), ack(3), delta(4)])
+    assert gaps == []
+    assert manager.stats()["gaps"] == 0
+    assert manager.best_bid("KXTEST") == (40, 16)
+
+def test_missing_delta_after_ack_is_still_a_gap():
+    gaps = []
+    manager = OrderBookManager(on_gap=gaps.append)
+    manager.handle([snapshot(1), ack(2), delta(4)])
+    assert gaps == [["KXTEST"]]
+
+def test_ack_for_unknown_sid_is_ignored():
+    manager = OrderBookManager()
+    manager.handle([ack(5, sid=99), snapshot(1)])
+    manager.handle([delta(2)])
+    assert manager.stats()["gaps"] == 0
+
+def test_client_counts_acks_in_stream_order():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient("test", private_key)
+        resyncs = []
+        client.orderbooks.on_gap = resyncs.append
+        # Deltas still queued when the ack arrives must be applied before it is counted
+        for message in (snapshot(1), delta(2), ack(3), delta(4)):
+            await client.on_message(json.dumps(message))
+        client.dispatcher.start()
+        await client.dispatcher.stop()
+        return client, resyncs
+
+    client, resyncs = asyncio.run(run())
+    assert resyncs == []
+    assert client.orderbooks.best_bid("KXTEST") == (40, 16)
+
+def test_resync_snapshot_replaces_deltas_queued_around_it():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient("test", private_key, channels=())
+        commands = []
+        async def send(cmd, params):
+            commands.append((cmd, params))
+            return len(commands)
+        await client.subscriptions.replay(send)
+        await client.subscriptions.subscribe(["orderbook_delta"], ["KXTEST"])
+        await client.on_message(json.dumps(
+            {"type": "subscribed", "id": 1, "msg": {"channel": "orderbook_delta", "sid": 7}}))
+        client.dispatcher.start()
+        for message in (snapshot(1), delta(2), delta(4)):  # seq 3 is lost
+            await client.on_message(json.dumps(message))
+        await asyncio.sleep(0.05)  # The gap handler asks the server for a fresh snapshot
+        # Deltas keep arriving before the sequenced snapshot that covers them
+        for message in (delta(5), ack(6), ack(7), snapshot(8), delta(9, change=1)):
+            if message["type"] == "orderbook_snapshot":
+                message["msg"]["yes"] = [[40, 20]]
+            await client.on_message(json.dumps(message))
+        await client.dispatcher.stop()
+        return client, commands
+
+    client, commands = asyncio.run(run())
+    assert [(cmd, params.get("action")) for cmd, params in commands[1:]] == [
+        ("update_subscription", "delete_markets"), ("update_subscription", "add_markets"),
+    ]
+    assert client.orderbooks.best_bid("KXTEST") == (40, 21)
+    assert not client.orderbooks.get("KXTEST").stale
+    stats = client.orderbooks.stats()
+    assert (stats["gaps"], stats["resyncs"]) == (1, 1)
+
+def test_every_connection_attempt_is_signed_afresh(monkeypatch):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    import clients
+    from clients import KalshiWebSocketClient
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = KalshiWebSocketClient("test", private_key)
+    client.reconnect_delay = 0
+    signed, attempts = [], []
+
+    async def headers(method, path):
+        signed.append(len(signed))
+        return {"KALSHI-ACCESS-TIMESTAMP": str(len(signed))}
+
+    def connect(host, additional_headers):
+        attempts.append(additional_headers["KALSHI-ACCESS-TIMESTAMP"])
+        if len(attempts) == 3:
+            raise asyncio.CancelledError()  # Stops the reconnect loop
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(client, "async_request_headers", headers)
+    monkeypatch.setattr(client, "on_error", lambda e: asyncio.sleep(0))
+    monkeypatch.setattr(clients.websockets, "connect", connect)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(client.connect())
+    assert attempts == ["1", "2", "3"]
+    assert client.reconnects == 2
+
+def test_disconnect_marks_every_book_stale():
+    manager = OrderBookManager()
+    manager.handle([snapshot(1), snapshot(2, ticker="KXOTHER")])
+    manager.disconnected()
+    assert all(book.stale for book in manager.books.values())
+    manager.handle([snapshot(1)])  # Sequences restart on the new connection
+    manager.handle([delta(2)])
+    assert manager.stats()["gaps"] == 0 and not manager.get("KXTEST").stale
@@ -0,0 +1,32 @@
+import asyncio
+import copy
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiHttpClient
+
+def test_pages_are_annotated_without_touching_shared_bodies():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = KalshiHttpClient("test", private_key, Environment.DEMO)
+    # Bodies as the response cache or single-flight would hand them to every caller
+    bodies = {
+        None: {"events": [{"event_ticker": "A"}], "cursor": "next"},
+        "next": {"events": [{"event_ticker": "B"}], "cursor": ""},
+    }
+    originals = copy.deepcopy(bodies)
+
+    async def async_get(path, params={}, **kwargs):
+        return bodies[params.get("cursor")]
+
+    client.async_get = async_get
+
+    async def walk():
+        return [page async for page in client.iter_pages("/trade-api/v2/events", {})]
+
+    pages = asyncio.run(walk())
+    assert [page["cursor"] for page in pages] == ["next", None]
+    assert all("fetched_at" in page for page in pages)
+    assert bodies == originals
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+def test_bucket_spends_burst_then_paces_at_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    waits = [bucket._reserve(1) for _ in range(10)]
+    assert waits[:5] == [0.0] * 5
+    # Each further token is reserved one refill interval after the previous one
+    assert waits[5:] == pytest.approx([0.01, 0.02, 0.03, 0.04, 0.05], abs=0.002)
+
+def test_threads_and_coroutines_share_one_budget():
+    bucket = TokenBucket(rate=200, burst=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+
+    async def coroutines():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(10)))
+
+    asyncio.run(coroutines())
+    for thread in threads:
+        thread.join()
+    # 20 tokens with one in the bucket take at least 19 refill intervals
+    assert time.monotonic() - started >= 19 / 200 - 0.005
+    assert bucket.stats()["acquired"] == 20
+
+def test_cancelled_async_acquire_refunds_its_tokens():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket._reserve(1)
+
+    async def run():
+        waiter = asyncio.ensure_future(bucket.acquire_async(5))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+    assert bucket._reserve(1) < 0.2  # Only the first token's debt remains
+
+def test_tier_limits_and_kinds():
+    limiter = RateLimiter.for_tier("Prime")
+    assert (limiter.read.rate, limiter.write.rate) == (100, 400)
+    with pytest.raises(ValueError):
+        RateLimiter.for_tier("gold")
+    with pytest.raises(ValueError):
+        limiter.acquire("delete")
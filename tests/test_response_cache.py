@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from response_cache import ResponseCache
+
+def test_ttl_by_longest_prefix():
+    cache = ResponseCache(default_ttl=None, ttls={"/a/": 5, "/a/b": 1, "/a/none": 0})
+    assert cache.ttl_for("/a/x") == 5
+    assert cache.ttl_for("/a/b/1") == 1
+    assert cache.ttl_for("/a/none") is None
+    assert cache.ttl_for("/c") is None
+    assert cache.lookup("/c", {}) == (None, None)
+
+def test_lru_eviction_and_param_keys():
+    cache = ResponseCache(max_entries=2, default_ttl=60)
+    for name in ("a", "b"):
+        key, _ = cache.lookup("/x", {"n": name})
+        cache.store(key, name, None)
+    key_a, entry = cache.lookup("/x", {"n": "a"})  # Refreshes a
+    assert entry.body == "a"
+    key_c, _ = cache.lookup("/x", {"n": "c"})
+    cache.store(key_c, "c", None)
+    assert cache.lookup("/x", {"n": "b"})[1] is None  # Least recently used
+    assert cache.stats()["evictions"] == 1
+
+def test_expired_entry_with_etag_is_kept_for_revalidation(monkeypatch):
+    cache = ResponseCache(default_ttl=1)
+    key, _ = cache.lookup("/x", {})
+    cache.store(key, {"v": 1}, '"tag"')
+    cache.store(cache.lookup("/y", {})[0], {"v": 2}, None)
+    later = time.monotonic() + 2
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    _, stale = cache.lookup("/x", {})
+    assert stale is not None and not stale.is_fresh() and stale.etag == '"tag"'
+    assert cache.lookup("/y", {})[1] is None  # Nothing to revalidate with
+    assert cache.revalidated(key, stale) == {"v": 1}
+    assert cache.lookup("/x", {})[1].is_fresh()
+
+def test_client_serves_hits_and_revalidates_with_if_none_match():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import Environment, KalshiHttpClient
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    cache = ResponseCache(default_ttl=60)
+    client = KalshiHttpClient("test", private_key, Environment.DEMO, cache=cache)
+    sent = []
+
+    async def send(path, params, etag=None):
+        sent.append(etag)
+        if etag == '"v1"':
+            return None, etag  # 304 Not Modified
+        return {"status": "open"}, '"v1"'
+
+    client._async_send_get = send
+
+    async def run():
+        first = await client.async_get("/trade-api/v2/exchange/status")
+        second = await client.async_get("/trade-api/v2/exchange/status")
+        for entry in cache._entries.values():
+            entry.expires = 0  # Let it go stale
+        third = await client.async_get("/trade-api/v2/exchange/status")
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == {"status": "open"}
+    assert sent == [None, '"v1"']  # The hit never reached the network
+    assert cache.stats()["revalidations"] == 1
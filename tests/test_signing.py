@@ -0,0 +1,45 @@
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from signing import ProcessPoolSigner, sign_pss
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+def test_pool_refusing_a_batch_signs_it_in_process(private_key):
+    signer = ProcessPoolSigner(private_key, processes=1, batch_size=1)
+    try:
+        def broken(*args, **kwargs):
+            raise BrokenProcessPool("worker died")
+        signer._pool.submit = broken
+
+        for text in ("first", "second"):
+            signature = signer.submit(text).result(timeout=5)
+            assert len(signature) == len(sign_pss(private_key, text))
+        assert isinstance(signer.pool_error, BrokenProcessPool)
+    finally:
+        signer.close()
+
+def test_batch_in_flight_when_the_pool_breaks_still_succeeds(private_key):
+    signer = ProcessPoolSigner(private_key, processes=1, batch_size=1)
+    try:
+        signer.sign("warm up")  # Starts the worker process
+        in_flight = concurrent.futures.Future()
+        def crash(fn, texts):
+            # The pool accepted the batch, then a worker died under it
+            in_flight.set_exception(BrokenProcessPool("worker died"))
+            return in_flight
+        signer._pool.submit = crash
+
+        signature = signer.submit("in flight").result(timeout=5)
+        assert len(signature) == len(sign_pss(private_key, "in flight"))
+        assert isinstance(signer.pool_error, BrokenProcessPool)
+        assert signer.sign("later")
+    finally:
+        signer.close()
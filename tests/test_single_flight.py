@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+def test_concurrent_coroutines_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    async def run():
+        key = SingleFlight.key("/x", {"a": 1})
+        return await asyncio.gather(*(flight.do_async(key, fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 5, "saved": 4, "in_flight": 0}
+
+def test_cancelling_one_waiter_leaves_the_call_to_the_others():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do_async("k", fetch))
+        second = asyncio.ensure_future(flight.do_async("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+def test_threads_share_results_and_exceptions():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fail():
+        calls.append(1)
+        release.wait(1)
+        raise ValueError("boom")
+
+    errors = []
+    def call():
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and len(errors) == 4
+    assert flight.do("k", lambda: "fresh") == "fresh"  # Failed calls are not remembered
+
+def test_param_order_does_not_change_the_key():
+    assert SingleFlight.key("/x", {"a": 1, "b": 2}) == SingleFlight.key("/x", {"b": 2, "a": "1"})
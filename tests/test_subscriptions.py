@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from subscriptions import SubscriptionManager, shard_of
+
+class FakeConnection:
+    def __init__(self):
+        self.commands = []
+
+    async def send(self, cmd, params):
+        self.commands.append((cmd, params))
+        return len(self.commands)
+
+def subscribed(request_id, channel, sid):
+    return {"type": "subscribed", "id": request_id, "msg": {"channel": channel, "sid": sid}}
+
+def test_tickers_added_between_channel_acks_reach_every_sid():
+    async def run():
+        connection = FakeConnection()
+        manager = SubscriptionManager()
+        await manager.replay(connection.send)
+        subscription = await manager.subscribe(["orderbook_delta", "ticker"], ["A"])
+        await manager.handle([subscribed(1, "orderbook_delta", 11)])
+        await manager.add_tickers(subscription, ["B"])
+        assert connection.commands[1:] == []  # Held until every channel is acknowledged
+        await manager.handle([subscribed(1, "ticker", 12)])
+        return connection.commands[1:]
+
+    updates = asyncio.run(run())
+    assert updates == [
+        ("update_subscription", {"sids": [11], "market_tickers": ["B"], "action": "add_markets"}),
+        ("update_subscription", {"sids": [12], "market_tickers": ["B"], "action": "add_markets"}),
+    ]
+
+def test_changes_after_full_ack_go_out_at_once():
+    async def run():
+        connection = FakeConnection()
+        manager = SubscriptionManager()
+        await manager.replay(connection.send)
+        subscription = await manager.subscribe(["ticker"], ["A", "B"])
+        await manager.handle([subscribed(1, "ticker", 5)])
+        await manager.remove_tickers(subscription, ["A"])
+        return connection.commands[1:]
+
+    assert asyncio.run(run()) == [
+        ("update_subscription", {"sids": [5], "market_tickers": ["A"], "action": "delete_markets"}),
+    ]
+
+def test_error_for_one_channel_keeps_the_other_channels_ack():
+    async def run():
+        connection = FakeConnection()
+        manager = SubscriptionManager()
+        await manager.replay(connection.send)
+        subscription = await manager.subscribe(["orderbook_delta", "ticker"], ["A"])
+        await manager.handle([{"type": "error", "id": 1, "msg": {"code": 8, "msg": "Unknown channel"}}])
+        await manager.add_tickers(subscription, ["B"])  # Waits for the remaining channel
+        await manager.handle([subscribed(1, "ticker", 12)])
+        return subscription, connection.commands[1:], manager
+
+    subscription, updates, manager = asyncio.run(run())
+    assert subscription.sids == {"ticker": 12}
+    assert manager.errors == 1
+    assert updates == [
+        ("update_subscription", {"sids": [12], "market_tickers": ["B"], "action": "add_markets"}),
+    ]
+
+def test_shard_of_is_stable_and_in_range():
+    tickers = [f"KX-{i}" for i in range(200)]
+    shards = [shard_of(ticker, 4) for ticker in tickers]
+    assert set(shards) == {0, 1, 2, 3}
+    assert shards == [shard_of(ticker, 4) for ticker in tickers]
+
+def test_replay_resubscribes_with_current_tickers():
+    async def run():
+        manager = SubscriptionManager()
+        subscription = await manager.subscribe(["ticker"], ["A"])  # Offline: nothing sent
+        await manager.add_tickers(subscription, ["B"])
+        connection = FakeConnection()
+        await manager.replay(connection.send)
+        await manager.handle([subscribed(1, "ticker", 3)])
+        manager.disconnected()
+        reconnected = FakeConnection()
+        await manager.replay(reconnected.send)
+        return connection.commands, reconnected.commands, subscription
+
+    first, second, subscription = asyncio.run(run())
+    expected = [("subscribe", {"channels": ["ticker"], "market_tickers": ["A", "B"]})]
+    assert first == expected and second == expected
+    assert subscription.sids == {}  # Sids do not survive a reconnect
+
+def test_unsubscribe_before_ack_unsubscribes_once_acknowledged():
+    async def run():
+        connection = FakeConnection()
+        manager = SubscriptionManager()
+        await manager.replay(connection.send)
+        subscription = await manager.subscribe(["ticker"], ["A"])
+        await manager.unsubscribe(subscription)
+        await manager.handle([subscribed(1, "ticker", 9)])
+        return connection.commands
+
+    assert asyncio.run(run())[1:] == [("unsubscribe", {"sids": [9]})]
+
+def test_sharded_client_splits_tickers_by_shard():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import ShardedWebSocketClient
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = ShardedWebSocketClient("test", private_key, shards=3)
+    tickers = [f"KX-{i}" for i in range(30)]
+    asyncio.run(client.subscribe(["ticker"], tickers))
+    asyncio.run(client.subscribe(["ticker"], ["KX-99"]))
+    owned = []
+    for index, shard in enumerate(client.clients):
+        subscription = shard.subscriptions.find(["ticker"])
+        assert len(shard.subscriptions.subscriptions) == 1  # One growing subscription per shard
+        assert all(client.shard(ticker) is shard for ticker in subscription.tickers)
+        owned.extend(subscription.tickers)
+    assert sorted(owned) == sorted(tickers + ["KX-99"])
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from ws_capture import MAGIC, CaptureReader, CaptureRecorder, segment_paths
+
+class FakeClient:
+    def __init__(self):
+        self.frames = []
+
+    async def on_message(self, frame):
+        self.frames.append(bytes(frame))
+
+def test_frames_round_trip_across_segments(tmp_path):
+    directory = str(tmp_path)
+    with CaptureRecorder(directory, segment_bytes=64) as recorder:
+        for i in range(10):
+            recorder.record(f'{{"seq": {i}}}', received=100.0 + i)
+        recorder.record(b"raw bytes", received=110.0)
+    assert len(segment_paths(directory)) > 1
+    assert recorder.frames == 11
+    frames = list(CaptureReader(directory))
+    assert [received for received, _ in frames] == [100.0 + i for i in range(11)]
+    assert bytes(frames[3][1]) == b'{"seq": 3}'
+    assert bytes(frames[-1][1]) == b"raw bytes"
+
+def test_segment_cut_short_is_read_to_its_last_complete_record(tmp_path):
+    directory = str(tmp_path)
+    with CaptureRecorder(directory) as recorder:
+        recorder.record("first", received=1.0)
+        recorder.record("second", received=2.0)
+    path = segment_paths(directory)[0]
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert [bytes(frame) for _, frame in CaptureReader(directory)] == [b"first"]
+    with open(os.path.join(directory, "capture-000001.bin"), "wb") as f:
+        f.write(MAGIC)  # Empty segment
+    assert len(list(CaptureReader(directory))) == 1
+
+def test_replay_feeds_every_frame_in_order(tmp_path):
+    directory = str(tmp_path)
+    with CaptureRecorder(directory, segment_bytes=32) as recorder:
+        for i in range(20):
+            recorder.record(f"frame {i}", received=float(i) / 1000)
+    client = FakeClient()
+    result = asyncio.run(CaptureReader(directory).replay(client, yield_every=3))
+    assert client.frames == [f"frame {i}".encode() for i in range(20)]
+    assert result["frames"] == 20
+    paced = FakeClient()
+    result = asyncio.run(CaptureReader(directory).replay(paced, speed=1.0))
+    assert paced.frames == client.frames
+    assert result["elapsed"] >= 0.019
+
+def test_replay_through_a_client_updates_market_state(tmp_path):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    directory = str(tmp_path)
+    with CaptureRecorder(directory) as recorder:
+        for ts, price in ((100, 40), (101, 42)):
+            recorder.record(json.dumps({"type": "ticker", "msg": {"market_ticker": "A", "price": price, "ts": ts}}))
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient("test", private_key)
+        await CaptureReader(directory).replay(client)
+        return client
+
+    assert asyncio.run(run()).markets.get("A").last_price == 42
+
+def test_restart_after_trimming_continues_after_the_highest_segment(tmp_path):
+    directory = str(tmp_path)
+    with CaptureRecorder(directory, segment_bytes=1) as recorder:  # One frame per segment
+        for i in range(6):
+            recorder.record(f"frame {i}", received=float(i))
+    os.remove(segment_paths(directory)[0])  # Retention drops the oldest segment
+
+    with CaptureRecorder(directory, segment_bytes=1) as recorder:
+        recorder.record("frame 6", received=6.0)
+
+    assert [bytes(frame) for _, frame in CaptureReader(directory)] == [
+        f"frame {i}".encode() for i in range(1, 7)
+    ]
+    assert os.path.basename(segment_paths(directory)[-1]) == "capture-000006.bin"
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from ws_dispatch import Dispatcher
+
+def ticker(name, price):
+    return {"type": "ticker", "msg": {"market_ticker": name, "price": price}}
+
+def delta(name, seq):
+    return {"type": "orderbook_delta", "seq": seq, "msg": {"market_ticker": name}}
+
+def test_batches_keep_arrival_order_and_routes():
+    async def run():
+        dispatcher = Dispatcher(batch_size=3)
+        batches, deltas = [], []
+        dispatcher.add_handler(batches.append, inline=True)
+        dispatcher.add_handler(deltas.extend, channels=["orderbook_delta"], tickers=["A"], inline=True)
+        for seq in range(5):
+            await dispatcher.put(delta("A" if seq % 2 == 0 else "B", seq))
+        dispatcher.start()
+        await dispatcher.stop()
+        return batches, deltas, dispatcher
+
+    batches, deltas, dispatcher = asyncio.run(run())
+    assert [[m["seq"] for m in batch] for batch in batches] == [[0, 1, 2], [3, 4]]
+    assert [m["seq"] for m in deltas] == [0, 2, 4]
+    assert dispatcher.stats()["delivered"] == 5
+
+def test_block_pushes_back_on_the_reader():
+    async def run():
+        dispatcher = Dispatcher(max_queue=2)
+        await dispatcher.put(delta("A", 1))
+        await dispatcher.put(delta("A", 2))
+        blocked = asyncio.ensure_future(dispatcher.put(delta("A", 3)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        received = []
+        dispatcher.add_handler(received.extend, inline=True)
+        dispatcher.start()
+        await asyncio.wait_for(blocked, 1)
+        await dispatcher.stop()
+        return received
+
+    assert [m["seq"] for m in asyncio.run(run())] == [1, 2, 3]
+
+def test_drop_oldest_and_conflate_policies():
+    async def run():
+        dropping = Dispatcher(max_queue=2, overflow="drop_oldest")
+        for seq in range(4):
+            await dropping.put(delta("A", seq))
+        conflating = Dispatcher(overflow="conflate")
+        for message in (ticker("A", 1), delta("A", 1), ticker("B", 5), ticker("A", 2)):
+            await conflating.put(message)
+        return dropping, conflating
+
+    dropping, conflating = asyncio.run(run())
+    assert [m["seq"] for m in dropping._take()] == [2, 3]
+    assert dropping.stats()["dropped"] == 2
+    # The newer A ticker takes the older one's place; deltas are never conflated
+    assert [(m["type"], m["msg"].get("price")) for m in conflating._take()] == [
+        ("ticker", 2), ("orderbook_delta", None), ("ticker", 5)]
+    assert conflating.stats()["conflated"] == 1
+
+def test_handler_errors_are_counted_and_delivery_continues():
+    async def run():
+        dispatcher = Dispatcher(batch_size=1)
+        received = []
+        def failing(messages):
+            raise RuntimeError("boom")
+        async def collect(messages):
+            received.extend(messages)
+        dispatcher.add_handler(failing)
+        dispatcher.add_handler(collect)
+        for seq in range(3):
+            await dispatcher.put(delta("A", seq))
+        dispatcher.start()
+        await dispatcher.stop()
+        return received, dispatcher
+
+    received, dispatcher = asyncio.run(run())
+    assert len(received) == 3
+    assert dispatcher.stats()["handler_errors"] == 3
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Dispatcher(overflow="spill")
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+
+from ws_fastpath import FrameFilter, TickerUpdate, decode_ticker, peek
+
+TICKER = {"type": "ticker", "sid": 3, "msg": {"market_ticker": "A", "price": 40, "yes_bid": 39, "yes_ask": 41,
+                                              "volume": 10, "open_interest": 5, "ts": 100, "extra": [1, 2]}}
+
+def test_peek_reads_type_and_ticker_of_str_and_bytes():
+    frame = json.dumps(TICKER)
+    assert peek(frame) == ("ticker", "A")
+    assert peek(frame.encode()) == ("ticker", "A")
+    assert peek('{"type": "subscribed", "id": 1, "msg": {"sid": 2}}') == ("subscribed", None)
+    assert peek(b"not json") == (None, None)
+
+def test_filter_drops_unwanted_channels_and_tickers():
+    frame_filter = FrameFilter(channels=["ticker"], tickers=["A"])
+    assert frame_filter.wants("ticker", "A")
+    assert not frame_filter.wants("ticker", "B")
+    assert not frame_filter.wants("trade", "A")
+    assert frame_filter.wants("ticker", None)
+    assert frame_filter.wants("orderbook_delta", "B")  # Sequenced channels always pass
+    assert frame_filter.wants("error", None)
+    frame_filter.tickers.add("B")
+    assert frame_filter.wants("ticker", "B")
+    assert frame_filter.stats() == {"passed": 5, "dropped": 2}
+
+def test_decode_ticker():
+    update = decode_ticker(json.dumps(TICKER).encode())
+    assert update == TickerUpdate("A", 40, 39, 41, 10, 5, 100, 3)
+    assert update.type == "ticker"
+    assert decode_ticker('{"type": "ticker", "msg": {"market_ticker": "B"}}') == TickerUpdate(
+        "B", None, None, None, None, None, None, None)
+
+def test_client_filters_frames_and_decodes_compact_tickers():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient(
+            "test", private_key, frame_filter=FrameFilter(tickers=["A"]), compact_tickers=True
+        )
+        received = []
+        client.dispatcher.add_handler(received.extend, channels=["ticker"], inline=True)
+        client.dispatcher.start()
+        await client.on_message(json.dumps(TICKER))
+        await client.on_message(json.dumps({"type": "ticker", "msg": {"market_ticker": "B", "price": 1}}))
+        await client.on_message(json.dumps({"type": "ticker", "msg": ["unexpected"]}))  # Falls back to json
+        await client.dispatcher.stop()
+        return client, received
+
+    client, received = asyncio.run(run())
+    assert received[0] == TickerUpdate("A", 40, 39, 41, 10, 5, 100, 3)
+    assert received[1] == {"type": "ticker", "msg": ["unexpected"]}
+    assert len(received) == 2
+    assert client.frame_filter.stats() == {"passed": 2, "dropped": 1}
+    assert client.markets.get("A").last_price == 40
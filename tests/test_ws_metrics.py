@@ -0,0 +1,70 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from ws_metrics import LatencyHistogram, WebSocketMetrics
+
+def test_percentiles_are_within_a_quarter():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+    for q in (0.5, 0.9, 0.99):
+        assert q <= histogram.percentile(q) <= q * 1.25
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 1000
+    assert snapshot["max"] == 1.0
+    assert snapshot["mean"] == pytest.approx(0.5005)
+
+def test_negative_durations_count_as_zero():
+    histogram = LatencyHistogram()
+    histogram.record(-2.0)
+    histogram.record(0.001)
+    assert histogram.negative == 1
+    assert histogram.percentile(0.5) == 0.0
+    assert histogram.snapshot()["mean"] == pytest.approx(0.0005)
+
+def test_empty_histogram():
+    assert LatencyHistogram().snapshot() == {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+def test_per_channel_receive_and_handler_times():
+    metrics = WebSocketMetrics()
+    metrics.watch_depth(lambda: 7)
+    now = time.time()
+    metrics.record_receive("ticker", {"type": "ticker", "msg": {"ts": int(now) - 2}}, now)
+    metrics.record_receive("ticker", {"type": "ticker", "msg": {"ts": int(now * 1000) - 2000}}, now)
+    metrics.record_receive("orderbook_delta", {"type": "orderbook_delta", "msg": {}}, now)
+    metrics.record_handler(["ticker", "orderbook_delta"], 0.004)
+    snapshot = metrics.snapshot()
+    assert snapshot["depth"] == 7
+    assert snapshot["received"] == {"ticker": 2, "orderbook_delta": 1}
+    assert snapshot["exchange"]["ticker"]["count"] == 2
+    assert 2.0 <= snapshot["exchange"]["ticker"]["p50"] <= 3.0 * 1.25
+    assert "orderbook_delta" not in snapshot["exchange"]  # No ts to measure from
+    assert snapshot["handler"]["orderbook_delta"]["count"] == 1
+    report = metrics.report()
+    assert report.startswith("ws: ") and "depth 7, 3 received" in report
+    assert "  ticker: 2 msgs, exchange p50" in report
+
+def test_client_records_queueing_and_handler_times():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from clients import KalshiWebSocketClient
+
+    async def run():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = KalshiWebSocketClient("test", private_key, metrics=True)
+        client.dispatcher.start()
+        for price in (40, 41, 42):
+            message = {"type": "ticker", "msg": {"market_ticker": "A", "price": price, "ts": int(time.time())}}
+            await client.on_message(json.dumps(message))
+        await client.dispatcher.stop()
+        return client
+
+    client = asyncio.run(run())
+    snapshot = client.stats()["metrics"]
+    assert snapshot["received"] == {"ticker": 3}
+    assert snapshot["queued"]["ticker"]["count"] == 3
+    assert snapshot["handler"]["ticker"]["count"] >= 1
+    assert snapshot["depth"] == 0
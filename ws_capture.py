@@ -0,0 +1,156 @@
+import asyncio
+import glob
+import mmap
+import os
+import struct
+import time
+from typing import Any, Iterator, Optional, Tuple, Union
+
+# Each segment starts with MAGIC, then holds records of a RECORD header (receive time as
+# unix seconds, frame length) followed by the raw frame bytes
+MAGIC = b"KWSCAP1\n"
+RECORD = struct.Struct("<dI")
+SEGMENT_PATTERN = "capture-{:06d}.bin"
+
+class CaptureRecorder:
+    """Appends raw WebSocket frames with their receive times to segmented capture files.
+
+    Segments are written to a directory as capture-000000.bin, capture-000001.bin, ... and
+    a new one is started once the current one reaches segment_bytes, so a long capture can
+    be copied or trimmed a file at a time. Writes are buffered; call flush() or close() to
+    make sure everything is on disk.
+    """
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, buffer_bytes: int = 1024 * 1024):
+        """Initializes the recorder, continuing after any segments already in directory.
+
+        Args:
+            directory: Where segments are written. Created if missing.
+            segment_bytes: Size after which a new segment is started.
+            buffer_bytes: Write buffer of the open segment.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.buffer_bytes = buffer_bytes
+        self.segment = next_segment(directory)
+        self.frames = 0
+        self.bytes = 0
+        self._file = None
+        self._size = 0
+
+    def _open_segment(self) -> None:
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(self.segment))
+        self._file = open(path, "xb", buffering=self.buffer_bytes)  # Never truncate a kept segment
+        self._file.write(MAGIC)
+        self._size = len(MAGIC)
+        self.segment += 1
+
+    def record(self, frame: Union[str, bytes], received: Optional[float] = None) -> None:
+        """Appends a frame received at unix time received (now if None)."""
+        if isinstance(frame, str):
+            frame = frame.encode()
+        if self._file is None or self._size >= self.segment_bytes:
+            self.close()
+            self._open_segment()
+        self._file.write(RECORD.pack(time.time() if received is None else received, len(frame)))
+        self._file.write(frame)
+        self._size += RECORD.size + len(frame)
+        self.frames += 1
+        self.bytes += len(frame)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def segment_paths(directory: str) -> list:
+    """Returns a capture directory's segment files in recording order."""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN.replace("{:06d}", "*"))))
+
+def next_segment(directory: str) -> int:
+    """Returns the index after the highest segment in directory, which may have gaps once trimmed."""
+    indexes = []
+    for path in segment_paths(directory):
+        try:
+            indexes.append(int(os.path.basename(path)[len("capture-"):-len(".bin")]))
+        except ValueError:
+            pass
+    return max(indexes, default=-1) + 1
+
+class CaptureReader:
+    """Reads frames back from a capture directory written by CaptureRecorder.
+
+    Each segment is memory mapped, so frames are sliced straight out of the page cache
+    without reading whole files into memory. A segment cut short by a crash is read up to
+    its last complete record.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.paths = segment_paths(directory)
+
+    def __iter__(self) -> Iterator[Tuple[float, bytes]]:
+        """Yields (receive time, frame bytes) for every recorded frame."""
+        for path in self.paths:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size <= len(MAGIC):
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if data[:len(MAGIC)] != MAGIC:
+                        raise ValueError(f"Not a capture segment: {path}")
+                    offset, end = len(MAGIC), len(data)
+                    while offset + RECORD.size <= end:
+                        received, length = RECORD.unpack_from(data, offset)
+                        offset += RECORD.size
+                        if offset + length > end:
+                            break
+                        yield received, data[offset:offset + length]
+                        offset += length
+
+    async def replay(self, client: Any, speed: Optional[float] = None, yield_every: int = 256) -> dict:
+        """Feeds every frame to client.on_message, as a live connection would.
+
+        The client's dispatcher is started if needed and drained at the end, so handlers,
+        order books and market state see the capture exactly as they would live.
+
+        Args:
+            client: KalshiWebSocketClient (or anything with on_message and a dispatcher).
+            speed: None to replay as fast as possible, 1.0 for the recorded pace, 5.0 for
+                five times faster than recorded, and so on.
+            yield_every: Frames fed between yields to the event loop when not pacing, so
+                handlers keep up under overflow policies that never block.
+
+        Returns:
+            Frames replayed, elapsed seconds and frames per second.
+        """
+        dispatcher = getattr(client, "dispatcher", None)
+        if dispatcher is not None:
+            dispatcher.start()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first = None
+        frames = 0
+        for received, frame in self:
+            if speed is not None:
+                if first is None:
+                    first = received
+                delay = started + (received - first) / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif frames % yield_every == 0:
+                await asyncio.sleep(0)
+            await client.on_message(frame)
+            frames += 1
+        if dispatcher is not None:
+            await dispatcher.stop()
+        elapsed = loop.time() - started
+        return {"frames": frames, "elapsed": elapsed, "fps": frames / elapsed if elapsed else 0.0}
@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "conflate")
+
+def message_channel(message: Dict[str, Any]) -> Optional[str]:
+    """Returns the channel (message type) of a parsed WebSocket message, e.g. "ticker"."""
+    if type(message) is dict:
+        return message.get("type")
+    return getattr(message, "type", None)  # Compact messages such as ws_fastpath.TickerUpdate
+
+def message_ticker(message: Dict[str, Any]) -> Optional[str]:
+    """Returns the market ticker a parsed WebSocket message is about, if any."""
+    if type(message) is not dict:
+        return getattr(message, "market_ticker", None)
+    body = message.get("msg")
+    if isinstance(body, dict):
+        return body.get("market_ticker")
+    return None
+
+class _Route:
+    """A registered handler and the messages it wants."""
+    __slots__ = ("handler", "channels", "tickers", "is_async", "inline")
+
+    def __init__(self, handler, channels, tickers, inline):
+        self.handler = handler
+        self.channels = frozenset(channels) if channels else None
+        self.tickers = frozenset(tickers) if tickers else None
+        self.is_async = asyncio.iscoroutinefunction(handler)
+        self.inline = inline
+
+    def select(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.channels is None and self.tickers is None:
+            return batch
+        return [
+            message for message in batch
+            if (self.channels is None or message_channel(message) in self.channels)
+            and (self.tickers is None or message_ticker(message) in self.tickers)
+        ]
+
+class Dispatcher:
+    """Bounded queue between a WebSocket reader and its message handlers.
+
+    The reader puts parsed messages and returns to the socket right away; a single
+    consumer task takes up to batch_size queued messages at a time and hands each handler
+    the list of messages routed to it. Handlers see messages in arrival order and one
+    batch at a time, while different handlers of the same batch run concurrently.
+
+    When the queue is full the overflow policy decides what happens:
+        block: the reader waits for room, pushing back on the socket.
+        drop_oldest: the oldest queued message is discarded.
+        conflate: a queued message for the same channel and ticker is replaced by the new
+            one, for channels in conflate_channels (snapshots such as "ticker", never
+            deltas). Conflation happens whether or not the queue is full; messages that
+            cannot be conflated wait for room as with block.
+    """
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        overflow: str = "block",
+        conflate_channels: Iterable[str] = ("ticker",),
+        executor: Optional[Any] = None,
+        metrics: Optional[Any] = None
+    ):
+        """Initializes the dispatcher.
+
+        Args:
+            max_queue: Messages held before the overflow policy applies.
+            batch_size: Most messages delivered to a handler in one call.
+            overflow: "block", "drop_oldest" or "conflate".
+            conflate_channels: Channels whose messages may replace each other per ticker
+                under the "conflate" policy.
+            executor: Executor running synchronous handlers that are not inline. None uses
+                the loop's default executor.
+            metrics: ws_metrics.WebSocketMetrics recording how long messages wait in the
+                queue and how long handlers run.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.conflate_channels = frozenset(conflate_channels)
+        self.executor = executor
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.watch_depth(self.__len__)
+
+        self._routes = []
+        # Keys in arrival order; (queued time, message) pairs live in _pending so conflation
+        # can swap them in place
+        self._order = deque()
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._task = None
+        self._closing = False
+
+        self.received = 0
+        self.delivered = 0
+        self.batches = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.handler_errors = 0
+        self.max_depth = 0
+
+    def add_handler(
+        self,
+        handler: Callable[[List[Dict[str, Any]]], Any],
+        channels: Optional[Iterable[str]] = None,
+        tickers: Optional[Iterable[str]] = None,
+        inline: bool = False
+    ) -> None:
+        """Registers a handler called with lists of messages.
+
+        Args:
+            handler: Function or coroutine function taking a list of parsed messages.
+            channels: Only deliver these message types, e.g. ["ticker", "trade"]. None for all.
+            tickers: Only deliver messages about these market tickers. None for all.
+            inline: Call a synchronous handler on the event loop instead of the executor.
+                Only for handlers that return quickly.
+        """
+        self._routes.append(_Route(handler, channels, tickers, inline))
+
+    def remove_handler(self, handler: Callable) -> None:
+        """Unregisters every route of a handler."""
+        self._routes = [route for route in self._routes if route.handler is not handler]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    async def put(self, message: Dict[str, Any]) -> None:
+        """Queues a message, applying the overflow policy if the queue is full."""
+        self.received += 1
+        entry = (time.monotonic() if self.metrics is not None else 0.0, message)
+        key = None
+        if self.overflow == "conflate":
+            channel = message_channel(message)
+            if channel in self.conflate_channels:
+                key = (channel, message_ticker(message))
+                if key in self._pending:
+                    self._pending[key] = entry
+                    self.conflated += 1
+                    return
+
+        if len(self._order) >= self.max_queue:
+            if self.overflow == "drop_oldest":
+                del self._pending[self._order.popleft()]
+                self.dropped += 1
+            else:
+                while len(self._order) >= self.max_queue:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                if key is not None and key in self._pending:
+                    # Another message for this ticker was queued while we waited
+                    self._pending[key] = entry
+                    self.conflated += 1
+                    return
+
+        if key is None:
+            key = next(self._sequence)
+        self._order.append(key)
+        self._pending[key] = entry
+        self.max_depth = max(self.max_depth, len(self._order))
+        self._not_empty.set()
+
+    def _take(self) -> List[Dict[str, Any]]:
+        count = min(self.batch_size, len(self._order))
+        entries = [self._pending.pop(self._order.popleft()) for _ in range(count)]
+        if not self._order and not self._closing:
+            self._not_empty.clear()
+        self._not_full.set()
+        if self.metrics is not None:
+            now = time.monotonic()
+            queued = self.metrics.queued
+            for stamp, message in entries:
+                queued[message_channel(message)].record(now - stamp)
+        return [message for _, message in entries]
+
+    async def _call(self, route: _Route, messages: List[Dict[str, Any]]) -> None:
+        started = time.monotonic() if self.metrics is not None else 0.0
+        try:
+            if route.is_async:
+                await route.handler(messages)
+            elif route.inline:
+                route.handler(messages)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self.executor, route.handler, messages)
+        except Exception as e:
+            self.handler_errors += 1
+            print(f"Error in message handler {getattr(route.handler, '__name__', route.handler)}: {e}")
+        if self.metrics is not None:
+            self.metrics.record_handler({message_channel(message) for message in messages}, time.monotonic() - started)
+
+    async def deliver(self, batch: List[Dict[str, Any]]) -> None:
+        """Hands one batch to every handler it routes to and waits for them."""
+        calls = []
+        for route in self._routes:
+            messages = route.select(batch)
+            if messages:
+                calls.append(self._call(route, messages))
+        if len(calls) == 1:
+            await calls[0]
+        elif calls:
+            await asyncio.gather(*calls)
+        self.delivered += len(batch)
+        self.batches += 1
+
+    async def run(self) -> None:
+        """Delivers queued messages until stopped."""
+        while True:
+            await self._not_empty.wait()
+            if not self._order:
+                return  # Woken by stop() with nothing left to deliver
+            await self.deliver(self._take())
+
+    def start(self) -> asyncio.Task:
+        """Starts the consumer task on the running loop if it is not running yet."""
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stops the consumer task after it delivers what is queued, or right away if drain is False."""
+        if self._task is None:
+            return
+        if drain:
+            self._closing = True
+            self._not_empty.set()
+        else:
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns queue depth and delivery counters."""
+        return {
+            "depth": len(self._order),
+            "max_depth": self.max_depth,
+            "received": self.received,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "handler_errors": self.handler_errors,
+        }
@@ -0,0 +1,120 @@
+import json
+import re
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+from orderbook import ORDERBOOK_CHANNELS
+from subscriptions import CONTROL_CHANNELS
+
+# Optional faster decoder for the ticker message shape
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Errors raised when a frame is not valid JSON (or not the expected shape)
+DECODE_ERRORS = (ValueError, KeyError, TypeError)
+if msgspec is not None:
+    DECODE_ERRORS += (msgspec.DecodeError,)
+
+# Frames the filter never drops: replies to commands, and sequenced channels where a
+# dropped frame would look like a gap
+ALWAYS_PASS = frozenset(CONTROL_CHANNELS) | frozenset(ORDERBOOK_CHANNELS)
+
+_TYPE_STR = re.compile(r'"type"\s*:\s*"([^"]*)"')
+_TICKER_STR = re.compile(r'"market_ticker"\s*:\s*"([^"]*)"')
+_TYPE_BYTES = re.compile(rb'"type"\s*:\s*"([^"]*)"')
+_TICKER_BYTES = re.compile(rb'"market_ticker"\s*:\s*"([^"]*)"')
+
+def peek(frame: Union[str, bytes]) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the message type and market ticker of a raw frame without parsing it.
+
+    Scans for the first "type" and "market_ticker" keys, which is what Kalshi's flat
+    messages carry; either is None when absent.
+    """
+    if isinstance(frame, str):
+        kind = _TYPE_STR.search(frame)
+        ticker = _TICKER_STR.search(frame)
+        return (kind.group(1) if kind else None), (ticker.group(1) if ticker else None)
+    kind = _TYPE_BYTES.search(frame)
+    ticker = _TICKER_BYTES.search(frame)
+    return (kind.group(1).decode() if kind else None), (ticker.group(1).decode() if ticker else None)
+
+class FrameFilter:
+    """Decides from a frame's type and ticker whether it is worth parsing.
+
+    Frames pass when their channel is in channels (or channels is None) and their ticker
+    is in tickers (or tickers is None, or the frame has no ticker). Command replies and
+    order book frames always pass. channels and tickers are sets and may be changed while
+    the client runs.
+    """
+    def __init__(self, channels: Optional[Iterable[str]] = None, tickers: Optional[Iterable[str]] = None):
+        self.channels = set(channels) if channels is not None else None
+        self.tickers = set(tickers) if tickers is not None else None
+        self.passed = 0
+        self.dropped = 0
+
+    def wants(self, channel: Optional[str], ticker: Optional[str]) -> bool:
+        if channel in ALWAYS_PASS or (
+            (self.channels is None or channel in self.channels)
+            and (self.tickers is None or ticker is None or ticker in self.tickers)
+        ):
+            self.passed += 1
+            return True
+        self.dropped += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"passed": self.passed, "dropped": self.dropped}
+
+class TickerUpdate(NamedTuple):
+    """A ticker channel message as a flat tuple. Prices are in cents.
+
+    Carries type like a parsed message, so dispatcher routing, conflation and the market
+    state store treat it as a "ticker" message.
+    """
+    market_ticker: str
+    price: Optional[int]
+    yes_bid: Optional[int]
+    yes_ask: Optional[int]
+    volume: Optional[int]
+    open_interest: Optional[int]
+    ts: Optional[int]
+    sid: Optional[int]
+
+    type = "ticker"
+
+if msgspec is not None:
+    class _TickerBody(msgspec.Struct):
+        market_ticker: str
+        price: Optional[int] = None
+        yes_bid: Optional[int] = None
+        yes_ask: Optional[int] = None
+        volume: Optional[int] = None
+        open_interest: Optional[int] = None
+        ts: Optional[int] = None
+
+    class _TickerFrame(msgspec.Struct):
+        msg: _TickerBody
+        sid: Optional[int] = None
+
+    _ticker_decoder = msgspec.json.Decoder(_TickerFrame)
+
+def decode_ticker(frame: Union[str, bytes]) -> TickerUpdate:
+    """Decodes a ticker channel frame straight into a TickerUpdate.
+
+    Uses a msgspec decoder for the fixed message shape when msgspec is installed, which
+    skips unknown fields without building them; otherwise parses with json.
+    """
+    if msgspec is not None:
+        decoded = _ticker_decoder.decode(frame)
+        body = decoded.msg
+        return TickerUpdate(
+            body.market_ticker, body.price, body.yes_bid, body.yes_ask,
+            body.volume, body.open_interest, body.ts, decoded.sid
+        )
+    decoded = json.loads(frame)
+    body = decoded["msg"]
+    return TickerUpdate(
+        body["market_ticker"], body.get("price"), body.get("yes_bid"), body.get("yes_ask"),
+        body.get("volume"), body.get("open_interest"), body.get("ts"), decoded.get("sid")
+    )
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Histogram buckets are log-linear over microseconds: four buckets per power of two, so
+# every recorded value is off by at most 25%, from 1 microsecond up to about 12 days
+_SUB_BUCKETS = 4
+_MAX_EXPONENT = 40
+_BUCKETS = (_MAX_EXPONENT + 1) * _SUB_BUCKETS
+
+def _bucket(micros: int) -> int:
+    if micros < _SUB_BUCKETS:
+        return max(micros, 0)
+    exponent = micros.bit_length() - 1
+    if exponent > _MAX_EXPONENT:
+        return _BUCKETS - 1
+    return exponent * _SUB_BUCKETS + ((micros >> (exponent - 2)) & (_SUB_BUCKETS - 1))
+
+def _bucket_upper(index: int) -> int:
+    """Returns the largest microsecond value counted in a bucket."""
+    if index < 2 * _SUB_BUCKETS:
+        return index
+    exponent, sub = divmod(index, _SUB_BUCKETS)
+    return ((_SUB_BUCKETS + sub + 1) << (exponent - 2)) - 1
+
+class LatencyHistogram:
+    """Fixed-size histogram of durations in seconds.
+
+    Recording is a few integer operations and one list increment. Percentiles are read
+    from bucket bounds, so they are accurate to within 25%; count, mean and max are exact.
+    Negative durations (clock skew between the exchange and us) are counted as zero.
+    """
+    __slots__ = ("counts", "count", "total", "max", "negative")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.negative = 0
+
+    def record(self, seconds: float) -> None:
+        if seconds < 0:
+            self.negative += 1
+            seconds = 0.0
+        self.counts[_bucket(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Returns the duration in seconds below which a fraction q of the values fall."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(_bucket_upper(index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns count, mean, p50/p90/p99 and max, in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+class _PerChannel(dict):
+    def __missing__(self, channel):
+        histogram = self[channel] = LatencyHistogram()
+        return histogram
+
+class WebSocketMetrics:
+    """Latency histograms and message rates of a KalshiWebSocketClient, per channel.
+
+    exchange: exchange timestamp to socket receive, i.e. network and exchange lag. Kalshi
+        stamps most messages in whole seconds, so this is only meaningful above ~1s.
+    queued: socket receive to the start of handler delivery, i.e. our own backlog.
+    handler: run time of handler calls, recorded under each channel a call delivered.
+
+    The client and its dispatcher record into these from the event loop thread.
+    """
+    def __init__(self):
+        self.started = time.monotonic()
+        self.exchange = _PerChannel()
+        self.queued = _PerChannel()
+        self.handler = _PerChannel()
+        self.received = {}
+        self._depth = None
+        self._last_report = (self.started, 0)
+
+    def watch_depth(self, depth: Callable[[], int]) -> None:
+        """Sets the function returning the current queue depth."""
+        self._depth = depth
+
+    def record_receive(self, channel: Optional[str], message: Dict[str, Any], received: float) -> None:
+        """Counts a message and its exchange latency, given its wall-clock receive time."""
+        self.received[channel] = self.received.get(channel, 0) + 1
+        if type(message) is dict:
+            body = message.get("msg")
+            ts = body.get("ts") if isinstance(body, dict) else None
+        else:
+            ts = getattr(message, "ts", None)
+        if isinstance(ts, (int, float)):
+            if ts > 1e11:  # Milliseconds
+                ts /= 1000
+            self.exchange[channel].record(received - ts)
+
+    def record_handler(self, channels: Iterable[Optional[str]], seconds: float) -> None:
+        for channel in channels:
+            self.handler[channel].record(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns every histogram, message counts and rates, and the current queue depth."""
+        elapsed = time.monotonic() - self.started
+        total = sum(self.received.values())
+        return {
+            "depth": self._depth() if self._depth is not None else None,
+            "received": dict(self.received),
+            "messages_per_second": total / elapsed if elapsed > 0 else 0.0,
+            "exchange": {channel: h.snapshot() for channel, h in list(self.exchange.items())},
+            "queued": {channel: h.snapshot() for channel, h in list(self.queued.items())},
+            "handler": {channel: h.snapshot() for channel, h in list(self.handler.items())},
+        }
+
+    def report(self) -> str:
+        """Returns a one-line-per-channel summary, with the message rate since the last report."""
+        now = time.monotonic()
+        total = sum(self.received.values())
+        last_time, last_total = self._last_report
+        self._last_report = (now, total)
+        rate = (total - last_total) / (now - last_time) if now > last_time else 0.0
+        depth = self._depth() if self._depth is not None else "-"
+        lines = [f"ws: {rate:.0f} msg/s, depth {depth}, {total} received"]
+        for channel in sorted(self.received, key=str):
+            parts = []
+            for name, histograms in (("exchange", self.exchange), ("queued", self.queued), ("handler", self.handler)):
+                if channel in histograms:
+                    h = histograms[channel]
+                    parts.append(f"{name} p50 {h.percentile(0.5) * 1000:.2f}ms p99 {h.percentile(0.99) * 1000:.2f}ms")
+            lines.append(f"  {channel}: {self.received[channel]} msgs" + (", " + ", ".join(parts) if parts else ""))
+        return "\n".join(lines)
+
+    async def report_every(self, interval: float, sink: Callable[[str], Any] = print) -> None:
+        """Passes report() to sink every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            sink(self.report())